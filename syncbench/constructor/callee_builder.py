@@ -3,29 +3,42 @@ Callee dataset
 """
 import json
 import git
-import ast
 import os
 import sys
 import time
 import shutil
+import types
+import dataclasses
+import collections
 from datetime import datetime
-from textwrap import dedent
-import autopep8
-import re
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable
 
 from syncbench.evaluator.exetest import ExecutionTest
 from syncbench.evaluator.builder import SandBoxManager
 from syncbench.evaluator.tester import SandBoxET
+from syncbench.evaluator.coverage import CoverageMapper
+from syncbench.evaluator.container_pool import close_container_pools
+from syncbench.evaluator.execution_cache import ExecutionCache
+from syncbench.evaluator.executor import ExecutionScheduler
 from syncbench.constructor.instancer import (
     InstanceConfig, 
     remove_fm_in_context_code, 
     generate_code_revision_log
 )
-from syncbench.utilizer.function_filter import FunctionFilter
-from syncbench.utilizer.method_filter import MethodFilter
 from syncbench.utilizer.gitloader import GitLoader
 from syncbench.utilizer.tracer import CodeHistoryTracer
+from syncbench.utilizer.history_index import HistoryIndex
+from syncbench.utilizer.gitlog_parser import CommitTable
+from syncbench.utilizer.fingerprint import code_fingerprint
+from syncbench.utilizer.import_graph import ImportGraph, load_import_graph
+from syncbench.utilizer.checkpoint import CheckpointJournal
+from syncbench.utilizer.extraction import extract_file_records, extract_repo_records
+from syncbench.utilizer.context_store import context_store
+from syncbench.utilizer.pipeline import stream_in_background, JsonListWriter, process_pool_context
+from syncbench.utilizer.scheduler import CandidateScheduler
+from syncbench.utilizer.blob_cache import blob_cache
+from syncbench.utilizer.aligner import format_code
 from utils.logger import ConstructLogger, logger
 from utils.json_util import read_test_data
 
@@ -38,7 +51,7 @@ class CustomEncoder(json.JSONEncoder):
             return o.isoformat()
         return super().default(o)
 
-class Extractor(ast.NodeVisitor):
+class Extractor(object):
     def __init__(
             self, 
             args, 
@@ -51,14 +64,13 @@ class Extractor(ast.NodeVisitor):
         self.args = args
         self.functions = []
         self.methods = []
-        self.current_file_content = None
         self.current_file_name = None
-        self.context_code = []
 
         # Repo
         self.repo_url = repo_url
         self.repo_id = repo_id
         self.repo_name = repo_name  # save the repository name
+        self.repo_info = {'repo_id': repo_id, 'repo_name': repo_name, 'repo_url': repo_url}
         self.repo_folder_name = f"{repo_id}_{args.repo_source_dict_list[int(repo_id)-1]['repo_name']}"
         self.clone_dir = f"{args.root_path}{args.repo_path}{self.repo_folder_name}/"
         self.clone_method = 'docker'  # docker | github
@@ -96,13 +108,8 @@ class Extractor(ast.NodeVisitor):
 
     
     def correct_indentation(self, code: str) -> str:
-        """Python format correction"""
-        try:
-            corrected_code = autopep8.fix_code(code, options={'indent_size': 4})
-            return corrected_code
-        except Exception as e:
-            logger.warning(f"[Invalid Code Format Correction] An error occurred:\n{e}\nDirectly returning original code...")
-            return code
+        """Python format correction (memoized by code content)"""
+        return format_code(code)
 
     def remove_repo_directory(self):
         """Repo removal"""
@@ -136,90 +143,6 @@ class Extractor(ast.NodeVisitor):
             logger.warning(f"Failed to remove directory `{path_to_remove}`: {e}\nAttempting directory removal again...")
             self.clean_remove_dir(path_to_remove)
 
-    def visit_FunctionDef(self, node):
-        try:
-            # Capture the source code with correct indentation
-            source_code = dedent(ast.get_source_segment(self.current_file_content, node))
-            source_code = self.correct_indentation(source_code)
-
-            # Determine if it's a method or function
-            if isinstance(node.parent, ast.ClassDef):
-                type_code = "method"
-                self.methods.append({
-                    "type": type_code, 
-                    "name": node.name,
-                    "file_name": os.path.basename(self.current_file_name),
-                    "whole_file_path": self.current_file_name,
-                    "repo_id": self.repo_id, 
-                    "repo_name": self.repo_name,
-                    "repo_url": self.repo_url,
-                    "code": source_code,
-                    "context": self.context_code
-                })
-            else:
-                type_code = "function"
-                self.functions.append({
-                    "type": type_code,
-                    "name": node.name,
-                    "file_name": os.path.basename(self.current_file_name),
-                    "whole_file_path": self.current_file_name, 
-                    "repo_id": self.repo_id, 
-                    "repo_name": self.repo_name,
-                    "repo_url": self.repo_url,
-                    "code": source_code,
-                    "context": self.context_code
-                })
-
-            self.generic_visit(node)
-        except RecursionError:
-            logger.warning(f"RecursionError encountered while processing function {node.name}. Skipping this function.")
-        except Exception as e:
-            logger.warning(f"An error occurred while processing function {node.name}: {e} -> Skipping this function")
-
-    def visit_ClassDef(self, node):
-        try:
-            self.generic_visit(node)
-        except RecursionError:
-            logger.warning(f"RecursionError encountered while processing class {node.name}. Skipping this class.")
-        except Exception as e:
-            logger.warning(f"An error occurred while processing class {node.name}: {e} -> Skipping this class")
-    
-    def collect_context_code(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                code = file.read()
-        except UnicodeDecodeError:  # if is not 'utf-8' encoding
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                code = file.read()
-            code = code.encode('utf-8', errors='ignore').decode('utf-8')  # transform code to 'utf-8' encoding
-        
-        code = self._simplify_imports(code)
-        self.context_code = [{"name": os.path.basename(file_path), "whole_file_path": file_path, "code": code}]
-        self._collect_imported_dependencies(code, file_path)
-    
-    
-    def _simplify_imports(self, code):
-        def replace_import(match):
-            from_part = match.group(1).split('.')[-1]
-            return f'from {from_part} import {match.group(2)}'
-        
-        return re.sub(r'from\s+([\w\.]+)\s+import\s+([\w_]+)', replace_import, code)
-
-    
-    def _collect_imported_dependencies(self, code: str, file_path: str):
-        module_dir = os.path.dirname(file_path)
-        import_statements = [line for line in code.splitlines() if line.startswith("from ") or line.startswith("import ")]
-        for line in import_statements:
-            parts = line.split()
-            if parts[0] == "from" and parts[1] != ".":
-                module_name = parts[1].split('.')[-1]
-                dependency_file = os.path.join(self.clone_dir, module_name.replace('.', '/') + '.py')
-                if os.path.exists(dependency_file) and not any(dep['name'] == os.path.basename(dependency_file) for dep in self.context_code):
-                    with open(dependency_file, 'r', encoding='utf-8') as dep_file:
-                        dep_code = dep_file.read()
-                        dep_code = self._simplify_imports(dep_code)
-                        self.context_code.append({"name": os.path.basename(dependency_file), "whole_file_path": dependency_file, "code": dep_code})
-
 
 
 class CalleeConstructor(Extractor):
@@ -235,11 +158,33 @@ class CalleeConstructor(Extractor):
         # Path
         self.dataset_save_path = f"{args.root_path}{args.dataset_path}"
         self.code_path = f"{args.root_path}{args.code_path}"
+        self.history_index_path = f"{args.root_path}/{args.history_index_path.replace('/', '')}/{repo_id}_{self.repo_name}_history_index.db"
+        self.commit_table_path = f"{args.root_path}/{args.log_path.replace('/', '')}/{args.git_log_path.replace('/', '')}/{repo_id}_{self.repo_name}_commit_table.parquet"
         # Dataset construction
         self.max_extracted_data_to_be_filtered = args.max_extraction_data_length
+        self.extract_workers = args.extract_workers
+        self.stream_extraction = args.stream_extraction
+        self.candidate_scheduling = args.candidate_scheduling
+        self.instance_quota = args.instance_quota  # 0: no quota
         self.preprocess_filter_strictness = args.preprocess_filter_strictness
         self.filtered_fm_dict_list = []
-        self.processed_fm_dict_list = []
+        self.processed_fm_keys = set()
+        self.resume_construction = args.resume_construction
+        self.checkpoint = CheckpointJournal(
+            f"{args.root_path}/{args.log_path.replace('/', '')}/{args.checkpoint_path.replace('/', '')}/{repo_id}_{self.repo_name}_{args.dataset}_journal.jsonl", 
+            resume=(args.resume_construction == 1)
+        )
+        self.history_index = None
+        self.trace_pool = None  # history tracing workers, shared by all test items of the repo
+        # Concurrent execution tests need one sandbox per test: only with mount injection (clone injection shares `code_path`)
+        self.execution_scheduler = ExecutionScheduler(args.exetest_workers if (args.unittest_exetest_method == 1) and (args.injection_mode == 'mount') else 1)
+        self.execution_cache = ExecutionCache(f"{args.root_path}/{args.execution_cache_path.replace('/', '')}/{repo_id}_{self.repo_name}_execution_cache.db") if args.execution_cache == 1 else None
+        self.commit_table = None
+        self.coverage_guided = args.coverage_guided
+        self.coverage_map_path = f"{args.root_path}/{args.log_path.replace('/', '')}/{args.coverage_path.replace('/', '')}/{repo_id}_{self.repo_name}_coverage_map.json"
+        self.coverage_mapper = None
+        self.import_graph = None
+        blob_cache.max_bytes = args.blob_cache_size * 1024 * 1024
         self.test_type = ''
         self.logger = ConstructLogger(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.dataset_construction_log_path.replace('/', '')}/{self.repo_id}_{self.repo_name}_{args.dataset}_construct_log.json")  # initialize logger
         self.check_code_path_valid()
@@ -251,6 +196,10 @@ class CalleeConstructor(Extractor):
 
     def check_code_path_valid(self):
         """Check if code directory exists"""
+        if self.resume_construction == 1:
+            os.makedirs(self.code_path, exist_ok=True)
+            logger.info(f"Resuming construction: keeping the code directory at '{self.code_path}'")
+            return
         if os.path.exists(self.code_path):
             logger.info(f"Code directory exists at '{self.code_path}'. Will remove the existing one and recreate the code directory.")
             shutil.rmtree(self.code_path)
@@ -282,25 +231,37 @@ class CalleeConstructor(Extractor):
             new_instance: InstanceConfig, 
             tested_code: str, 
             context_code: str, 
-            if_gold_unit_test: bool = False
+            if_gold_unit_test: bool = False, 
+            image_id: str = None
         ):
-        """Launch Execution Test"""
-        new_instance.usage_test_file_path = self.relocate_absolute_path_for_exetest(new_instance.usage_test_file_path)
-        new_instance.fm_file_path = self.relocate_absolute_path_for_exetest(new_instance.fm_file_path)
+        """Launch Execution Test (`image_id`: docker image resolved by the caller, so concurrent tests never check or build it)"""
+        # Relocated copy: the instance itself keeps pointing at the cloned repo
+        new_instance = dataclasses.replace(
+            new_instance, 
+            usage_test_file_path=self.relocate_absolute_path_for_exetest(new_instance.usage_test_file_path), 
+            fm_file_path=self.relocate_absolute_path_for_exetest(new_instance.fm_file_path)
+        )
 
         if args.unittest_exetest_method == 1:
-            self.curr_repo_image_id = args.env_image_id
-            logger.info("Preparing docker env for execution test...")
-            self.clean_remove_dir(self.code_path)
+            if image_id is None:
+                image_id = self.resolve_repo_image(args, new_instance)
             sandbox_manager = SandBoxManager(args, new_instance, tested_code, context_code)
-            if len(self.curr_repo_image_id) == 0:
-                self.curr_repo_image_id = sandbox_manager.check_docker_image(self.curr_repo_image_name, args)
-            sandbox_manager.clone_repository_from_image()
-            sandbox_manager.save_code_to_file()
+            exe_tester = SandBoxET(args, new_instance, tested_code, context_code, image_id, if_gold_unit_test, self.execution_cache)
+            # Identical executions (same image, test file, injected code and command) are served from the execution cache
+            test_eval = exe_tester.get_cached_result()
+            if test_eval is not None:
+                return test_eval
+
+            if args.injection_mode == 'mount':
+                exe_tester.prepare_injection()  # only the candidate file is written, no repo copy
+            else:
+                logger.info("Preparing docker env for execution test...")
+                self.clean_remove_dir(self.code_path)
+                sandbox_manager.clone_repository_from_image()
+                sandbox_manager.save_code_to_file()
+                exe_tester.prepare_sandbox()
 
-            logger.info(f"Using docker image with ID: {self.curr_repo_image_id}")
-            exe_tester = SandBoxET(args, new_instance, tested_code, context_code, self.curr_repo_image_id, if_gold_unit_test)
-            
+            logger.info(f"Using docker image with ID: {image_id}")
             test_eval = exe_tester.run_unittest()
             exe_tester.sandbox_clean_up()
             
@@ -337,6 +298,198 @@ class CalleeConstructor(Extractor):
         return True
     
     
+    def prepare_tracer(self, args, instance: InstanceConfig) -> CodeHistoryTracer:
+        """Create a commit history tracer on the cloned repo, re-cloning it from the docker image if needed"""
+        try:
+            tracer = CodeHistoryTracer(self.clone_dir, args.history_trace_method)
+        except Exception as e:
+            logger.warning(f"An error occurred when tracing commit history: {e}\nAttemptaining again...")
+            sandbox_manager = SandBoxManager(args, instance, None, None)
+            self.curr_repo_image_id = sandbox_manager.check_docker_image(self.curr_repo_image_name, args)
+            sandbox_manager.clone_repository_from_image(self.clone_dir, True)
+            tracer = CodeHistoryTracer(self.clone_dir, args.history_trace_method)
+            logger.pinfo(f"Update: Commit tracing success!")
+        self.load_history_index(args, tracer)
+        self.load_commit_table(args, tracer)
+        return tracer
+
+
+    def load_history_index(self, args, tracer: CodeHistoryTracer):
+        """Attach the persistent per-repo history index to the tracer"""
+        if args.history_index == 0:
+            return
+        if self.history_index is None:
+            self.history_index = HistoryIndex(self.history_index_path, tracer.repo.head.commit.hexsha)
+            logger.info(f"Using history index at '{self.history_index_path}'")
+        tracer.history_index = self.history_index
+
+
+    def load_commit_table(self, args, tracer: CodeHistoryTracer):
+        """Attach the columnar commit table of the repo to the tracer, (re)building it if it is missing or stale"""
+        if args.commit_table == 0:
+            return
+        repo_head = tracer.repo.head.commit.hexsha
+        if (self.commit_table is None) and os.path.exists(self.commit_table_path):
+            self.commit_table = CommitTable.read_parquet(self.commit_table_path)
+        if (self.commit_table is not None) and (self.commit_table.head != repo_head):
+            try:
+                if tracer.repo.is_ancestor(self.commit_table.head, repo_head):
+                    logger.info(f"Appending new commits to commit table at '{self.commit_table_path}'...")
+                    self.commit_table.prepend(CommitTable.from_repo(tracer.repo_dir, f"{self.commit_table.head}..{repo_head}"))
+                    self.commit_table.to_parquet(self.commit_table_path)
+            except git.GitCommandError:
+                pass  # commit table head is unknown to the repo: rebuilt below
+        if (self.commit_table is None) or (self.commit_table.head != repo_head):
+            logger.info(f"Building commit table at '{self.commit_table_path}'...")
+            self.commit_table = CommitTable.from_repo(tracer.repo_dir)
+            self.commit_table.to_parquet(self.commit_table_path)
+        tracer.commit_table = self.commit_table
+
+
+    def prepare_coverage_mapper(self, args, extracted_test_object_dict_list: List[Dict]):
+        """Map every unit test file still to be processed to the functions/methods it calls (streamed test files are mapped when filtered)"""
+        repo_instance = InstanceConfig(repo_id=self.repo_id, repo_name=self.repo_name, repo_url=self.repo_url)
+        self.coverage_mapper = CoverageMapper(args, repo_instance, self.clone_dir, self.coverage_map_path)
+        if len(self.curr_repo_image_id) == 0:
+            self.curr_repo_image_id = self.coverage_mapper.check_docker_image(self.curr_repo_image_name, args)
+        pending_test_file_paths = [test_item['usage_test_file'] for test_item in extracted_test_object_dict_list if not self.checkpoint.is_done(self.test_item_key(test_item))]
+        for test_file_path in dict.fromkeys(pending_test_file_paths):
+            self.coverage_mapper.get_coverage(test_file_path)
+
+
+    def get_candidate_scheduler(self, args, streamed: bool = False) -> CandidateScheduler:
+        """Best-first scheduler of the test items, ranked with the commit table of the repo (if enabled)"""
+        file_commit_counts = {}
+        if args.commit_table == 1:
+            repo_instance = InstanceConfig(repo_id=self.repo_id, repo_name=self.repo_name, repo_url=self.repo_url)
+            self.prepare_tracer(args, repo_instance)
+            file_commit_counts = self.commit_table.file_commit_counts()
+        return CandidateScheduler(self.clone_dir, file_commit_counts, args.stream_queue_size if streamed else None)
+
+
+    def quota_reached(self, pending_count: int = 0) -> bool:
+        """Whether the repo already has `instance_quota` valid instances (saved + `pending_count` not yet saved)"""
+        return (self.instance_quota > 0) and (len(self.filtered_fm_dict_list) + pending_count >= self.instance_quota)
+
+
+    def iter_commit_candidates(self, args, tracer: CodeHistoryTracer, new_instance: InstanceConfig, fm_history: List[Dict], usage_test_file_path: str):
+        """
+        Commits of a function/method history that pass the checks run before any execution test, in history order
+        - versions semantically identical to gold or to an earlier version are skipped
+        - yields each commit with the old/new context code its execution tests need
+        """
+        seen_fingerprints = {code_fingerprint(new_instance.gold_code)} - {None}
+        for entry in fm_history: 
+            commit_hash = entry['commit']
+            commit_key = self.checkpoint.make_key('commit', usage_test_file_path, new_instance.fm_file_path, new_instance.fm_name, commit_hash)
+            if self.checkpoint.is_done(commit_key):
+                logger.info(f"[Checkpoint] Skipping commit({commit_hash}) of `{new_instance.fm_name}`: already {self.checkpoint.get(commit_key)['outcome']} in a previous run.")
+                continue
+            # [Skip current function/method] skip current commit: if no code change for function/method code
+            if new_instance.gold_code == entry['code']:
+                logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because the code of {new_instance.fm_type} `{new_instance.fm_name}` is unchanged.")
+                self.checkpoint.record(commit_key, 'invalid', 'unchanged code')
+                continue
+            fingerprint = entry['fingerprint'] if entry.get('fingerprint') is not None else code_fingerprint(entry['code'])
+            if fingerprint in seen_fingerprints:
+                logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because the code of {new_instance.fm_type} `{new_instance.fm_name}` only differs in formatting, comments or docstring layout.")
+                self.checkpoint.record(commit_key, 'invalid', 'formatting-only change')
+                continue
+            if fingerprint is not None:
+                seen_fingerprints.add(fingerprint)
+            # [Skip current function/method] skip current function/method due to parsing error
+            if entry['code'] == None:
+                logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) for `{new_instance.fm_name}` is invalid due to parsing error.")
+                self.checkpoint.record(commit_key, 'invalid', 'parsing error')
+                continue
+
+            try:
+                with open(new_instance.fm_file_path, "r") as file:
+                    complete_curr_new_context_code = file.read()
+            except Exception as e:
+                logger.warning(f"An error occurred when trying to restore the out-of-sync code: {e}\nAttempting again...")
+                sandbox_manager = SandBoxManager(args, new_instance, None, None)
+                self.curr_repo_image_id = sandbox_manager.check_docker_image(self.curr_repo_image_name, args)
+                sandbox_manager.clone_repository_from_image(self.code_path, force_remove=True)
+                
+                try:
+                    with open(new_instance.fm_file_path, "r") as file:
+                        complete_curr_new_context_code = file.read()
+                except Exception as e:
+                    logger.warning(f"Error persists when trying to restore the out-of-sync code: {e}\nSkipping current commit...")
+                    continue
+
+            complete_curr_old_context_code = tracer.restore_file_code(new_instance.fm_file_path, commit_hash)
+            curr_new_context_code = self.correct_indentation(remove_fm_in_context_code(new_instance.fm_name, complete_curr_new_context_code))  # filtered out fm_code
+            curr_old_context_code = self.correct_indentation(remove_fm_in_context_code(new_instance.fm_name, complete_curr_old_context_code))  # filtered out fm_code
+            new_context_code = [{'name': new_instance.fm_file_name, 'filtered_code': curr_new_context_code, 'complete_code': complete_curr_new_context_code}]  # updated context_code after change
+            old_context_code = [{'name': new_instance.fm_file_name, 'filtered_code': curr_old_context_code, 'complete_code': complete_curr_old_context_code}]  # original context_code before change
+            
+            if complete_curr_new_context_code == complete_curr_old_context_code: 
+                logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because the context code of the {new_instance.fm_type} `{new_instance.fm_name}` is unchanged.")
+                self.checkpoint.record(commit_key, 'invalid', 'unchanged context code')
+                continue
+
+            yield {'entry': entry, 'commit_key': commit_key, 'new_context_code': new_context_code, 'old_context_code': old_context_code}
+
+
+    def resolve_repo_image(self, args, instance: InstanceConfig) -> str:
+        """Docker image ID of the repo for execution tests (checked, and built if missing, in the calling thread)"""
+        self.curr_repo_image_id = args.env_image_id
+        if len(self.curr_repo_image_id) == 0:
+            sandbox_manager = SandBoxManager(args, instance, None, None)
+            self.curr_repo_image_id = sandbox_manager.check_docker_image(self.curr_repo_image_name, args)
+        return self.curr_repo_image_id
+
+
+    def schedule_execution_tests(self, args, new_instance: InstanceConfig, candidates, gold_needed: bool):
+        """
+        Commit candidates with their execution tests submitted ahead to the execution scheduler
+        - the gold test (if not reused from the previous function/method) goes first, with the first candidate
+        - the out-of-sync tests of up to `exetest_workers` candidates run ahead of the one being decided
+        - candidates are yielded in history order; once the caller stops, the tests still queued are cancelled
+        - the docker image is resolved once, before the first test is submitted, and shared by all tests
+        """
+        pending_candidates = collections.deque()
+        image_id = None
+        try:
+            for candidate in candidates:
+                if (image_id is None) and (args.unittest_exetest_method == 1):
+                    image_id = self.resolve_repo_image(args, new_instance)
+                if gold_needed:
+                    candidate['gold_future'] = self.execution_scheduler.submit(self.filter_via_execution_test, args, dataclasses.replace(new_instance), new_instance.gold_code, candidate['new_context_code'], True, image_id)
+                    gold_needed = False
+                candidate['original_future'] = self.execution_scheduler.submit(self.filter_via_execution_test, args, dataclasses.replace(new_instance), candidate['entry']['code'], candidate['new_context_code'], False, image_id)
+                pending_candidates.append(candidate)
+                if len(pending_candidates) >= self.execution_scheduler.workers:
+                    yield pending_candidates.popleft()
+            while pending_candidates:
+                yield pending_candidates.popleft()
+        finally:
+            for candidate in pending_candidates:
+                candidate['original_future'].cancel()
+                if 'gold_future' in candidate:
+                    candidate['gold_future'].cancel()
+
+
+    def get_trace_pool(self, args) -> ProcessPoolExecutor:
+        """Process pool of history tracing, started on first use and reused by every test item"""
+        if self.trace_pool is None:
+            self.trace_pool = ProcessPoolExecutor(max_workers=args.trace_workers, mp_context=process_pool_context())
+        return self.trace_pool
+
+
+    def shutdown_trace_pool(self):
+        if self.trace_pool is not None:
+            self.trace_pool.shutdown()
+            self.trace_pool = None
+
+
+    def test_item_key(self, test_item: Dict) -> str:
+        """Checkpoint key of a test item: a unit test file may be paired with several tested modules"""
+        return self.checkpoint.make_key('test', test_item['usage_test_file'], test_item['pyfile_path'])
+
+
     def fm_filtering(self, args, test_item):
         """Function & method code filtering"""
         new_filtered_fm_dict_list = []
@@ -349,8 +502,27 @@ class CalleeConstructor(Extractor):
             logger.info(f"[General filtering] Invalid unit test.")
             return new_filtered_fm_dict_list
 
+        test_key = self.test_item_key(test_item)
         gold_exe_result_dict = {'fm_file_path': '', 'exe_result': None}
 
+        # Coverage-guided mode: only functions/methods the unit test actually calls are candidates
+        if self.coverage_mapper is not None:
+            covered_fm_list = self.coverage_mapper.filter_covered(usage_test_file_path, fm_list)
+            logger.info(f"[Coverage filtering] {len(covered_fm_list)}/{len(fm_list)} functions/methods are called by `{usage_test_file_path.split('/')[-1]}`.")
+            fm_list = covered_fm_list
+
+        # Trace the histories of all functions/methods of current test item in parallel
+        fm_histories = {}
+        if args.trace_workers > 1:
+            repo_instance = InstanceConfig(repo_id=self.repo_id, repo_name=self.repo_name, repo_url=self.repo_url)
+            tracer = self.prepare_tracer(args, repo_instance)
+            fm_histories = tracer.get_function_histories(
+                [(fm_dict['whole_file_path'], fm_dict['name']) for fm_dict in fm_list], 
+                args.body_change_only == 1, 
+                args.trace_workers, 
+                self.get_trace_pool(args)
+            )
+
         for fm_dict in fm_list:
             print_progress_count += 1
             logger.print_colored_text(f"\n{'=' * 25}  Function/method filtering {print_progress_count}/{len(fm_list)}: [{test_item['usage_test_file'].split('/')[-1]}] -> [{fm_dict['file_name']}] -> [{fm_dict['name']}]  {'=' * 25}", logger.hex_color_dict['cyan'])
@@ -361,7 +533,7 @@ class CalleeConstructor(Extractor):
                 'fm_file_name': fm_dict['file_name'],
                 'python_file_list': [fm_dict['file_name']],
                 'gold_code': fm_dict['code'],
-                'fm_context_dict': fm_dict['context'],
+                'fm_context_dict': context_store.resolve(fm_dict),
                 'fm_file_path': fm_dict['whole_file_path'],
                 'usage_test_file_path': test_item['usage_test_file'],
                 'repo_id': fm_dict['repo_id'], 
@@ -377,68 +549,38 @@ class CalleeConstructor(Extractor):
                 'fm_file_name': new_instance.fm_file_name,
                 'fm_file_path': new_instance.fm_file_path
             }
-            if new_data_check in self.processed_fm_dict_list:
+            fm_key = self.checkpoint.make_key('fm', *new_data_check.values())
+            if fm_key in self.processed_fm_keys:
                 logger.pinfo(f"[General filtering] Skipping current {new_instance.fm_type} `{new_instance.fm_name}` due to duplicate processing.")
                 continue
             else:
-                self.processed_fm_dict_list += [new_data_check]
-
-            try:
-                tracer = CodeHistoryTracer(self.clone_dir)
-            except Exception as e:
-                logger.warning(f"An error occurred when tracing commit history: {e}\nAttemptaining again...")
-                sandbox_manager = SandBoxManager(args, new_instance, None, None)
-                self.curr_repo_image_id = sandbox_manager.check_docker_image(self.curr_repo_image_name, args)
-                sandbox_manager.clone_repository_from_image(self.clone_dir, True)
-                tracer = CodeHistoryTracer(self.clone_dir)
-                logger.pinfo(f"Update: Commit tracing success!")
+                self.processed_fm_keys.add(fm_key)
 
-            fm_history = tracer.get_function_history(new_instance.fm_file_path, new_instance.fm_name)
+            tracer = self.prepare_tracer(args, new_instance)
+            if (new_instance.fm_file_path, new_instance.fm_name) in fm_histories:
+                fm_history = fm_histories[(new_instance.fm_file_path, new_instance.fm_name)]
+            else:
+                fm_history = tracer.get_function_history(new_instance.fm_file_path, new_instance.fm_name, args.body_change_only == 1)
             if (fm_history == None) or (len(fm_history)==0):  # if no function/method code history versions
                 logger.info_with_pink_background(f"[Invalid test] {new_instance.fm_name} has no history versions.")
                 continue
+            # Format the gold code only now that the candidate has history versions to compare against
+            new_instance.gold_code = self.correct_indentation(new_instance.gold_code)
 
             if args.commit_trace_mode == 1:
                 fm_history = [fm_history[-1]]
                 
-            # Commit history tracing
-            for entry in fm_history: 
+            # Commit history tracing: execution tests of upcoming commits run ahead, decisions are still taken in history order
+            gold_needed = new_instance.fm_file_path != gold_exe_result_dict['fm_file_path']
+            candidates = self.iter_commit_candidates(args, tracer, new_instance, fm_history, usage_test_file_path)
+            for candidate in self.schedule_execution_tests(args, new_instance, candidates, gold_needed): 
+                # [Stop current repo] instance quota reached: the test is left unfinished for a later run with a larger quota
+                if self.quota_reached(len(new_filtered_fm_dict_list)):
+                    return new_filtered_fm_dict_list
+                entry, commit_key = candidate['entry'], candidate['commit_key']
                 commit_hash = entry['commit']
                 new_instance.out_of_sync_code = entry['code']
-                # [Skip current function/method] skip current commit: if no code change for function/method code
-                if new_instance.gold_code == entry['code']:
-                    logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because the code of {new_instance.fm_type} `{new_instance.fm_name}` is unchanged.")
-                    continue
-                # [Skip current function/method] skip current function/method due to parsing error
-                if entry['code'] == None:
-                    logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) for `{new_instance.fm_name}` is invalid due to parsing error.")
-                    continue
-
-                try:
-                    with open(new_instance.fm_file_path, "r") as file:
-                        complete_curr_new_context_code = file.read()
-                except Exception as e:
-                    logger.warning(f"An error occurred when trying to restore the out-of-sync code: {e}\nAttempting again...")
-                    sandbox_manager = SandBoxManager(args, new_instance, None, None)
-                    self.curr_repo_image_id = sandbox_manager.check_docker_image(self.curr_repo_image_name, args)
-                    sandbox_manager.clone_repository_from_image(self.code_path, force_remove=True)
-                    
-                    try:
-                        with open(new_instance.fm_file_path, "r") as file:
-                            complete_curr_new_context_code = file.read()
-                    except Exception as e:
-                        logger.warning(f"Error persists when trying to restore the out-of-sync code: {e}\nSkipping current commit...")
-                        continue
-
-                complete_curr_old_context_code = tracer.restore_file_code(new_instance.fm_file_path, commit_hash)
-                curr_new_context_code = self.correct_indentation(remove_fm_in_context_code(complete_curr_new_context_code, new_instance.fm_name))  # filtered out fm_code
-                curr_old_context_code = self.correct_indentation(remove_fm_in_context_code(complete_curr_old_context_code, new_instance.fm_name))  # filtered out fm_code
-                new_context_code = [{'name': new_instance.fm_file_name, 'filtered_code': curr_new_context_code, 'complete_code': complete_curr_new_context_code}]  # updated context_code after change
-                old_context_code = [{'name': new_instance.fm_file_name, 'filtered_code': curr_old_context_code, 'complete_code': complete_curr_old_context_code}]  # original context_code before change
-                
-                if complete_curr_new_context_code == complete_curr_old_context_code: 
-                    logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because the context code of the {new_instance.fm_type} `{new_instance.fm_name}` is unchanged.")
-                    continue
+                new_context_code, old_context_code = candidate['new_context_code'], candidate['old_context_code']
 
                 if new_instance.fm_file_path == gold_exe_result_dict['fm_file_path']:
                     gold_exe_result = gold_exe_result_dict['exe_result']
@@ -449,23 +591,26 @@ class CalleeConstructor(Extractor):
                     logger.info_with_cyan_background(f"[Unit test summary]")
                     logger.print_colored_text(f"{gold_exe_result['summary']}", logger.hex_color_dict['cyan'])
                 else:
-                    gold_exe_result = self.filter_via_execution_test(args, new_instance, new_instance.gold_code, new_context_code, True)
+                    gold_exe_result = candidate['gold_future'].result()
                  
                 gold_exe_result_dict['fm_file_path'] = new_instance.fm_file_path
                 gold_exe_result_dict['exe_result'] = gold_exe_result
 
                 # [Skip current test] Time out
                 if gold_exe_result == 'Timeout':
+                    self.checkpoint.record(test_key, 'timeout', 'gold execution test timed out')
                     return new_filtered_fm_dict_list
                 # [Skip current test] pytest filtering
                 if gold_exe_result == 'Invalid Test':
                     logger.info(f"[Execution Test for 'gold_code + new_context'] {gold_exe_result}\n")
                     logger.info_with_pink_background(f"[Invalid Test] Skip current unit test file `{test_item['usage_test_file'].split('/')[-1]}` because unit test passed while no unit test executed in this test.")
+                    self.checkpoint.record(test_key, 'invalid', 'no unit test executed')
                     return new_filtered_fm_dict_list
                 # [Skip current test] No passed test
                 if gold_exe_result['summary']['passed'] == 0: 
                     logger.info(f"[Execution Test for 'gold_code + new_context'] {'Passed' if int(gold_exe_result['adapt_grade']) == 1 else 'Failed'}\n{gold_exe_result['summary']}\n")
                     logger.info_with_pink_background(f"[Invalid Test] Skip current unit test file `{test_item['usage_test_file'].split('/')[-1]}` because no 'passed' unit test in current gold test.")
+                    self.checkpoint.record(test_key, 'invalid', 'no passed unit test in gold test')
                     return new_filtered_fm_dict_list
                 
                 # Print execution test result
@@ -473,26 +618,31 @@ class CalleeConstructor(Extractor):
                 # [Skip current test] Check if unit test passed: skip current `test_.py` file if failed
                 if gold_exe_result['adapt_grade'] == 0: 
                     logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because 'gold_code + new_context_code' failed execution test (which is expected to pass).")
+                    self.checkpoint.record(test_key, 'invalid', 'gold execution test failed')
                     return new_filtered_fm_dict_list
                 
-                original_exe_result = self.filter_via_execution_test(args, new_instance, new_instance.out_of_sync_code, new_context_code, False)
+                original_exe_result = candidate['original_future'].result()
                 if original_exe_result == 'Timeout':
+                    self.checkpoint.record(commit_key, 'timeout', 'out-of-sync execution test timed out')
                     continue  # move on to the next function/method 
                 # [Skip current test] pytest filtering
                 if original_exe_result == 'Invalid Test':
                     logger.info(f"[Execution Test for 'original_code + new_context'] {original_exe_result}\n")
                     logger.info_with_pink_background(f"[Invalid Test] Skip current unit test file `{test_item['usage_test_file'].split('/')[-1]}` because unit test passed while no unit test executed in this test.")
+                    self.checkpoint.record(test_key, 'invalid', 'no unit test executed')
                     return new_filtered_fm_dict_list
                 # Print execution test result
                 logger.info(f"[Execution Test for 'original_code + new_context'] {'Passed' if int(original_exe_result['adapt_grade']) == 1 else 'Failed'}\n")
                 # [Skip current test] unittest filtering: if no unit test executed, skip current unit test `test_.py`
                 if self.unittest_filtering(args, original_exe_result, gold_exe_result) == False:
                     logger.info_with_pink_background(f"[Invalid Test] Skip current unit test file `{test_item['usage_test_file'].split('/')[-1]}` because unit test passed while no unit test executed in this test.")
+                    self.checkpoint.record(test_key, 'invalid', 'no unit test executed')
                     return new_filtered_fm_dict_list
                 
                 if original_exe_result['adapt_grade'] == 1:
                     if args.unittest_mode == 'fp':
                         logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because 'original_code + new_context_code' passed execution test (which is expected to fail since you choose 'fail-to-pass' only).")
+                        self.checkpoint.record(commit_key, 'invalid', 'out-of-sync code passed (fail-to-pass only)')
                         continue
                     else:
                         self.test_type = 'pass-to-pass'
@@ -501,6 +651,7 @@ class CalleeConstructor(Extractor):
                 else: 
                     if args.unittest_mode == 'pp':
                         logger.info_with_pink_background(f"[Invalid test] Current commit({commit_hash}) is invalid because 'original_code + new_context_code' failed execution test (which is expected to pass since you choose 'pass-to-pass' only).")
+                        self.checkpoint.record(commit_key, 'invalid', 'out-of-sync code failed (pass-to-pass only)')
                         continue
                     else:
                         self.test_type = 'fail-to-pass'
@@ -542,6 +693,8 @@ class CalleeConstructor(Extractor):
                     'context_data': context_data_dict,
                     'changes': changes_dict
                 }
+                # Journal the commit before saving, so a resumed run never appends this instance to the dataset twice
+                self.checkpoint.record(commit_key, 'valid', self.test_type)
                 new_filtered_fm_dict_list += [fm_test_dict]
                 logger.info(f"[Valid test {len(new_filtered_fm_dict_list)+len(self.filtered_fm_dict_list)}/{len(new_filtered_fm_dict_list)+len(self.filtered_fm_dict_list)}] Current commit({commit_hash}) has been successfully recorded.")
 
@@ -560,96 +713,38 @@ class CalleeConstructor(Extractor):
                     test_type=self.test_type
                 )
                 
+        self.checkpoint.record(test_key, 'done')
         return new_filtered_fm_dict_list
     
     
     def extract_functions_and_methods(self, file_path: str):
-        """Extract functions and methods"""
-        self.functions, self.methods = [], []
+        """Extract functions and methods (each file version is read, parsed and extracted once per run)"""
         self.current_file_name = file_path
-        self.collect_context_code(file_path)
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                self.current_file_content = file.read()
-                tree = ast.parse(self.current_file_content, filename=file_path)
-                
-                for node in ast.walk(tree):
-                    for child in ast.iter_child_nodes(node):
-                        child.parent = node
-                
-                self.visit(tree)
-        
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                other_encoding_content = file.read()
-                self.current_file_content = other_encoding_content.encode('utf-8', errors='ignore').decode('utf-8')
-                
-                tree = ast.parse(self.current_file_content, filename=file_path)
-                
-                for node in ast.walk(tree):
-                    for child in ast.iter_child_nodes(node):
-                        child.parent = node
-                
-                self.visit(tree)
-
-            
-        except SyntaxError as e:
-            logger.warning(f"SyntaxError in file {file_path}: {e}")
-            return [], []
-        
-        if self.preprocess_filter_strictness == 1:
-            function_filterer = FunctionFilter(self.functions)
-            self.functions = function_filterer.function_filtering()
-            method_filterer = MethodFilter(self.methods)
-            self.methods = method_filterer.method_filtering()
-        
+        functions, methods = extract_file_records(file_path, self.repo_info, self.clone_dir, self.preprocess_filter_strictness, blob_cache)
+        self.functions, self.methods = [dict(fm_dict) for fm_dict in functions], [dict(fm_dict) for fm_dict in methods]
         return self.functions, self.methods
 
 
-    def locate_repo_imports(self, file_path: str):
-        """Locate imports"""
-        with open(file_path, 'r') as file:
-            tree = ast.parse(file.read())
-
-        import_lines = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ImportFrom):
-                module = node.module
-                for alias in node.names:
-                    import_lines.append(f"from {module} import {alias.name}")
-        return import_lines
-    
-    
-    def find_python_file(self, repo_path: str, relative_path: str):
-        for root, dirs, files in os.walk(repo_path):
-            potential_path = os.path.join(root, relative_path)
-            if os.path.isfile(potential_path):
-                return potential_path
-        return None
+    def get_import_graph(self, repo_path: str) -> ImportGraph:
+        """Import graph of the repo, built once and reused for every test file"""
+        if (self.import_graph is None) or (self.import_graph.repo_dir != os.path.abspath(repo_path)):
+            self.import_graph = load_import_graph(repo_path)
+        return self.import_graph
     
     
     def extract_test_objects(self, file_path: str, repo_dir: str):
-        import_lines = self.locate_repo_imports(file_path)
-
+        """Source modules a test file exercises: the in-repo modules it imports (re-exports followed)"""
         repo_imports = []
-        for imp in import_lines:
-            parts = imp.split(' ')
-            if len(parts) > 1:
-                module_path = parts[1].replace('.', os.sep) + '.py'
-                file_name = module_path.split(os.sep)[-1]
-                relative_path = os.path.join(*module_path.split(os.sep))
-
-                full_path = self.find_python_file(repo_dir, relative_path)
-                if file_name == file_path.split('/')[-1]:
-                    continue
+        for full_path in self.get_import_graph(repo_dir).imports(file_path):
+            file_name = os.path.basename(full_path)
+            if file_name == file_path.split('/')[-1]:
+                continue
 
-                if full_path:
-                    repo_imports.append({
-                        'name': file_name,
-                        'file_path': full_path
-                    })
-                    logger.print_colored_text(f"    -> Found imported dependency `{file_name}` at: {full_path}", logger.hex_color_dict['green'])
+            repo_imports.append({
+                'name': file_name,
+                'file_path': full_path
+            })
+            logger.print_colored_text(f"    -> Found imported dependency `{file_name}` at: {full_path}", logger.hex_color_dict['green'])
 
         return repo_imports
     
@@ -676,10 +771,18 @@ class CalleeConstructor(Extractor):
                 return True
         return False
     
-    def extract_test_objects_from_repo(self, repo_dir: str):
-        """Extract tested objects from repo and get covered functions and methods"""
-        extracted_test_object_dict_list = []
-        processed_dict_list = []
+    def list_python_files(self, repo_dir: str) -> List[str]:
+        """All Python files of the repo, in the order the extraction walks them"""
+        return [os.path.join(root, file) for root, _, files in os.walk(repo_dir) for file in files if file.endswith('.py')]
+    
+    def iter_test_objects_from_repo(self, repo_dir: str):
+        """Extract tested objects from repo and get covered functions and methods (yielded as soon as they are found)"""
+        self.import_graph = load_import_graph(repo_dir, refresh=True)  # index the repo as cloned for this run
+        if self.extract_workers > 1:
+            # Extract every file in parallel up front: the walk below then only hits the parse cache
+            extract_repo_records(self.list_python_files(repo_dir), self.repo_info, self.clone_dir, self.preprocess_filter_strictness, self.extract_workers, blob_cache)
+        extracted_count = 0
+        processed_file_paths = set()
         for root, _, files in os.walk(repo_dir):
             if root != '':
                 logger.info(f"Searching directory: {root}")
@@ -687,10 +790,10 @@ class CalleeConstructor(Extractor):
                     if file.endswith('.py'):
                         file_path = os.path.join(root, file)
 
-                        if file_path in processed_dict_list:
+                        if file_path in processed_file_paths:
                             continue
                         else:
-                            processed_dict_list.append(file_path)
+                            processed_file_paths.add(file_path)
                         
                         if self.check_if_contain_test(file_path) == False: 
                             continue
@@ -706,38 +809,113 @@ class CalleeConstructor(Extractor):
                             file_functions, file_methods = self.extract_functions_and_methods(obj['file_path'])
                             if len(file_functions+file_methods) == 0: 
                                 continue
-                            extracted_test_object_dict_list += [{'usage_root_path': root, 'usage_test_file': file_path, 'pyfile_name': obj['name'], 'pyfile_path': obj['file_path'], 'fms': file_functions+file_methods}]
+                            yield {'usage_root_path': root, 'usage_test_file': file_path, 'pyfile_name': obj['name'], 'pyfile_path': obj['file_path'], 'fms': file_functions+file_methods}
+                            extracted_count += 1
             
             # Stop data extraction if reach raw-data max length
-            if len(extracted_test_object_dict_list) > self.max_extracted_data_to_be_filtered:
+            if extracted_count > self.max_extracted_data_to_be_filtered:
                break
-        return extracted_test_object_dict_list
+    
+    def extract_test_objects_from_repo(self, repo_dir: str):
+        """Extract tested objects from repo and get covered functions and methods"""
+        return list(self.iter_test_objects_from_repo(repo_dir))
+    
+    def stream_test_objects_from_repo(self, args, repo_dir: str, saved_path: str, context_store_path: str):
+        """
+        Yield tested objects while extraction is still walking the repo (in a background thread)
+        - at most `args.stream_queue_size` extracted test objects wait for filtering, so memory stays bounded
+        - the extracted list and the contexts it references are saved incrementally, as for a full extraction
+        - the list is only saved once extraction is complete: if filtering stops early, the next run extracts again
+        """
+        list_writer = JsonListWriter(saved_path)
+        context_ids = set()
+        test_items = stream_in_background(lambda: self.iter_test_objects_from_repo(repo_dir), args.stream_queue_size, 'test-object-extraction')
+        try:
+            for test_item in test_items:
+                list_writer.write(test_item)
+                context_ids.update(fm_dict['context_id'] for fm_dict in test_item['fms'])
+                yield test_item
+            list_writer.finalize()
+            context_store.save(context_store_path, context_ids)
+            logger.pinfo(f"Extraction success! Streamed {list_writer.item_count} test objects to filtering.\n")
+        finally:
+            # Filtering stopped early (instance quota, error): the truncated list must not pass for a complete extraction
+            test_items.close()
+            if not list_writer.file.closed:
+                logger.info(f"Extraction stopped after {list_writer.item_count} streamed test objects: the extracted list is not saved.")
+            list_writer.close()
+    
+    def filter_test_items(self, args, test_items: Iterable[Dict], total_test_items='?', scheduler: CandidateScheduler = None):
+        """Filter the functions/methods of every test item, saving the dataset after each one (items already journaled are skipped)"""
+        print_filter_progress = 0
+        for test_item in test_items:
+            if self.quota_reached():
+                logger.info_with_blue_background(f"Instance quota reached: {len(self.filtered_fm_dict_list)}/{self.instance_quota} valid instances. Stopping construction of `{self.repo_name}`.")
+                break
+            print_filter_progress += 1
+            if self.checkpoint.is_done(self.test_item_key(test_item)):
+                logger.info(f"[Checkpoint] Skipping `{test_item['usage_test_file']}` -> `{test_item['pyfile_name']}`: already processed in a previous run.")
+                continue
+            logger.print_colored_text(f"\n{'=' * 160}", logger.hex_color_dict['cyan'])
+            logger.print_colored_text(f"{' ' * 55} Multi-level Filtering {print_filter_progress}/{total_test_items}: [{test_item['usage_test_file'].split('/')[-1]}]", logger.hex_color_dict['cyan'])
+            logger.print_colored_text(f"{'=' * 160}\n", logger.hex_color_dict['cyan'])
+            new_filtered_fm_dict_list = self.fm_filtering(args, test_item)
+            if scheduler is not None:
+                scheduler.record(test_item, len(new_filtered_fm_dict_list))
+            self.filtered_fm_dict_list += new_filtered_fm_dict_list
+            
+            if len(self.filtered_fm_dict_list) > 0:
+                self.save_to_json(self.filtered_fm_dict_list, f"{self.dataset_save_path}callee_{self.repo_id}_{self.repo_name}.json")
     
     def extract_fm_from_in_test_object(self, args, repo_dir: str):
         # (1) Extract test objects
         potential_saved_path = f"{args.root_path}{args.dataset_path}{self.repo_id}_{self.repo_name}_extracted_test_object_dict_list.json"
+        context_store_path = f"{args.root_path}{args.dataset_path}{self.repo_id}_{self.repo_name}_context_store.json"
         if os.path.exists(potential_saved_path): 
             logger.info(f"Find `extracted_test_object_dict_list` exists at '{potential_saved_path}', which use the existing `extracted_test_object_dict_list` directly")
             extracted_test_object_dict_list = read_test_data(potential_saved_path)
+            if os.path.exists(context_store_path):
+                context_store.load(context_store_path)
+        elif (self.stream_extraction == 1) and (args.history_trace_method == 'blob') and (args.injection_mode == 'mount'):
+            # Filtering starts with the first extracted test object (neither blob tracing nor mount injection touches the walked working tree)
+            logger.info(f"No existing `extracted_test_object_dict_list` at '{potential_saved_path}'. Streaming extraction into filtering...")
+            extracted_test_object_dict_list = self.stream_test_objects_from_repo(args, repo_dir, potential_saved_path, context_store_path)
         else: 
             logger.info(f"No existing `extracted_test_object_dict_list` at '{potential_saved_path}'. Starting extraction...")
             extracted_test_object_dict_list = self.extract_test_objects_from_repo(repo_dir)
+            # Records reference their context by id: each context is saved once, next to the extracted list
+            self.save_to_json(extracted_test_object_dict_list, potential_saved_path)
+            context_store.save(context_store_path, {fm_dict['context_id'] for test_item in extracted_test_object_dict_list for fm_dict in test_item['fms']})
             logger.pinfo("Extraction success!\n")
 
         # (2) Get git log
         self.get_current_git_log(args)
 
-        # (3) Filter extracted functions & methods
-        print_filter_progress = 0
-        for test_item in extracted_test_object_dict_list:
-            print_filter_progress += 1
-            logger.print_colored_text(f"\n{'=' * 160}", logger.hex_color_dict['cyan'])
-            logger.print_colored_text(f"{' ' * 55} Multi-level Filtering {print_filter_progress}/{len(extracted_test_object_dict_list)}: [{test_item['usage_test_file'].split('/')[-1]}]", logger.hex_color_dict['cyan'])
-            logger.print_colored_text(f"{'=' * 160}\n", logger.hex_color_dict['cyan'])
-            self.filtered_fm_dict_list += self.fm_filtering(args, test_item)
-            
-            if len(self.filtered_fm_dict_list) > 0:
-                self.save_to_json(self.filtered_fm_dict_list, f"{self.dataset_save_path}callee_{self.repo_id}_{self.repo_name}.json")
+        # (2.5) Coverage pre-pass: run each unit test file once and record the functions/methods it calls
+        if self.coverage_guided == 1:
+            self.prepare_coverage_mapper(args, extracted_test_object_dict_list if isinstance(extracted_test_object_dict_list, list) else [])
+
+        # (3) Filter extracted functions & methods (resuming from the saved dataset and the checkpoint journal)
+        dataset_save_file = f"{self.dataset_save_path}callee_{self.repo_id}_{self.repo_name}.json"
+        if (self.resume_construction == 1) and os.path.exists(dataset_save_file):
+            self.filtered_fm_dict_list = read_test_data(dataset_save_file)
+            logger.info(f"Resuming construction with {len(self.filtered_fm_dict_list)} saved instances and {len(self.checkpoint.records)} journaled candidates: {self.checkpoint.summary()}")
+        total_test_items = len(extracted_test_object_dict_list) if isinstance(extracted_test_object_dict_list, list) else '?'  # unknown while streaming
+        streamed_test_objects = extracted_test_object_dict_list
+        scheduler = None
+        if self.candidate_scheduling == 1:
+            # Most promising test items first: long histories, larger functions, small test files, productive directories
+            scheduler = self.get_candidate_scheduler(args, not isinstance(extracted_test_object_dict_list, list))
+            extracted_test_object_dict_list = scheduler.schedule(extracted_test_object_dict_list)
+        try:
+            self.filter_test_items(args, extracted_test_object_dict_list, total_test_items, scheduler)
+        finally:
+            # A stopped stream still closes its extracted list writer and saves its contexts
+            if isinstance(extracted_test_object_dict_list, types.GeneratorType):
+                extracted_test_object_dict_list.close()
+            if isinstance(streamed_test_objects, types.GeneratorType):
+                streamed_test_objects.close()
+            self.shutdown_trace_pool()
         
         # Temporary files removal
         instance_info = {
@@ -746,10 +924,14 @@ class CalleeConstructor(Extractor):
         }
         instance = InstanceConfig(**instance_info)
         exe_tester = SandBoxManager(args, instance, None, None)
+        self.execution_scheduler.shutdown()
         
         if args.unittest_exetest_method == 0: 
             exe_tester.remove_after_execution_test()
         else: 
+            close_container_pools()
+            if self.execution_cache is not None:
+                logger.info(f"[Execution cache] {self.execution_cache.summary()}")
             if args.remove_image_after_use:
                 exe_tester.remove_docker_image()
                 
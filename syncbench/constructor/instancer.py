@@ -7,6 +7,7 @@ import astor
 import difflib
 from typing import List, Dict
 from dataclasses import dataclass
+from syncbench.utilizer.blob_cache import blob_cache, blob_sha
 
 @dataclass
 class InstanceConfig:
@@ -26,6 +27,15 @@ class InstanceConfig:
     repo_url: str = None
 
 def remove_fm_in_context_code(function_name: str, source_code: str) -> str:
+    # Each (file version, function/method) pair is processed once per construction run
+    return blob_cache.memoize(
+        blob_sha(source_code), 
+        ('fm_removed', function_name), 
+        lambda: _remove_fm_in_context_code(function_name, source_code), 
+        source_code
+    )
+
+def _remove_fm_in_context_code(function_name: str, source_code: str) -> str:
     class FunctionRemover(ast.NodeTransformer):
         def visit_FunctionDef(self, node):
             if node.name == function_name:
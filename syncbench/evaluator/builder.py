@@ -4,7 +4,7 @@ Docker manager
 
 import os
 import re
-import time
+import uuid
 import subprocess
 
 from utils.logger import logger
@@ -30,9 +30,11 @@ class SandBoxManager(ExecutionTest):
         self.image_workdir = "/workspace"
         self.image_venv_dir = f"{self.image_workdir}/test_venv"
         self.image_venv_bin_dir = f"{self.image_venv_dir}/bin"
+        self.image_install_marker_path = f"{self.image_workdir}/.editable_install.sha256"  # packaging metadata of the editable install snapshot
         # Docker container
-        self.container_name = f"{self.image_name.replace('/', '_')}_container__{instance.fm_name}__{str(time.ctime()).replace(':', '_').replace(' ', '_')}"
+        self.container_name = f"{self.image_name.replace('/', '_')}_container__{instance.fm_name}__{uuid.uuid4().hex[:12]}"
         self.container_workdir = f"{self.image_workdir}/test_repo"
+        self.container_resource_options = (["--cpus", str(args.exetest_cpus)] if args.exetest_cpus > 0 else []) + (["--memory", args.exetest_memory] if args.exetest_memory else [])
         # Additional unit test command
         self.env_additional_unittest_command = args.env_additional_unittest_command
         
@@ -79,6 +81,20 @@ class SandBoxManager(ExecutionTest):
         return package_name
         
     
+    def packaging_metadata_hash_command(self) -> str:
+        """Shell command hashing the packaging metadata of the repo (setup.py, setup.cfg, pyproject.toml)"""
+        return "cat setup.py setup.cfg pyproject.toml 2>/dev/null | sha256sum"
+    
+    
+    def editable_install_command(self) -> str:
+        """Shell command (re)installing the repo in editable mode only if its packaging metadata differs from the image snapshot"""
+        return (
+            f"if [ \"$({self.packaging_metadata_hash_command()})\" != \"$(cat {self.image_install_marker_path} 2>/dev/null)\" ]; then "
+            f"{self.image_venv_bin_dir}/python -m pip install -e . && {self.packaging_metadata_hash_command()} > {self.image_install_marker_path}; "
+            f"fi"
+        )
+        
+    
     def install_dependency_in_image(self, args):
         """Install dependencies in docker image"""
         logger.info(f"Adding dependencies install commands to Dockerfile for docker image '{self.image_name}'...")
@@ -129,6 +145,9 @@ class SandBoxManager(ExecutionTest):
                     install_command = f"RUN {self.image_venv_bin_dir}/{install_command_item}"
                     self.dockerfile_content.append(install_command)
 
+            # Editable install snapshot: test runs skip `pip install -e .` while the packaging metadata is unchanged
+            self.dockerfile_content.append(f"RUN {self.editable_install_command()} || echo 'Editable install failed, it will be retried at test time'")
+
             with open(self.dockerfile_path, 'w') as dockerfile:
                 dockerfile.write("\n".join(self.dockerfile_content))
         
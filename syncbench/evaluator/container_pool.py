@@ -0,0 +1,125 @@
+"""
+Pool of warm docker containers for execution tests
+"""
+
+import uuid
+import queue
+import atexit
+import threading
+import subprocess
+from typing import Dict, List
+
+from utils.logger import logger
+
+
+class ContainerPool(object):
+    """
+    Long-lived containers of one repo image, reused across execution tests
+    - a container is started (`sleep infinity`) once, so the interpreter/filesystem caches stay warm across tests
+    - tests run via `docker exec` after the candidate file is copied into the container
+    - after every test the repo in the container is reset with `git checkout -- .` and `git clean`
+    - a container whose test timed out or whose reset failed is removed, and replaced on the next `acquire`
+    - at most `size` containers exist at a time: `acquire` blocks until one is released
+    """
+    def __init__(self, image_name_with_tag: str, workdir: str, size: int = 1, run_options: List[str] = None):
+        self.image_name_with_tag = image_name_with_tag
+        self.workdir = workdir
+        self.run_options = run_options or []  # e.g. CPU/memory limits
+        self.size = max(1, size)
+        self.idle_containers = queue.Queue()
+        self.containers = set()
+        self.container_count = 0  # started + starting containers
+        self.lock = threading.Lock()
+
+    def run_docker(self, command: List[str], timeout: int = None) -> subprocess.CompletedProcess:
+        return subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+
+    def start_container(self) -> str:
+        container_name = f"{self.image_name_with_tag.replace('/', '_').replace(':', '_')}_pool__{uuid.uuid4().hex[:12]}"
+        logger.info(f"Starting warm container `{container_name}` from docker image '{self.image_name_with_tag}'...")
+        result = self.run_docker(["docker", "run", "-d", "--name", container_name, *self.run_options, "-w", self.workdir, self.image_name_with_tag, "sleep", "infinity"])
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to start container from docker image '{self.image_name_with_tag}': {result.stderr}")
+        return container_name
+
+    def acquire(self) -> str:
+        """Name of an idle container, starting a new one while the pool is not full"""
+        while True:
+            with self.lock:
+                try:
+                    return self.idle_containers.get_nowait()
+                except queue.Empty:
+                    pass
+                if self.container_count < self.size:
+                    self.container_count += 1  # reserve the slot, the container starts outside the lock
+                    break
+            try:
+                return self.idle_containers.get(timeout=1)
+            except queue.Empty:
+                continue  # a removed container frees its slot
+        try:
+            container_name = self.start_container()
+        except Exception:
+            with self.lock:
+                self.container_count -= 1
+            raise
+        with self.lock:
+            self.containers.add(container_name)
+        return container_name
+
+    def release(self, container_name: str, healthy: bool = True):
+        """Reset the container and put it back into the pool (or remove it if it is no longer usable)"""
+        if healthy:
+            reset_result = self.run_docker(self.exec_command(container_name, "git checkout -- . && git clean -fdq -e '*.egg-info'"))
+            healthy = reset_result.returncode == 0
+            if not healthy:
+                logger.warning(f"Failed to reset warm container `{container_name}`: {reset_result.stderr}")
+        if healthy:
+            self.idle_containers.put(container_name)
+        else:
+            self.remove_container(container_name)
+
+    def remove_container(self, container_name: str):
+        self.run_docker(["docker", "rm", "-f", container_name])
+        with self.lock:
+            if container_name in self.containers:
+                self.containers.discard(container_name)
+                self.container_count -= 1
+        logger.info(f"Removed warm container `{container_name}`")
+
+    def copy_into(self, container_name: str, host_path: str, container_path: str) -> bool:
+        """Inject a file (e.g. the out-of-sync candidate) into the container"""
+        result = self.run_docker(["docker", "cp", host_path, f"{container_name}:{container_path}"])
+        return result.returncode == 0
+
+    def exec_command(self, container_name: str, shell_command: str) -> List[str]:
+        return ["docker", "exec", "-w", self.workdir, container_name, "/bin/bash", "-c", shell_command]
+
+    def close(self):
+        """Remove every container of the pool"""
+        while not self.idle_containers.empty():
+            self.idle_containers.get_nowait()
+        for container_name in list(self.containers):
+            self.remove_container(container_name)
+
+
+container_pools: Dict[str, ContainerPool] = {}  # docker image (name:tag) -> pool
+container_pools_lock = threading.Lock()
+
+
+def get_container_pool(image_name_with_tag: str, workdir: str, size: int, run_options: List[str] = None) -> ContainerPool:
+    """Container pool of a docker image, shared by all execution tests of the process"""
+    with container_pools_lock:
+        if image_name_with_tag not in container_pools:
+            container_pools[image_name_with_tag] = ContainerPool(image_name_with_tag, workdir, size, run_options)
+        return container_pools[image_name_with_tag]
+
+
+def close_container_pools():
+    """Remove the warm containers of every pool (e.g. once a repo is constructed)"""
+    while container_pools:
+        _, container_pool = container_pools.popitem()
+        container_pool.close()
+
+
+atexit.register(close_container_pools)
@@ -0,0 +1,129 @@
+"""
+Coverage-guided test -> function/method mapping in isolated docker container
+"""
+
+import os
+import uuid
+import subprocess
+from typing import Dict, List
+
+from utils.logger import logger
+from utils.json_util import save_to_json, read_test_data
+from syncbench.evaluator.builder import SandBoxManager
+
+
+# Runs one test file under `sys.settrace` and records the functions/methods of the repo that were called
+COVERAGE_RUNNER = r'''
+import os
+import sys
+import json
+import threading
+
+repo_dir, test_file, output_path, test_method = sys.argv[1:5]
+additional_args = sys.argv[5:]
+repo_dir = os.path.abspath(repo_dir)
+covered = {}
+
+
+def trace_calls(frame, event, arg):
+    if event == 'call':
+        file_path = os.path.abspath(frame.f_code.co_filename)
+        if file_path.startswith(repo_dir + os.sep):
+            covered.setdefault(os.path.relpath(file_path, repo_dir), set()).add(frame.f_code.co_name)
+    return None  # no line-level tracing
+
+
+sys.path.insert(0, repo_dir)
+sys.settrace(trace_calls)
+threading.settrace(trace_calls)
+try:
+    if test_method == 'pytest':
+        import pytest
+        pytest.main(['-q', '-p', 'no:cacheprovider', test_file] + additional_args)
+    else:
+        import unittest
+        unittest.main(module=None, argv=['unittest', test_file] + additional_args, exit=False)
+finally:
+    sys.settrace(None)
+    threading.settrace(None)
+    with open(output_path, 'w') as output_file:
+        json.dump({file_path: sorted(names) for file_path, names in covered.items()}, output_file)
+'''
+
+
+class CoverageMapper(SandBoxManager):
+    """
+    Coverage pre-pass of dataset construction
+    - runs each unit test file once in the repo image under `sys.settrace`
+    - records which functions/methods of the repo the test actually calls: {test file: {file: [names]}}
+    - the map is persisted per repo, so reruns and resumed constructions do not execute a test file again
+    - a test file whose coverage run fails or times out maps to None: all its functions/methods are kept
+    """
+    def __init__(self, args, instance, repo_dir: str, coverage_map_path: str):
+        super().__init__(args, instance, None, None)
+        self.timeout = args.timeout
+        self.repo_dir = repo_dir  # host copy of the repo in the image
+        self.coverage_map_path = coverage_map_path
+        self.coverage_dir = os.path.abspath(os.path.dirname(coverage_map_path))  # mounted into the container
+        self.container_coverage_dir = "/syncbench_coverage"
+        self.runner_path = os.path.join(self.coverage_dir, "coverage_runner.py")
+        self.coverage_map: Dict[str, Dict[str, List[str]]] = {}
+        if os.path.exists(coverage_map_path):
+            self.coverage_map = read_test_data(coverage_map_path)
+
+    def write_runner(self):
+        if not os.path.exists(self.runner_path):
+            with open(self.runner_path, 'w') as runner_file:
+                runner_file.write(COVERAGE_RUNNER)
+
+    def run_coverage_in_container(self, test_rel_path: str) -> Dict[str, List[str]]:
+        """Run one test file under the coverage runner, return {file: [called functions/methods]} or None"""
+        self.write_runner()
+        output_name = f"coverage_{uuid.uuid4().hex}.json"
+        output_path = os.path.join(self.coverage_dir, output_name)
+        container_name = f"{self.image_name.replace('/', '_')}_coverage__{uuid.uuid4().hex[:12]}"
+        run_command = [
+            "docker", "run", "--rm", "--name", container_name, *self.container_resource_options,
+            "-v", f"{self.coverage_dir}:{self.container_coverage_dir}",
+            "-w", f"{self.container_workdir}",
+            f"{self.image_name}:{self.image_tag}",
+            "/bin/bash", "-c",
+            f"export PYTHONPATH=$PYTHONPATH:{self.container_workdir} && "
+            f"({self.editable_install_command()}) > /dev/null 2>&1; "
+            f"{self.image_venv_bin_dir}/python {self.container_coverage_dir}/coverage_runner.py "
+            f"{self.container_workdir} {self.container_workdir}/{test_rel_path} {self.container_coverage_dir}/{output_name} {self.test_method} "
+            f"{self.env_additional_unittest_command} "
+        ]
+        try:
+            subprocess.run(run_command, capture_output=True, text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"[Coverage] Coverage run of `{test_rel_path}` timed out after {self.timeout}s: keeping all its functions/methods.")
+            subprocess.run(["docker", "rm", "-f", container_name], capture_output=True, text=True)
+            return None
+
+        if not os.path.exists(output_path):
+            logger.warning(f"[Coverage] Coverage run of `{test_rel_path}` produced no coverage map: keeping all its functions/methods.")
+            return None
+        try:
+            return read_test_data(output_path)
+        finally:
+            os.remove(output_path)
+
+    def get_coverage(self, test_file_path: str) -> Dict[str, List[str]]:
+        """Functions/methods called by a test file (run once per test file)"""
+        test_rel_path = os.path.relpath(test_file_path, self.repo_dir)
+        if test_rel_path not in self.coverage_map:
+            logger.info(f"[Coverage] Running `{test_rel_path}` once to record the functions/methods it calls...")
+            self.coverage_map[test_rel_path] = self.run_coverage_in_container(test_rel_path)
+            save_to_json(self.coverage_map, self.coverage_map_path)
+        return self.coverage_map[test_rel_path]
+
+    def is_covered(self, coverage: Dict[str, List[str]], fm_dict: Dict) -> bool:
+        return fm_dict['name'] in coverage.get(os.path.relpath(fm_dict['whole_file_path'], self.repo_dir), [])
+
+    def filter_covered(self, test_file_path: str, fm_list: List[Dict]) -> List[Dict]:
+        """Functions/methods of `fm_list` the test file actually calls (all of them if its coverage is unknown)"""
+        coverage = self.get_coverage(test_file_path)
+        if coverage is None:
+            return fm_list
+        return [fm_dict for fm_dict in fm_list if self.is_covered(coverage, fm_dict)]
@@ -0,0 +1,108 @@
+"""
+Persistent cache of sandbox execution test results
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import subprocess
+from typing import Dict
+from utils.logger import logger
+
+
+class ExecutionCache(object):
+    """
+    On-disk (SQLite) cache of execution test results for one repository
+    - keyed by (docker image id, test file path, content hash of every injected file, test command)
+    - a rebuilt image gets a new id, so its results are never mixed with those of the previous image
+    - shared by callee and caller construction, and reused across reruns
+    - only runs whose test results were parsed are stored: timeouts, invalid tests and docker errors are retried next time
+    - safe to share between the threads of concurrent execution tests
+    """
+    schema_version = '2'
+    docker_error_returncodes = (125, 126, 127)  # docker daemon/run error, command cannot be invoked, command not found
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.connection = sqlite3.connect(cache_path, timeout=60, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.create_tables()
+
+    def create_tables(self):
+        """Create cache tables if they do not exist yet"""
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if (row is not None) and (row[0] != self.schema_version):
+                logger.info(f"Execution cache schema changed ({row[0]} -> {self.schema_version}). Rebuilding `{self.cache_path}`...")
+                self.connection.execute("DROP TABLE IF EXISTS results")
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (self.schema_version,))
+            self.connection.execute("CREATE TABLE IF NOT EXISTS results (cache_key TEXT PRIMARY KEY, image_id TEXT, test_file_path TEXT, result TEXT)")
+
+    @staticmethod
+    def make_key(image_id: str, test_file_path: str, injected_files: Dict[str, str], command: str) -> str:
+        """Cache key of an execution: `injected_files` maps each injected file (path in the repo) to its content"""
+        injected_hashes = {
+            file_path: hashlib.sha256(code.encode('utf-8', errors='replace')).hexdigest() for file_path, code in injected_files.items()
+        }
+        key_data = json.dumps([image_id, test_file_path, injected_hashes, command], sort_keys=True)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def serialize(self, test_eval) -> str:
+        """JSON of an execution test result, or None if it must not (or cannot) be cached"""
+        if (not isinstance(test_eval, dict)) or (not isinstance(test_eval.get('exe_result'), (subprocess.CompletedProcess, subprocess.CalledProcessError))):
+            return None  # 'Timeout', 'Invalid Test', or an error result of the recovery tasks
+        exe_result = test_eval['exe_result']
+        if exe_result.returncode in self.docker_error_returncodes:
+            return None  # the sandbox failed, not the test
+        return json.dumps({
+            **{key: value for key, value in test_eval.items() if key != 'exe_result'},
+            'exe_result': {
+                'args': exe_result.args if isinstance(exe_result, subprocess.CompletedProcess) else exe_result.cmd,
+                'returncode': exe_result.returncode,
+                'stdout': exe_result.stdout,
+                'stderr': exe_result.stderr
+            }
+        })
+
+    def deserialize(self, result: str):
+        test_eval = json.loads(result)
+        exe_result = test_eval['exe_result']
+        test_eval['exe_result'] = subprocess.CompletedProcess(exe_result['args'], exe_result['returncode'], exe_result['stdout'], exe_result['stderr'])
+        return test_eval
+
+    def get(self, cache_key: str):
+        """Cached execution test result, or None"""
+        with self.lock:
+            row = self.connection.execute("SELECT result FROM results WHERE cache_key = ?", (cache_key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self.deserialize(row[0])
+
+    def put(self, cache_key: str, test_eval, image_id: str = '', test_file_path: str = ''):
+        """Store an execution test result (timed out runs, invalid tests and docker errors are skipped)"""
+        result = self.serialize(test_eval)
+        if result is None:
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (cache_key, image_id, test_file_path, result) VALUES (?, ?, ?, ?)",
+                (cache_key, image_id, test_file_path, result)
+            )
+
+    def hit_rate(self) -> float:
+        lookup_count = self.hits + self.misses
+        return self.hits / lookup_count if lookup_count else 0.0
+
+    def summary(self) -> str:
+        return f"{self.hits} hits / {self.hits + self.misses} lookups ({self.hit_rate():.1%} hit rate)"
+
+    def close(self):
+        self.connection.close()
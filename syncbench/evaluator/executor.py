@@ -0,0 +1,55 @@
+"""
+Bounded-concurrency scheduling of execution tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DeferredExecution(object):
+    """Future-like execution run in the calling thread on its first `result()` call"""
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.finished = False
+        self.cancelled = False
+        self.value = None
+        self.error = None
+
+    def result(self):
+        if not self.finished:
+            try:
+                self.value = self.function(*self.args, **self.kwargs)
+            except Exception as e:
+                self.error = e
+            self.finished = True
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def cancel(self) -> bool:
+        if self.finished:
+            return False
+        self.cancelled = True
+        return True
+
+
+class ExecutionScheduler(object):
+    """
+    Run independent execution tests (each in its own container) on a bounded number of worker threads
+    - `submit` returns a future; the caller consumes results in submission order, so its decisions never depend on completion order
+    - with a single worker, executions are deferred and only run when their result is needed: filtering stays strictly sequential
+    """
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='exetest') if self.workers > 1 else None
+
+    def submit(self, function, *args, **kwargs):
+        if self.executor is None:
+            return DeferredExecution(function, args, kwargs)
+        return self.executor.submit(function, *args, **kwargs)
+
+    def shutdown(self):
+        """Wait for running executions and drop the queued ones"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
@@ -7,8 +7,7 @@ import subprocess
 import shutil
 import re
 import git
-import autopep8
-from syncbench.utilizer.aligner import align_agent_context
+from syncbench.utilizer.aligner import align_agent_context, format_code
 from syncbench.evaluator.handler import DockerHandler
 from utils.logger import logger
 
@@ -37,12 +36,8 @@ class ExecutionTest(object):
         
 
     def correct_indentation(self, code: str) -> str:
-        """Python code format correction"""
-        try:
-            corrected_code = autopep8.fix_code(code, options={'indent_size': 4})
-            return corrected_code
-        except Exception as e:
-            return code
+        """Python code format correction (memoized by code content)"""
+        return format_code(code)
     
     def run_command(self, command, cwd=None, env=None):
         """Run a shell command"""
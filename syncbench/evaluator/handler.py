@@ -3,7 +3,7 @@ Download the folder from a docker image to local host
 """
 
 import os
-import time
+import uuid
 import subprocess
 from utils.logger import logger
 
@@ -12,7 +12,7 @@ class DockerHandler:
     def __init__(self, image_name_with_tag: str, local_file_path: str):
         self.image_name_with_tag = image_name_with_tag
         self.container_path = '/workspace/test_repo'
-        self.container_name = f'{image_name_with_tag.replace('/', '_').replace(':', '_')}' + "__" + str(time.asctime()).replace(" ", "__").replace(":", "_") + f"__{self.container_path.split('/')[-1]}__dockerhandler"
+        self.container_name = f'{image_name_with_tag.replace('/', '_').replace(':', '_')}' + "__" + uuid.uuid4().hex[:12] + f"__{self.container_path.split('/')[-1]}__dockerhandler"
         self.local_path = local_file_path
         self.ensure_path_exists(self.local_path)
 
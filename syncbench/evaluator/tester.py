@@ -4,16 +4,20 @@ SandBox execution test in isolated docker container
 
 import re
 import os
-import time
+import uuid
 import shutil
+import tempfile
 import subprocess
+from typing import Dict
 
 from utils.logger import logger
 from syncbench.utilizer.aligner import align_agent_context
 from syncbench.evaluator.builder import SandBoxManager
+from syncbench.evaluator.container_pool import get_container_pool
+from syncbench.evaluator.execution_cache import ExecutionCache
 
 class SandBoxET(SandBoxManager):
-    def __init__(self, args, instance, agent_revised_code, corresponding_context_code, docker_image_id, if_gold_unit_test):
+    def __init__(self, args, instance, agent_revised_code, corresponding_context_code, docker_image_id, if_gold_unit_test, execution_cache: ExecutionCache = None):
         super().__init__(args, instance, agent_revised_code, corresponding_context_code)
         # Task
         self.task = args.task
@@ -24,19 +28,26 @@ class SandBoxET(SandBoxManager):
         self.agent_code_path = instance.fm_file_path
         self.agent_revised_code = agent_revised_code
         self.context_code = corresponding_context_code
-        # Repo
-        self.clone_repository_from_image()
-            
-        self.agent_revised_code_with_context()
         # Docker image
         self.image_id = docker_image_id # override
         # Docker container
         self.container_workdir = f"{self.image_workdir}/test_repo"
         self.container = None
         self.container_id = ''
-        self.container_name = f"{self.image_name.replace('/', '_')}_container__{instance.fm_name}__{str(time.ctime()).replace(':', '_').replace(' ', '_')}"
+        self.container_name = f"{self.image_name.replace('/', '_')}_container__{instance.fm_name}__{uuid.uuid4().hex[:12]}"
+        self.container_pool_size = max(args.container_pool_size, args.exetest_workers) if args.container_pool_size > 0 else 0  # 0: fresh container per test
         # Additional test command
         self.env_additional_unittest_command = args.env_additional_unittest_command
+        # Execution cache: only runs whose test results were parsed are cached
+        self.execution_cache = execution_cache
+        self.parsed_test_count = 0
+        # Injection directory (mount injection mode): holds only the candidate file, laid out as in the repo
+        self.injection_dir = None
+
+    def prepare_sandbox(self):
+        """Clone the repo from the docker image (if needed) and write the aligned agent code into it"""
+        self.clone_repository_from_image()
+        self.agent_revised_code_with_context()
 
     def ensure_agent_code_path_exists(self):
         """Check if the path exists"""
@@ -60,6 +71,51 @@ class SandBoxET(SandBoxManager):
                     file.write(self.agent_revised_code)
                 logger.info(f"Successfully saved aligned_code to '{self.agent_code_path}'")
 
+    def prepare_injection(self):
+        """Write only the aligned candidate file to a temporary directory, to be mounted (or copied) over its path in the image"""
+        self.injection_dir = tempfile.mkdtemp(prefix='syncbench_injection_')
+        injected_code_path = os.path.join(self.injection_dir, 'test_repo', self.agent_code_path.split('test_repo/')[1])
+        self.agent_code_path = injected_code_path
+        if self.if_gold_unit_test:
+            return  # gold code is the code of the image
+        aligned_code = self.get_aligned_code()
+        if aligned_code is None:
+            return  # nothing to inject: the test runs on the image code, as with a cloned repo
+        os.makedirs(os.path.dirname(injected_code_path), exist_ok=True)
+        with open(injected_code_path, 'w') as file:
+            file.write(aligned_code)
+        logger.info(f"Successfully saved aligned_code to '{injected_code_path}'")
+
+    def get_aligned_code(self):
+        """Agent code aligned with its complete context code (None if the context of the file is missing)"""
+        for context_item in self.context_code:
+            if self.fm_file_name == context_item['name']:
+                return align_agent_context(self.agent_revised_code, context_item['complete_code'])
+        return None
+
+    def execution_cache_key(self):
+        """Execution cache key: image, test file, injected code (history tests only) and test command"""
+        test_rel_path = self.usage_test_file_path.split('test_repo/')[1]
+        injected_files = {}
+        if not self.if_gold_unit_test:
+            aligned_code = self.get_aligned_code()
+            if aligned_code is None:
+                return None  # the mounted file is whatever the cloned repo holds: not cacheable
+            injected_files[self.agent_code_path.split('test_repo/')[1]] = aligned_code
+        return ExecutionCache.make_key(self.image_id, test_rel_path, injected_files, self.build_unittest_command(f"{self.container_workdir}/{test_rel_path}"))
+
+    def get_cached_result(self):
+        """Cached result of this execution test (None if not cached), checked before the sandbox is prepared"""
+        if self.execution_cache is None:
+            return None
+        cache_key = self.execution_cache_key()
+        if cache_key is None:
+            return None
+        test_eval = self.execution_cache.get(cache_key)
+        if test_eval is not None:
+            logger.info(f"[Execution cache] Reusing the {'gold' if self.if_gold_unit_test else 'out-of-sync'} execution result of `{self.usage_test_file_path.split('/')[-1]}`: {self.execution_cache.summary()}")
+        return test_eval
+
     def remove_docker_container(self):
         """Stop and reomve docker container"""
         try:
@@ -276,6 +332,56 @@ class SandBoxET(SandBoxManager):
         return False
     
     
+    def build_unittest_command(self, test_file_path_in_container: str) -> str:
+        """Shell command running the unit test file in the container (reinstalling the repo only if its packaging metadata changed)"""
+        return (
+            f"export PYTHONPATH=$PYTHONPATH:{self.container_workdir} && "
+            f"{self.editable_install_command()} && "
+            f"{self.image_venv_bin_dir}/python -m {self.test_method} -v {test_file_path_in_container} "
+            f"{self.env_additional_unittest_command} "
+        )
+    
+    
+    def run_unittest_in_pool(self, test_file_path_in_container: str, injected_files: Dict[str, str]):
+        """Run unit test via `docker exec` in a warm container of the repo image, after copying `injected_files` (host -> container path) into it"""
+        container_pool = get_container_pool(self.image_name_with_tag, self.container_workdir, self.container_pool_size, self.container_resource_options)
+        container_name = container_pool.acquire()
+        healthy = False
+        try:
+            for host_path, container_path in injected_files.items():
+                if not container_pool.copy_into(container_name, host_path, container_path):
+                    raise RuntimeError(f"Failed to copy '{host_path}' into warm container `{container_name}`")
+            logger.info(f"Running unit test using file `{test_file_path_in_container}` in warm Docker container `{container_name}`...")
+            exe_result = self.run_unittest_in_container(container_pool.exec_command(container_name, self.build_unittest_command(test_file_path_in_container)))
+            healthy = exe_result != 'Timeout'  # a timed out test may still be running in the container
+            return exe_result
+        finally:
+            container_pool.release(container_name, healthy)
+    
+    
+    def execute_unittest(self, test_file_path_in_container: str, injected_files: Dict[str, str]):
+        """Run unit test in a warm pooled container, or in a fresh container with `injected_files` (host -> container path) mounted"""
+        if self.is_command_length_exceeded([self.build_unittest_command(test_file_path_in_container)]):
+            logger.warning("Current command length exceeds the system's maximum allowable length. Skipping this command...")
+            return 'Invalid Test'
+        if self.container_pool_size > 0:
+            try:
+                return self.run_unittest_in_pool(test_file_path_in_container, injected_files)
+            except RuntimeError as e:
+                logger.warning(f"Warm container unavailable: {e}\nRunning unit test in a fresh container instead...")
+
+        run_command = ["docker", "run", "--rm", "--name", self.container_name] + self.container_resource_options
+        for host_path, container_path in injected_files.items():
+            run_command += ["-v", f"{host_path}:{container_path}"]  # Mount the file into the container
+        run_command += [
+            "-w", f"{self.container_workdir}",
+            f"{self.image_name}:{self.image_tag}",
+            "/bin/bash", "-c",
+            self.build_unittest_command(test_file_path_in_container)
+        ]
+        return self.run_unittest_in_container(run_command)
+    
+    
     def run_unittest_for_gold_code(self):
         """Run unit test for gold code"""
         test_file_path_in_container = f"{self.container_workdir}/{self.usage_test_file_path.split('test_repo/')[1]}"
@@ -284,20 +390,9 @@ class SandBoxET(SandBoxManager):
         
         # Run unit test
         try:
-            run_command = [
-                "docker", "run", "--rm", "--name", self.container_name,
-                "-w", f"{self.container_workdir}",
-                f"{self.image_name}:{self.image_tag}",
-                "/bin/bash", "-c",
-                f"export PYTHONPATH=$PYTHONPATH:{self.container_workdir} && "
-                f"{self.image_venv_bin_dir}/python -m pip install -e . && "
-                f"{self.image_venv_bin_dir}/python -m {self.test_method} -v {test_file_path_in_container} "
-                f"{self.env_additional_unittest_command} "
-            ]
-            if self.is_command_length_exceeded(run_command):
-                logger.warning("Current command length exceeds the system's maximum allowable length. Skipping this command...")
-                return 'Invalid Test'
-            exe_result = self.run_unittest_in_container(run_command)
+            exe_result = self.execute_unittest(test_file_path_in_container, {})
+            if exe_result == 'Invalid Test':
+                return exe_result
 
             # If timeout
             if exe_result == 'Timeout':
@@ -328,6 +423,7 @@ class SandBoxET(SandBoxManager):
             
             # Count the number of tests: passes, failed, skipped
             test_count, result_summary = self.test_result_count(exe_result)
+            self.parsed_test_count = test_count
             if test_count:
                 logger.info(f"Number of tests executed in gold unit test: {test_count}")  # passed + failed + error
             else:
@@ -369,21 +465,10 @@ class SandBoxET(SandBoxManager):
 
         try:            
             # Run unit test
-            run_command = [
-                "docker", "run", "--rm", "--name", self.container_name,
-                "-v", f"{self.agent_code_path}:{restored_code_path}",  # Mount the file into the container
-                "-w", f"{self.container_workdir}",
-                f"{self.image_name}:{self.image_tag}",
-                "/bin/bash", "-c",
-                f"export PYTHONPATH=$PYTHONPATH:{self.container_workdir} && "
-                f"{self.image_venv_bin_dir}/python -m pip install -e . && "
-                f"{self.image_venv_bin_dir}/python -m {self.test_method} -v {test_file_path_in_container} "
-                f"{self.env_additional_unittest_command} "
-            ]
-            if self.is_command_length_exceeded(run_command):
-                logger.warning("Current command length exceeds the system's maximum allowable length. Skipping this command...")
-                return 'Invalid Test'
-            exe_result = self.run_unittest_in_container(run_command)
+            injected_files = {self.agent_code_path: restored_code_path} if os.path.exists(self.agent_code_path) else {}
+            exe_result = self.execute_unittest(test_file_path_in_container, injected_files)
+            if exe_result == 'Invalid Test':
+                return exe_result
 
             # If timeout
             if exe_result == 'Timeout':
@@ -414,6 +499,7 @@ class SandBoxET(SandBoxManager):
             
             # Count the number of tests: passes, failed, skipped
             test_count, result_summary = self.test_result_count(exe_result)
+            self.parsed_test_count = test_count
 
             # If error before unit test
             if test_count == 0:
@@ -466,9 +552,16 @@ class SandBoxET(SandBoxManager):
             execution_test_result = self.run_unittest_for_gold_code()
         else:
             execution_test_result = self.run_unittest_for_history_code()
+        if (self.execution_cache is not None) and self.parsed_test_count:
+            cache_key = self.execution_cache_key()
+            if cache_key is not None:
+                self.execution_cache.put(cache_key, execution_test_result, self.image_id, self.usage_test_file_path.split('test_repo/')[1])
         return execution_test_result
         
     def sandbox_clean_up(self):
         self.remove_docker_container()
         # self.remove_docker_image()  # TODO: comment out if needed
-        self.clean_directory_removal()
+        if self.injection_dir is not None:
+            shutil.rmtree(self.injection_dir, ignore_errors=True)
+        else:
+            self.clean_directory_removal()
@@ -23,6 +23,12 @@ if __name__ == '__main__':
     parser.add_argument('--dataset', type=str, default='callee', help='Dataset name: callee | caller', choices=['callee', 'caller'])
     parser.add_argument('--unittest_mode', type=str, default='fp', help='[Unit test mode] fp: fail-to-pass only | pp: pass-to-pass only | both: fail-to-pass and pass-to-pass', choices=['fp', 'pp', 'both'])
     parser.add_argument('--unittest_exetest_method', type=int, default=1, help='Execution test method for error log generation (1: sandbox | 0: local venv)', choices=[0, 1])
+    parser.add_argument('--exetest_workers', type=int, default=1, help='Number of sandbox execution tests run concurrently during filtering: the gold test and the out-of-sync tests of upcoming commits run ahead, while valid/invalid decisions are still taken in history order. Only used with `--injection_mode mount`')
+    parser.add_argument('--exetest_cpus', type=float, default=0, help='CPU limit of each execution test container, passed to `docker run --cpus` (0: no limit)')
+    parser.add_argument('--exetest_memory', type=str, default='', help='Memory limit of each execution test container, passed to `docker run --memory`, e.g. `4g` (empty: no limit)')
+    parser.add_argument('--injection_mode', type=str, default='mount', help='How the candidate code reaches the sandbox of an execution test (mount: write only the candidate file to a temporary directory and mount/copy it over its path in the image | clone: copy the whole repo out of the image and write the candidate file into it)', choices=['mount', 'clone'])
+    parser.add_argument('--execution_cache', type=int, default=1, help='Persist sandbox execution test results in a per-repo SQLite cache keyed by docker image id, test file, injected code and test command, shared by callee/caller construction and reruns. Timed out runs are never cached (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--container_pool_size', type=int, default=1, help='Number of warm containers kept per repo image for sandbox execution tests. Tests run via `docker exec` in a warm container that is reset with `git checkout`/`git clean` afterwards (0: fresh `docker run` per test)')
     parser.add_argument('--dockerhub_username', type=str, default='xuehang', help='Docker Hub user name')
 
     # Path
@@ -32,14 +38,30 @@ if __name__ == '__main__':
     # Git
     parser.add_argument('--git_start', type=int, default=0, help='Start index of github repo for git log downloading')
     parser.add_argument('--git_end', type=int, default=100, help='End index of github repo for git log downloading')
+    parser.add_argument('--git_workers', type=int, default=8, help='Number of repos whose git logs are downloaded concurrently')
+    parser.add_argument('--git_resume', type=int, default=0, help='Resume git log downloading by skipping repos that already have a git log file, instead of cleaning up the git log directory first (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--git_incremental', type=int, default=0, help='Incremental git log refresh: keep the partial clone of each repo and the last processed HEAD, then only fetch new commits and prepend their log to the existing git log (0: NO | 1: YES)', choices=[0, 1])
     
     # Dataset construction
     parser.add_argument('--max_extraction_data_length', type=int, default=1000000, help='Maximum length of extracted data to be filtered.')
     parser.add_argument('--timeout', type=int, default=600, help='Maximum timeout in seconds. Set to `600s = 10min` by default.')
     parser.add_argument('--preprocess_filter_strictness', type=int, default=0, help='If would like to implement strict function and method filtering in data preprocessing (0: general filtering | 1: strict filtering). Please be noted that selecting `1: strict filtering` may result in no collected data eventually as all candidates may be filtered out.', choices=[0, 1])
+    parser.add_argument('--extract_workers', type=int, default=1, help='Number of worker processes used to extract functions/methods from repo files in parallel before test-object extraction. Results are merged in walk order, so the extracted data matches serial extraction (1: serial extraction)')
+    parser.add_argument('--stream_extraction', type=int, default=1, help='Stream extracted test objects into filtering while the repo is still being walked, instead of extracting all of them first. Only used with `--history_trace_method blob` and `--injection_mode mount`, as checkout tracing and clone injection rewrite the walked working tree (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--stream_queue_size', type=int, default=64, help='Maximum number of extracted test objects waiting for filtering when streaming extraction')
+    parser.add_argument('--candidate_scheduling', type=int, default=1, help='Filter the extracted test objects best-first, ranked by the history length of their functions/methods (commit table), function/method size, test file size and the valid-instance rate of their test directory so far. When streaming extraction, only the queued test objects are ranked (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--instance_quota', type=int, default=0, help='Stop constructing a repo once it has this many valid instances (0: no quota)')
+    parser.add_argument('--history_trace_method', type=str, default='blob', help='How historical file versions are read when tracing commits (blob: read commit trees and blobs from the git object database without touching the working tree | checkout: `git checkout` every commit and read from the working tree)', choices=['blob', 'checkout'])
+    parser.add_argument('--body_change_only', type=int, default=1, help='Only trace commits that changed the source span of the function/method itself, instead of every commit that touched its file (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--history_index', type=int, default=1, help='Persist traced function/method histories in a per-repo SQLite index shared by callee/caller construction and reruns. The index is invalidated automatically once the repo HEAD changes (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--commit_table', type=int, default=1, help='Parse the git log of each repo into a columnar commit table (Parquet) and look up the commits of a file there instead of walking the history again (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--trace_workers', type=int, default=1, help='Number of worker processes used to trace function/method histories in parallel. Workers read git objects directly and never touch the working tree (1: serial tracing)')
+    parser.add_argument('--blob_cache_size', type=int, default=512, help='Size bound in MB of the in-memory cache of parsed and formatted file versions, keyed by git blob SHA. Least recently used file versions are evicted first.')
     parser.add_argument('--commit_trace_mode', type=int, default=0, help='Trace all commits for each function/method code or only the oldest commit. Noted that tracing only oldest commit will increase out-of-sync recovery task complexity. (0: all commits| 1: oldest commit only)', choices=[0, 1])
     parser.add_argument('--construct_start', type=int, default=0, help='Repo starting index for dataset construction. Max range = [0, len(repo_source_dict_list))')
     parser.add_argument('--construct_end', type=int, default=1000, help='Repo ending index for dataset construction. Max range = [0, len(repo_source_dict_list))')
+    parser.add_argument('--coverage_guided', type=int, default=0, help='Run each unit test file once in the repo image under `sys.settrace` before filtering, and only consider the functions/methods the test actually calls. Test files whose coverage run fails keep all their functions/methods (0: NO | 1: YES)', choices=[0, 1])
+    parser.add_argument('--resume_construction', type=int, default=0, help='Resume an interrupted callee/caller construction: keep the code directory, reload the saved dataset and skip every test file and commit already recorded in the checkpoint journal (0: NO, start over | 1: YES)', choices=[0, 1])
     parser.add_argument('--construct_source', type=str, default='instance', help='SyncBench construction source')
     
     # Downsampling
@@ -75,6 +97,10 @@ if __name__ == '__main__':
     args.resync_log_path = '/resync_log/'
     args.eval_log_path = '/eval_log/'
     args.code_path = '/code/'
+    args.history_index_path = '/history_index/'
+    args.execution_cache_path = '/execution_cache/'
+    args.checkpoint_path = '/checkpoint/'
+    args.coverage_path = '/coverage/'
     args.repo_path = args.code_path
     args.repo_source_dict_list = read_test_data(args.data_source_path)
     args.env_python_version = '3.11'
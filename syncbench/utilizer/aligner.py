@@ -4,6 +4,7 @@ Align agent code to context code
 
 import ast
 import autopep8
+from syncbench.utilizer.blob_cache import blob_cache, blob_sha
 from utils.logger import logger
 
 
@@ -15,6 +16,12 @@ def correct_indentation(code: str) -> str:
     except Exception as e:
         logger.warning(f"[Invalid Code Format Correction] An error occurred:\n{e}\nDirectly returning original code...")
         return code
+
+def format_code(code: str) -> str:
+    """Python code format correction, run once per unique code content (memoized in the shared blob cache)"""
+    if not code:
+        return code
+    return blob_cache.memoize(blob_sha(code), 'formatted_code', lambda: correct_indentation(code))
     
 def remove_leading_spaces(input_str: str) -> str:
     """Remove leading blank spaces"""
@@ -84,4 +91,4 @@ def align_agent_context(agent_code: str, context_code: str) -> str:
     else: 
         logger.info(f"Successfully found and replaced the code of function/method `{func_name}` in the context_code.")
 
-    return correct_indentation(aligned_agent_code)
+    return format_code(aligned_agent_code)
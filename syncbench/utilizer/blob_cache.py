@@ -0,0 +1,126 @@
+"""
+Content-addressed cache of parsed and formatted file versions
+"""
+
+import ast
+import hashlib
+import threading
+from textwrap import dedent
+from collections import OrderedDict
+
+
+def blob_sha(text: str) -> str:
+    """Git blob SHA of a text (equals git's own blob SHA for UTF-8 files with LF line endings)"""
+    data = text.encode('utf-8', errors='replace')
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class BlobCache(object):
+    """
+    LRU cache keyed by git blob SHA
+    - text: raw file text
+    - symbols: function/method name -> dedented source, derived from the AST of the file
+    - derived values (formatted text, formatted function code, ...) via `memoize`
+    Entries are evicted least-recently-used first once the cached text (values and derived keys) exceeds `max_bytes`.
+    """
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def _get_entry(self, sha: str, text: str = None, create: bool = True):
+        """Get the entry of a blob, creating it (with `text` if known) if it is not cached yet"""
+        with self.lock:
+            entry = self.entries.get(sha)
+            if entry is not None:
+                if (entry['text'] is None) and (text is not None):
+                    entry['text'] = text
+                    self._grow(entry, text)
+                self.entries.move_to_end(sha)
+                return entry
+            if not create:
+                return None
+            entry = {'sha': sha, 'text': text, 'symbols': None, 'derived': {}, 'size': len(text) if text is not None else 0}
+            self.entries[sha] = entry
+            self.total_bytes += entry['size']
+            self._evict()
+            return entry
+
+    @staticmethod
+    def _sizeof(value) -> int:
+        """Cached text size of a value: strings, possibly nested in tuples/lists (e.g. derived keys)"""
+        if isinstance(value, str):
+            return len(value)
+        if isinstance(value, (tuple, list)):
+            return sum(BlobCache._sizeof(item) for item in value)
+        return 0
+
+    def _grow(self, entry: dict, *values):
+        """Account for derived values (and their keys) stored on an entry"""
+        size = sum(self._sizeof(value) for value in values)
+        if size and (self.entries.get(entry['sha']) is entry):
+            entry['size'] += size
+            self.total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        while (self.total_bytes > self.max_bytes) and (len(self.entries) > 1):
+            _, evicted_entry = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_entry['size']
+
+    def get_text(self, sha: str) -> str:
+        """Cached raw text of a blob, or None"""
+        entry = self._get_entry(sha, create=False)
+        return entry['text'] if entry is not None else None
+
+    def put_text(self, sha: str, text: str) -> str:
+        """Cache the raw text of a blob"""
+        return self._get_entry(sha, text)['text']
+
+    def get_symbols(self, sha: str, text: str = None) -> dict:
+        """
+        Symbol table of a blob: function/method name -> dedented source code
+        - the first match in `ast.walk` order wins, methods are matched when their class is visited
+        - raises SyntaxError if the blob cannot be parsed
+        """
+        entry = self._get_entry(sha, text)
+        if entry['symbols'] is None:
+            symbols = {}
+            tree = ast.parse(entry['text'])
+            for node in ast.walk(tree):
+                if isinstance(node, ast.FunctionDef):
+                    symbols.setdefault(node.name, node)
+                if isinstance(node, ast.ClassDef):
+                    for child in node.body:
+                        if isinstance(child, ast.FunctionDef):
+                            symbols.setdefault(child.name, child)
+            entry['symbols'] = {name: dedent(ast.get_source_segment(entry['text'], node)) for name, node in symbols.items()}
+            with self.lock:
+                for code in entry['symbols'].values():
+                    self._grow(entry, code)
+        return entry['symbols']
+
+    def memoize(self, sha: str, key, compute, text: str = None):
+        """Compute a value derived from a blob once and cache it on the blob's entry"""
+        entry = self._get_entry(sha, text)
+        if key in entry['derived']:
+            self.hits += 1
+            return entry['derived'][key]
+        self.misses += 1
+        value = compute()
+        with self.lock:
+            entry['derived'][key] = value
+            self._grow(entry, key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+# Shared by the tracer, the extractor and context filtering within a construction run
+blob_cache = BlobCache()
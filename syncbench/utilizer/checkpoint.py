@@ -0,0 +1,66 @@
+"""
+Append-only checkpoint journal of dataset construction
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Dict
+
+
+class CheckpointJournal(object):
+    """
+    Durable journal of processed construction candidates (JSONL, one record per line)
+    - keys are hashes of (scope, test file, function/method, commit, ...) for O(1) lookups
+    - every record stores an outcome: valid | invalid | timeout | done, plus an optional reason
+    - records are flushed and fsynced when written, so a crashed run loses at most the candidate in progress
+    - a truncated last line (crash while writing) is ignored when the journal is loaded
+    """
+    def __init__(self, journal_path: str, resume: bool = True):
+        self.journal_path = journal_path
+        self.records: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        if resume:
+            self.load()
+        elif os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+    def load(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.records[record['key']] = record
+
+    def is_done(self, key: str) -> bool:
+        return key in self.records
+
+    def get(self, key: str) -> dict:
+        return self.records.get(key)
+
+    def record(self, key: str, outcome: str, reason: str = '', **details):
+        """Append the outcome of a candidate"""
+        record = {'key': key, 'outcome': outcome, 'reason': reason, **details}
+        with self.lock:
+            self.records[key] = record
+            with open(self.journal_path, 'a', encoding='utf-8') as journal_file:
+                journal_file.write(json.dumps(record) + '\n')
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+    def summary(self) -> Dict[str, int]:
+        """Number of journaled candidates per outcome"""
+        outcome_counts = {}
+        for record in self.records.values():
+            outcome_counts[record['outcome']] = outcome_counts.get(record['outcome'], 0) + 1
+        return outcome_counts
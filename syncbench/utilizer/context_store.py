@@ -0,0 +1,59 @@
+"""
+Interned store of the context code of extracted functions/methods
+"""
+
+import json
+import hashlib
+import threading
+from typing import Dict, Iterable, List
+from utils.json_util import save_to_json, read_test_data
+
+
+class ContextStore(object):
+    """
+    Context code (a file plus its in-repo dependencies) stored once per file version
+    - function/method records only hold a `context_id` reference, resolved lazily with `resolve`
+    - ids are content hashes, so records extracted in worker processes or earlier runs resolve to the same entry
+    - records that still carry their own `context` list (older extraction results) resolve to it directly
+    """
+    def __init__(self):
+        self.contexts: Dict[str, List[Dict]] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_id(context_code: List[Dict]) -> str:
+        return hashlib.sha1(json.dumps(context_code, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def intern(self, context_code: List[Dict]) -> str:
+        """Store a context (once) and return its id"""
+        context_id = self.make_id(context_code)
+        self.add(context_id, context_code)
+        return context_id
+
+    def add(self, context_id: str, context_code: List[Dict]):
+        with self.lock:
+            self.contexts.setdefault(context_id, context_code)
+
+    def get(self, context_id: str) -> List[Dict]:
+        return self.contexts.get(context_id, [])
+
+    def resolve(self, fm_dict: Dict) -> List[Dict]:
+        """Context code of a function/method record"""
+        if 'context' in fm_dict:
+            return fm_dict['context']
+        return self.get(fm_dict.get('context_id'))
+
+    def subset(self, context_ids: Iterable[str]) -> Dict[str, List[Dict]]:
+        return {context_id: self.contexts[context_id] for context_id in context_ids if context_id in self.contexts}
+
+    def save(self, save_path: str, context_ids: Iterable[str] = None):
+        """Save all contexts, or only the referenced ones, as {context_id: context_code}"""
+        save_to_json(self.contexts if context_ids is None else self.subset(context_ids), save_path)
+
+    def load(self, load_path: str):
+        for context_id, context_code in read_test_data(load_path).items():
+            self.add(context_id, context_code)
+
+
+# Shared by extraction, filtering and construction within a run
+context_store = ContextStore()
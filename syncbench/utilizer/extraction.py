@@ -0,0 +1,154 @@
+"""
+Stateless function/method extraction from repository files
+"""
+
+import os
+import re
+import ast
+from textwrap import dedent
+from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from syncbench.utilizer.parse_cache import parse_cache
+from syncbench.utilizer.blob_cache import BlobCache, blob_cache, blob_sha
+from syncbench.utilizer.import_graph import load_import_graph
+from syncbench.utilizer.context_store import context_store
+from syncbench.utilizer.pipeline import process_pool_context
+from syncbench.utilizer.function_filter import FunctionFilter
+from syncbench.utilizer.method_filter import MethodFilter
+from utils.logger import logger
+
+
+def simplify_imports(code: str) -> str:
+    """Simplify import statements"""
+    def replace_import(match):
+        from_part = match.group(1).split('.')[-1]
+        return f'from {from_part} import {match.group(2)}'
+
+    return re.sub(r'from\s+([\w\.]+)\s+import\s+([\w_]+)', replace_import, code)
+
+
+def collect_imported_dependencies(context_code: List[Dict], file_path: str, clone_dir: str):
+    """Collect and add the in-repo modules a file imports (resolved through the repo import graph)"""
+    for dependency_file in load_import_graph(clone_dir).imports(file_path):
+        if not any(dep['whole_file_path'] == dependency_file for dep in context_code):
+            dep_code = simplify_imports(parse_cache.read_text(dependency_file))
+            context_code.append({"name": os.path.basename(dependency_file), "whole_file_path": dependency_file, "code": dep_code})
+
+
+def collect_context_code(file_path: str, clone_dir: str) -> List[Dict]:
+    """Context code of a file: the file itself plus its in-repo dependencies (once per file version)"""
+    def collect():
+        code = simplify_imports(parse_cache.read_text(file_path))
+        context_code = [{"name": os.path.basename(file_path), "whole_file_path": file_path, "code": code}]
+        collect_imported_dependencies(context_code, file_path, clone_dir)
+        return context_code
+    return parse_cache.memoize(file_path, 'context_code', collect)
+
+
+class FunctionMethodVisitor(ast.NodeVisitor):
+    """Collect the function and method records of one parsed file (referencing the file's interned context)"""
+    def __init__(self, file_path: str, file_content: str, repo_info: Dict, context_id: str, cache: BlobCache = blob_cache):
+        self.file_path = file_path
+        self.file_content = file_content
+        self.file_blob_sha = blob_sha(file_content)
+        self.cache = cache
+        self.repo_info = repo_info
+        self.context_id = context_id
+        self.functions = []
+        self.methods = []
+
+    def visit_FunctionDef(self, node):
+        try:
+            # Capture the dedented source code once per unique file content: formatting is deferred until a candidate survives filtering (`format_code`)
+            source_code = self.cache.memoize(
+                self.file_blob_sha, 
+                ('source_segment', node.lineno, node.col_offset), 
+                lambda: dedent(ast.get_source_segment(self.file_content, node)), 
+                self.file_content
+            )
+
+            # Determine if it's a method or function
+            fm_dict = {
+                "type": "method" if isinstance(node.parent, ast.ClassDef) else "function",
+                "name": node.name,
+                "file_name": os.path.basename(self.file_path),
+                "whole_file_path": self.file_path,
+                "repo_id": self.repo_info['repo_id'],
+                "repo_name": self.repo_info['repo_name'],
+                "repo_url": self.repo_info['repo_url'],
+                "code": source_code,
+                "context_id": self.context_id
+            }
+            if fm_dict['type'] == "method":
+                self.methods.append(fm_dict)
+            else:
+                self.functions.append(fm_dict)
+
+            self.generic_visit(node)
+        except RecursionError:
+            logger.warning(f"RecursionError encountered while processing function {node.name}. Skipping this function.")
+        except Exception as e:
+            logger.warning(f"An error occurred while processing function {node.name}: {e} -> Skipping this function")
+
+    def visit_ClassDef(self, node):
+        try:
+            self.generic_visit(node)
+        except RecursionError:
+            logger.warning(f"RecursionError encountered while processing class {node.name}. Skipping this class.")
+        except Exception as e:
+            logger.warning(f"An error occurred while processing class {node.name}: {e} -> Skipping this class")
+
+
+def extract_file_records(file_path: str, repo_info: Dict, clone_dir: str, preprocess_filter_strictness: int = 0, cache: BlobCache = blob_cache) -> Tuple[List, List]:
+    """
+    Extract the function and method records of one file
+    - pure: depends only on its arguments and the file system, so it can run in a worker process
+    - each file version is read, parsed and extracted once per process (via the parse cache)
+    - function/method sources are shared with the tracer through the blob cache `cache`
+    """
+    def extract():
+        context_id = context_store.intern(collect_context_code(file_path, clone_dir))
+        try:
+            visitor = FunctionMethodVisitor(file_path, parse_cache.read_text(file_path), repo_info, context_id, cache)
+            visitor.visit(parse_cache.get_tree(file_path))
+        except SyntaxError as e:
+            logger.warning(f"SyntaxError in file {file_path}: {e}")
+            return [], []
+        functions, methods = visitor.functions, visitor.methods
+
+        # Function & method filtering
+        if preprocess_filter_strictness == 1:
+            functions = FunctionFilter(functions).function_filtering()
+            methods = MethodFilter(methods).method_filtering()
+        return functions, methods
+    return parse_cache.memoize(file_path, ('functions_and_methods', preprocess_filter_strictness), extract)
+
+
+def extract_file_job(file_path: str, repo_info: Dict, clone_dir: str, preprocess_filter_strictness: int = 0) -> Tuple[Tuple[List, List], Dict]:
+    """Worker job: the records of one file plus the contexts they reference (the worker's context store is not shared)"""
+    functions, methods = extract_file_records(file_path, repo_info, clone_dir, preprocess_filter_strictness)
+    return (functions, methods), context_store.subset({fm_dict['context_id'] for fm_dict in functions + methods})
+
+
+def extract_repo_records(file_paths: List[str], repo_info: Dict, clone_dir: str, preprocess_filter_strictness: int = 0, num_workers: int = 1, cache: BlobCache = blob_cache) -> Dict[str, Tuple[List, List]]:
+    """
+    Extract the records of many files, fanned out over a process pool
+    - results are merged in the order of `file_paths`, so the output matches serial extraction
+    - results are stored in this process's parse cache and context store, so later per-file extraction is a cache hit
+    """
+    if (num_workers <= 1) or (len(file_paths) <= 1):
+        return {file_path: extract_file_records(file_path, repo_info, clone_dir, preprocess_filter_strictness, cache) for file_path in file_paths}
+
+    logger.info(f"Extracting functions/methods from {len(file_paths)} files with {num_workers} workers...")
+    records = {}
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=process_pool_context()) as executor:
+        chunksize = max(1, len(file_paths) // (num_workers * 4))
+        results = executor.map(
+            extract_file_job, file_paths, [repo_info] * len(file_paths), [clone_dir] * len(file_paths),
+            [preprocess_filter_strictness] * len(file_paths), chunksize=chunksize
+        )
+        for file_path, (file_records, file_contexts) in zip(file_paths, results):
+            for context_id, context_code in file_contexts.items():
+                context_store.add(context_id, context_code)
+            records[file_path] = parse_cache.memoize(file_path, ('functions_and_methods', preprocess_filter_strictness), lambda: file_records)
+    return records
@@ -0,0 +1,42 @@
+"""
+Normalized AST fingerprints of function/method code
+"""
+
+import ast
+import hashlib
+from textwrap import dedent
+from syncbench.utilizer.blob_cache import blob_cache, blob_sha
+
+
+class DocstringNormalizer(ast.NodeTransformer):
+    """Collapse the whitespace of module/class/function docstrings, so that re-wrapping a docstring is no change"""
+    def normalize_docstring(self, node):
+        if node.body and isinstance(node.body[0], ast.Expr) and isinstance(node.body[0].value, ast.Constant) and isinstance(node.body[0].value.value, str):
+            node.body[0].value.value = ' '.join(node.body[0].value.value.split())
+        self.generic_visit(node)
+        return node
+
+    visit_Module = normalize_docstring
+    visit_ClassDef = normalize_docstring
+    visit_FunctionDef = normalize_docstring
+    visit_AsyncFunctionDef = normalize_docstring
+
+
+def compute_fingerprint(code: str) -> str:
+    tree = DocstringNormalizer().visit(ast.parse(dedent(code)))
+    return hashlib.sha1(ast.dump(tree, annotate_fields=False, include_attributes=False).encode('utf-8')).hexdigest()
+
+
+def code_fingerprint(code: str) -> str:
+    """
+    Fingerprint of the normalized AST of a piece of code
+    - whitespace, comments and docstring formatting do not change the fingerprint
+    - computed once per code version (memoized in the shared blob cache)
+    - returns None if the code cannot be parsed
+    """
+    if code is None:
+        return None
+    try:
+        return blob_cache.memoize(blob_sha(code), 'ast_fingerprint', lambda: compute_fingerprint(code))
+    except (SyntaxError, ValueError):
+        return None
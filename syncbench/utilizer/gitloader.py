@@ -3,8 +3,14 @@ Download git log for each function/method
 """
 
 import os
+import json
+import threading
+import uuid
 import shutil
+import tarfile
+import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.logger import logger
 
 
@@ -24,53 +30,44 @@ class GitLoader(object):
     # Download git log
     def get_repo_git_log(self):
         logger.info(f"\nDownloading git log for {self.repo_id} - {self.repo_name}")
-        os.chdir(self.repo_dir)
 
         try:
-            # Get the git log with error handling for encoding issues
-            log = subprocess.run(["git", "log"], capture_output=True, text=True, errors='replace').stdout
-            with open(f"{self.repo_save_path}{self.repo_id}_{self.repo_name}_git_log.txt", "w", encoding='utf-8', errors='replace') as file:
-                file.write(log)
+            # Stream the git log straight into the log file instead of holding it in memory
+            with open(f"{self.repo_save_path}{self.repo_id}_{self.repo_name}_git_log.txt", "wb") as file:
+                subprocess.run(["git", "-C", self.repo_dir, "log"], check=True, stdout=file, stderr=subprocess.PIPE)
             logger.pinfo(f"'{self.repo_id}_{self.repo_name}' git log download success!\n")
         
         except Exception as e:
             logger.pinfo(f"An error occurred while fetching the git log: {e}")
-        
-        finally:
-            os.chdir("..")
 
-            # TODO: If needed, delete the repo directory
-            # subprocess.run(["rm", "-rf", self.repo_dir])
+        # TODO: If needed, delete the repo directory
+        # subprocess.run(["rm", "-rf", self.repo_dir])
     
     def get_repo_git_log_from_docker(self):
         """
-        Load git log from an existing Docker container where the repository is located at /workspace/test_repo
+        Load git log from a Docker image where the repository is located at /workspace/test_repo
+        - the container is only created, never started: `.git` is streamed out of its filesystem with `docker cp`
+        - `git log` runs on the extracted `.git` and is streamed straight into the log file
+        - a created container needs no `docker stop` and is removed at once
         """
         logger.info(f"\nLoading git log from Docker image for {self.repo_id} - {self.repo_name}")
         
-        container_name = f"git_log_extractor_{self.repo_id}_{self.repo_name}"
+        container_name = f"git_log_extractor_{self.repo_id}_{self.repo_name}_{uuid.uuid4().hex[:8]}"
         image_name = f"xuehang/{self.repo_id}_{self.repo_name}:{self.image_tag}"
         
         try:
-            # Start a new container from the image
-            subprocess.run([
-                "docker", "run",
-                "-d",  # Run in detached mode
-                "--name", container_name,
-                image_name,
-                "tail", "-f", "/dev/null"  # Keep container running
-            ], check=True)
-            
-            # Execute git log command inside the container
-            log = subprocess.run([
-                "docker", "exec",
-                container_name,
-                "git", "-C", "/workspace/test_repo", "log"
-            ], capture_output=True, text=True, errors='replace').stdout
-            
-            # Save the git log
-            with open(f"{self.repo_save_path}{self.repo_id}_{self.repo_name}_git_log.txt", "w", encoding='utf-8', errors='replace') as file:
-                file.write(log)
+            subprocess.run(["docker", "create", "--name", container_name, image_name], check=True, capture_output=True)
+            with tempfile.TemporaryDirectory(prefix="git_log_extractor_") as extract_dir:
+                # Untar `.git` while `docker cp` is still streaming it
+                with subprocess.Popen(["docker", "cp", f"{container_name}:/workspace/test_repo/.git", "-"], stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+                    with tarfile.open(fileobj=process.stdout, mode="r|") as git_archive:
+                        git_archive.extractall(extract_dir, filter='data')
+                    error_message = process.stderr.read()
+                if process.returncode != 0:
+                    raise subprocess.CalledProcessError(process.returncode, process.args, stderr=error_message)
+
+                with open(f"{self.repo_save_path}{self.repo_id}_{self.repo_name}_git_log.txt", "wb") as file:
+                    subprocess.run(["git", "--git-dir", os.path.join(extract_dir, ".git"), "log"], check=True, stdout=file, stderr=subprocess.PIPE)
             
             logger.pinfo(f"'{self.repo_id}_{self.repo_name}' git log extraction from Docker success!\n")
         
@@ -80,44 +77,124 @@ class GitLoader(object):
             logger.pinfo(f"An error occurred while fetching the git log from Docker: {e}")
         
         finally:
-            # Clean up: Stop and remove the container
+            # Clean up: the container was never started, so it can be removed right away
             try:
-                subprocess.run(["docker", "stop", container_name], check=False)
-                subprocess.run(["docker", "rm", container_name], check=False)
+                subprocess.run(["docker", "rm", "-f", container_name], check=False, capture_output=True)
             except Exception as e:
                 logger.pinfo(f"Error cleaning up Docker container: {e}")
 
 
 class GitDownloader(object):
+    """
+    Download git logs of all repos
+    - repos are processed concurrently by `git_workers` threads
+    - each repo is partially cloned (bare, treeless: commits only), since `git log` needs no trees or blobs
+    - `git log` is streamed straight to the log file, and the process CWD is never changed
+    - with `git_resume`, repos that already have a git log file are skipped
+    - with `git_incremental`, bare clones are kept: later runs fetch only new commits and prepend them to the git log
+    """
+    clone_filter = 'tree:0'
+
     def __init__(self, args):
         self.repo_source_dict_list = args.repo_source_dict_list
         self.git_log_path = f"{args.root_path}/{args.log_path.replace('/', '')}/{args.git_log_path.replace('/', '')}/"
+        self.git_workers = max(1, args.git_workers)
+        self.git_resume = args.git_resume
+        self.git_incremental = args.git_incremental
+        self.state_path = f"{self.git_log_path}git_log_state.json"
+        self.state = {}  # repo folder name -> last processed HEAD
+        self.state_lock = threading.Lock()
+        self.new_commit_counts = {}
     
+    def load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r') as state_file:
+                self.state = json.load(state_file)
+
+    def save_repo_state(self, repo_folder_name, repo_head):
+        """Record the last processed HEAD of a repo (written after every repo, so an interrupted run keeps its progress)"""
+        with self.state_lock:
+            self.state[repo_folder_name] = repo_head
+            with open(f"{self.state_path}.part", 'w') as state_file:
+                json.dump(self.state, state_file, indent=4)
+            os.replace(f"{self.state_path}.part", self.state_path)
+
+    def run_git(self, repo_path, *git_args) -> str:
+        return subprocess.run(["git", "-C", repo_path, *git_args], check=True, capture_output=True, text=True).stdout.strip()
+
+    def write_git_log(self, repo_path, log_save_path, revision_range=None, previous_log_path=None):
+        """
+        Stream `git log` (of a revision range) into the log file, followed by the content of a previous log
+        Written into a partial file first, so that an interrupted download is never taken as complete
+        """
+        try:
+            with open(f"{log_save_path}.part", "wb") as file:
+                subprocess.run(["git", "-C", repo_path, "log"] + ([revision_range] if revision_range else []), check=True, stdout=file, stderr=subprocess.PIPE)
+                if previous_log_path is not None:
+                    if revision_range is not None:
+                        file.write(b"\n")
+                    with open(previous_log_path, "rb") as previous_log:
+                        shutil.copyfileobj(previous_log, file)
+            os.replace(f"{log_save_path}.part", log_save_path)
+        finally:
+            if os.path.exists(f"{log_save_path}.part"):
+                os.remove(f"{log_save_path}.part")
+
     def get_repo_git_log(self, repo_id, repo_name, repo_github_link):
         """Get git logs"""
-        repo_path = f'{self.git_log_path}{repo_name}'
+        repo_path = f'{self.git_log_path}{repo_id}_{repo_name}.git'
         log_save_path = f"{self.git_log_path}{repo_id}_{repo_name}_git_log.txt"
+        if self.git_incremental and os.path.exists(repo_path) and os.path.exists(log_save_path):
+            return self.update_repo_git_log(repo_id, repo_name, repo_path, log_save_path)
+        if self.git_resume and os.path.exists(log_save_path):
+            logger.pinfo(f"Skipping {repo_id} - {repo_name}: git log already downloaded")
+            return 'skipped'
         logger.info(f"\nProgress Update: {repo_id} - {repo_name}")
 
         if os.path.exists(repo_path):
             logger.pinfo(f"Removing existing repository directory: {repo_path}")
             shutil.rmtree(repo_path)
 
-        subprocess.run(["git", "clone", repo_github_link, repo_path], check=True)
-        os.chdir(repo_path)
+        try:
+            subprocess.run(
+                ["git", "clone", "--quiet", "--bare", f"--filter={self.clone_filter}", repo_github_link, repo_path], 
+                check=True, capture_output=True
+            )
+            self.write_git_log(repo_path, log_save_path)
+            if self.git_incremental:
+                self.save_repo_state(f"{repo_id}_{repo_name}", self.run_git(repo_path, "rev-parse", "HEAD"))
+                self.new_commit_counts[f"{repo_id}_{repo_name}"] = int(self.run_git(repo_path, "rev-list", "--count", "HEAD"))
+        finally:
+            if not self.git_incremental:
+                shutil.rmtree(repo_path, ignore_errors=True)
+        return 'downloaded'
 
-        log_process = subprocess.run(["git", "log"], check=True, capture_output=True, text=True, errors='ignore')
-        log = log_process.stdout
-        with open(log_save_path, "w", encoding='utf-8') as file:
-            file.write(log)
+    def update_repo_git_log(self, repo_id, repo_name, repo_path, log_save_path):
+        """Fetch the new commits of a kept bare clone and prepend their git log to the existing one"""
+        repo_folder_name = f"{repo_id}_{repo_name}"
+        logger.info(f"\nProgress Update: {repo_id} - {repo_name} (incremental)")
+        self.run_git(repo_path, "fetch", "--quiet", "--prune", "--update-head-ok", "origin", "+refs/heads/*:refs/heads/*")
+        new_head = self.run_git(repo_path, "rev-parse", "HEAD")
+        old_head = self.state.get(repo_folder_name)
 
-        os.chdir("..")
-        subprocess.run(["rm", "-rf", f'{self.git_log_path}{repo_name}'])
+        if old_head == new_head:
+            self.new_commit_counts[repo_folder_name] = 0
+        elif (old_head is not None) and (subprocess.run(["git", "-C", repo_path, "merge-base", "--is-ancestor", old_head, new_head], capture_output=True).returncode == 0):
+            self.new_commit_counts[repo_folder_name] = int(self.run_git(repo_path, "rev-list", "--count", f"{old_head}..{new_head}"))
+            self.write_git_log(repo_path, log_save_path, f"{old_head}..{new_head}", log_save_path)
+        else:
+            # Unknown or rewritten history: rewrite the whole git log from the kept clone
+            logger.warning(f"History of {repo_folder_name} cannot be fast-forwarded from {old_head}. Rewriting its git log...")
+            self.new_commit_counts[repo_folder_name] = int(self.run_git(repo_path, "rev-list", "--count", "HEAD"))
+            self.write_git_log(repo_path, log_save_path)
+        self.save_repo_state(repo_folder_name, new_head)
+        logger.pinfo(f"{repo_folder_name}: {self.new_commit_counts[repo_folder_name]} new commits")
+        return 'updated'
 
     
     def git_download(self, args):
         """Download git logs"""
-        if os.path.exists(self.git_log_path) and os.listdir(self.git_log_path):
+        if (not self.git_resume) and (not self.git_incremental) and os.path.exists(self.git_log_path) and os.listdir(self.git_log_path):
             logger.info(f"Cleaning up git log directory: {self.git_log_path}")
             
             for item in os.listdir(self.git_log_path):
@@ -126,9 +203,33 @@ class GitDownloader(object):
                     shutil.rmtree(item_path)
                 else:
                     os.remove(item_path)
+        os.makedirs(self.git_log_path, exist_ok=True)
+        if self.git_incremental:
+            self.load_state()
 
+        repo_list = [
+            (self.repo_source_dict_list[repo_idx]['repo_id'], self.repo_source_dict_list[repo_idx]['repo_name'], self.repo_source_dict_list[repo_idx]['github_link'])
+            for repo_idx in range(args.git_start, args.git_end)
+        ]
+        download_results = {'downloaded': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.git_workers) as executor:
+            futures = {executor.submit(self.get_repo_git_log, *repo): repo for repo in repo_list}
+            for future in as_completed(futures):
+                repo_id, repo_name, _ = futures[future]
+                try:
+                    download_results[future.result()] += 1
+                except subprocess.CalledProcessError as e:
+                    download_results['failed'] += 1
+                    error_message = e.stderr.decode('utf-8', errors='replace').strip() if isinstance(e.stderr, bytes) else e.stderr
+                    logger.error(f"Git log download failed for {repo_id} - {repo_name}: {error_message}")
+                except Exception as e:
+                    download_results['failed'] += 1
+                    logger.error(f"Git log download failed for {repo_id} - {repo_name}: {e}")
         
-        for repo_idx in range(args.git_start, args.git_end):
-            repo_id, repo_name, repo_github_link = self.repo_source_dict_list[repo_idx]['repo_id'], self.repo_source_dict_list[repo_idx]['repo_name'], self.repo_source_dict_list[repo_idx]['github_link']
-            self.get_repo_git_log(repo_id, repo_name, repo_github_link)
-        logger.info('\nGit Downloading Success!')
+        if self.git_incremental:
+            logger.info(f"New commits per repo: {json.dumps(self.new_commit_counts, indent=4)}")
+        logger.info(
+            f"\nGit Downloading Success! Downloaded: {download_results['downloaded']} | Updated: {download_results['updated']} | "
+            f"Skipped: {download_results['skipped']} | Failed: {download_results['failed']}"
+        )
+        return download_results
@@ -0,0 +1,139 @@
+"""
+Streaming git log parser and columnar commit table
+"""
+
+import os
+import subprocess
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List
+
+
+# One record per commit: \x1e starts a record, \x1f separates header fields, numstat lines follow the header
+# First-parent history, merges diffed against their first parent: the commits of a file are exactly
+# those of `repo.iter_commits(paths=file, first_parent=True)`, as walked by the tracer without a commit table
+RECORD_SEPARATOR = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+GIT_LOG_FORMAT = '%x1e%H%x1f%an%x1f%aI%x1f%B%x1f'
+GIT_LOG_COMMAND = ["git", "-c", "core.quotepath=off", "log", "--first-parent", "-m", "--numstat", "--no-renames", f"--format={GIT_LOG_FORMAT}"]
+
+
+def parse_git_log(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    Parse `git log --numstat --format=GIT_LOG_FORMAT` output line by line
+    - yields one commit record at a time, so the whole log is never held in memory
+    - binary files (`-` in numstat) count as zero lines added/removed
+    """
+    header, record = None, None
+    for line in lines:
+        line = line.rstrip('\n')
+        if line.startswith(RECORD_SEPARATOR):
+            if record is not None:
+                yield record
+            header, record = line[1:], None
+        elif header is not None:
+            header += '\n' + line
+        elif record is not None:
+            numstat = line.split('\t', 2)
+            if len(numstat) == 3:
+                added, removed, file_path = numstat
+                record['files'].append(file_path)
+                record['file_lines_added'].append(int(added) if added.isdigit() else 0)
+                record['file_lines_removed'].append(int(removed) if removed.isdigit() else 0)
+
+        if (header is not None) and (header.count(FIELD_SEPARATOR) >= 4):
+            sha, author, date, message, _ = header.split(FIELD_SEPARATOR, 4)
+            record = {
+                'sha': sha, 'author': author, 'date': date, 'message': message,
+                'files': [], 'file_lines_added': [], 'file_lines_removed': []
+            }
+            header = None
+    if record is not None:
+        yield record
+
+
+class CommitTable(object):
+    """
+    Columnar table of the commits of one repo, newest first
+    - columns: sha, author, date, message, files, file_lines_added, file_lines_removed, lines_added, lines_removed
+    - `commits_for_file` looks up the commits that changed a file without walking the history again
+    - stored as Parquet (via pandas + pyarrow)
+    """
+    columns = ['sha', 'author', 'date', 'message', 'files', 'file_lines_added', 'file_lines_removed', 'lines_added', 'lines_removed']
+
+    def __init__(self, data: Dict[str, List] = None):
+        self.data = data if data is not None else {column: [] for column in self.columns}
+        self._file_index = None
+
+    def __len__(self):
+        return len(self.data['sha'])
+
+    @property
+    def head(self) -> str:
+        """SHA of the newest commit"""
+        return self.data['sha'][0] if len(self) > 0 else None
+
+    def append(self, record: Dict):
+        for column in ['sha', 'author', 'date', 'message', 'files', 'file_lines_added', 'file_lines_removed']:
+            self.data[column].append(record[column])
+        self.data['lines_added'].append(sum(record['file_lines_added']))
+        self.data['lines_removed'].append(sum(record['file_lines_removed']))
+        self._file_index = None
+
+    def prepend(self, newer_table: 'CommitTable'):
+        """Put the commits of a newer table (e.g. `from_repo(repo_dir, f"{table.head}..HEAD")`) in front of this one"""
+        for column in self.columns:
+            self.data[column] = newer_table.data[column] + self.data[column]
+        self._file_index = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'CommitTable':
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    @classmethod
+    def from_repo(cls, repo_dir: str, revision_range: str = None) -> 'CommitTable':
+        """Stream `git log` of a repo (optionally restricted to a revision range) into a commit table"""
+        command = ["git", "-C", repo_dir] + GIT_LOG_COMMAND[1:] + ([revision_range] if revision_range else [])
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace') as process:
+            table = cls.from_records(parse_git_log(process.stdout))
+            error_message = process.stderr.read()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=error_message)
+        return table
+
+    def get_file_index(self) -> Dict[str, List[int]]:
+        """File path -> row indices of the commits that changed it, built once on first lookup"""
+        if self._file_index is None:
+            self._file_index = {}
+            for row_idx, files in enumerate(self.data['files']):
+                for changed_file in files:
+                    self._file_index.setdefault(changed_file, []).append(row_idx)
+        return self._file_index
+
+    def commits_for_file(self, file_path: str) -> List[str]:
+        """SHAs of the commits that changed a file (repo-relative path), newest first"""
+        return [self.data['sha'][row_idx] for row_idx in self.get_file_index().get(file_path, [])]
+
+    def file_commit_counts(self) -> Dict[str, int]:
+        """Number of commits that changed each file"""
+        return {file_path: len(row_indices) for file_path, row_indices in self.get_file_index().items()}
+
+    def to_parquet(self, save_path: str):
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        pd.DataFrame(self.data, columns=self.columns).to_parquet(f"{save_path}.part", index=False)
+        os.replace(f"{save_path}.part", save_path)
+
+    @classmethod
+    def read_parquet(cls, save_path: str) -> 'CommitTable':
+        df = pd.read_parquet(save_path)
+        data = {}
+        for column in cls.columns:
+            if column in ['files', 'file_lines_added', 'file_lines_removed']:
+                data[column] = [[value.item() if hasattr(value, 'item') else value for value in row] for row in df[column]]
+            elif column in ['lines_added', 'lines_removed']:
+                data[column] = [int(value) for value in df[column]]
+            else:
+                data[column] = df[column].tolist()
+        return cls(data)
@@ -0,0 +1,121 @@
+"""
+Persistent index of traced function/method histories
+"""
+
+import os
+import hashlib
+import sqlite3
+from typing import List, Dict
+from utils.logger import logger
+
+
+class HistoryIndex(object):
+    """
+    On-disk (SQLite) index of function/method histories for one repository
+    - keyed by (repo HEAD, file path, function name)
+    - stores commit hash, blob hash and normalized code hash of every history version, plus the AST fingerprint of each code
+    - shared by callee and caller construction, and reused across reruns
+    - rows of any other repo HEAD are dropped when the index is opened
+    """
+    schema_version = '2'
+
+    def __init__(self, index_path: str, repo_head: str):
+        self.index_path = index_path
+        self.repo_head = repo_head
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        self.connection = sqlite3.connect(index_path, timeout=60)
+        self.create_tables()
+        self.invalidate_stale_entries()
+
+    def create_tables(self):
+        """Create index tables if they do not exist yet"""
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if (row is not None) and (row[0] != self.schema_version):
+                logger.info(f"History index schema changed ({row[0]} -> {self.schema_version}). Rebuilding `{self.index_path}`...")
+                for table_name in ['traced', 'versions', 'commits', 'codes']:
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (self.schema_version,))
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS traced ("
+                "head TEXT, file_path TEXT, function_name TEXT, body_change_only INTEGER, "
+                "PRIMARY KEY (head, file_path, function_name, body_change_only))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                "head TEXT, file_path TEXT, function_name TEXT, body_change_only INTEGER, position INTEGER, "
+                "commit_hash TEXT, blob_hash TEXT, code_hash TEXT, "
+                "PRIMARY KEY (head, file_path, function_name, body_change_only, position))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS commits ("
+                "commit_hash TEXT PRIMARY KEY, message TEXT, author TEXT, date TEXT, log TEXT)"
+            )
+            self.connection.execute("CREATE TABLE IF NOT EXISTS codes (code_hash TEXT PRIMARY KEY, code TEXT, fingerprint TEXT)")
+
+    def invalidate_stale_entries(self):
+        """Drop histories traced at any other repo HEAD"""
+        with self.connection:
+            stale_count = self.connection.execute("SELECT COUNT(*) FROM traced WHERE head != ?", (self.repo_head,)).fetchone()[0]
+            if stale_count == 0:
+                return
+            logger.info(f"Repo HEAD moved to {self.repo_head}. Dropping {stale_count} stale histories from `{self.index_path}`...")
+            self.connection.execute("DELETE FROM traced WHERE head != ?", (self.repo_head,))
+            self.connection.execute("DELETE FROM versions WHERE head != ?", (self.repo_head,))
+            self.connection.execute("DELETE FROM codes WHERE code_hash NOT IN (SELECT code_hash FROM versions)")
+            self.connection.execute("DELETE FROM commits WHERE commit_hash NOT IN (SELECT commit_hash FROM versions)")
+
+    def code_hash(self, code: str) -> str:
+        """Hash of the normalized (autopep8-formatted) code of a history version"""
+        return hashlib.sha1(code.encode('utf-8', errors='replace')).hexdigest()
+
+    def get_history(self, file_path: str, function_name: str, body_change_only: bool) -> List[Dict]:
+        """Return the indexed history records, or None if this function/method has not been traced yet"""
+        key = (self.repo_head, file_path, function_name, int(body_change_only))
+        traced = self.connection.execute(
+            "SELECT 1 FROM traced WHERE head = ? AND file_path = ? AND function_name = ? AND body_change_only = ?", key
+        ).fetchone()
+        if traced is None:
+            return None
+
+        rows = self.connection.execute(
+            "SELECT commits.log, versions.commit_hash, commits.message, commits.author, commits.date, codes.code, codes.fingerprint "
+            "FROM versions "
+            "JOIN commits ON commits.commit_hash = versions.commit_hash "
+            "JOIN codes ON codes.code_hash = versions.code_hash "
+            "WHERE versions.head = ? AND versions.file_path = ? AND versions.function_name = ? AND versions.body_change_only = ? "
+            "ORDER BY versions.position", key
+        ).fetchall()
+        return [
+            {"log": log, "commit": commit_hash, "message": message, "author": author, "date": date, "code": code, "fingerprint": fingerprint}
+            for log, commit_hash, message, author, date, code, fingerprint in rows
+        ]
+
+    def put_history(self, file_path: str, function_name: str, body_change_only: bool, history: List[Dict], blob_hashes: List[str]):
+        """Store the traced history records of a function/method"""
+        key = (self.repo_head, file_path, function_name, int(body_change_only))
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM versions WHERE head = ? AND file_path = ? AND function_name = ? AND body_change_only = ?", key
+            )
+            for position, (entry, blob_hash) in enumerate(zip(history, blob_hashes)):
+                code_hash = self.code_hash(entry['code'])
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO commits (commit_hash, message, author, date, log) VALUES (?, ?, ?, ?, ?)",
+                    (entry['commit'], entry['message'], entry['author'], entry['date'], entry['log'])
+                )
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO codes (code_hash, code, fingerprint) VALUES (?, ?, ?)", (code_hash, entry['code'], entry.get('fingerprint'))
+                )
+                self.connection.execute(
+                    "INSERT INTO versions (head, file_path, function_name, body_change_only, position, commit_hash, blob_hash, code_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    key + (position, entry['commit'], blob_hash, code_hash)
+                )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO traced (head, file_path, function_name, body_change_only) VALUES (?, ?, ?, ?)", key
+            )
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,122 @@
+"""
+Repository import graph: Python files as nodes, resolved in-repo imports as edges
+"""
+
+import os
+import ast
+import itertools
+from typing import Dict, List
+from syncbench.utilizer.module_index import ModuleIndex
+from syncbench.utilizer.parse_cache import parse_cache
+
+
+graph_ids = itertools.count()
+
+
+class ImportGraph(object):
+    """
+    Import graph of a repo, resolved through its module index
+    - `import a.b`, `from a.b import c` (module or attribute), relative and star imports are edges
+    - names re-exported by a module (e.g. `from .core import Thing` in a package `__init__.py`) are followed
+      to the module that defines them, so `from pkg import Thing` also depends on `pkg/core.py`
+    - edges of a file are computed once per file version (cached in the parse cache) and only when queried
+    - the transitive closure is computed on demand
+    """
+    def __init__(self, module_index: ModuleIndex):
+        self.module_index = module_index
+        self.repo_dir = module_index.repo_dir
+        self.graph_id = next(graph_ids)  # edges resolved by another (e.g. stale) graph of the repo are not reused
+
+    def scan(self, file_path: str) -> dict:
+        """Direct imports, re-exported names and star imports of a file (once per file version)"""
+        def scan_file():
+            file_scan = {'imports': [], 'defined': set(), 'reexports': {}, 'stars': []}
+            try:
+                tree = parse_cache.get_tree(file_path)
+            except SyntaxError:
+                return file_scan
+            for node in tree.body:
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    file_scan['defined'].add(node.name)
+                elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                    for target in (node.targets if isinstance(node, ast.Assign) else [node.target]):
+                        file_scan['defined'].update(name.id for name in ast.walk(target) if isinstance(name, ast.Name))
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    file_scan['imports'] += [(alias.name, None) for alias in node.names]
+                elif isinstance(node, ast.ImportFrom):
+                    module = '.' * node.level + (node.module or '')  # keep relative import levels
+                    for alias in node.names:
+                        file_scan['imports'].append((module, alias.name))
+                        if alias.name == '*':
+                            file_scan['stars'].append(module)
+                        else:
+                            file_scan['reexports'].setdefault(alias.asname or alias.name, []).append((module, alias.name))
+            return file_scan
+        return parse_cache.memoize(file_path, ('import_scan',), scan_file)
+
+    def origins(self, file_path: str, name: str, visited: set = None) -> List[str]:
+        """Files a name imported from `file_path` originates from, following re-exports (excluding `file_path`)"""
+        visited = set() if visited is None else visited
+        if file_path in visited:
+            return []
+        visited.add(file_path)
+        file_scan = self.scan(file_path)
+
+        origin_paths = []
+        if name in file_scan['reexports']:
+            for module, imported_name in file_scan['reexports'][name]:
+                for target_path in self.module_index.resolve_import(module, imported_name, file_path):
+                    origin_paths += [target_path] + self.origins(target_path, imported_name, visited)
+        elif name not in file_scan['defined']:
+            for module in file_scan['stars']:
+                target_path = self.module_index.resolve(module, file_path)
+                if (target_path is not None) and (name in self.scan(target_path)['defined'] or name in self.scan(target_path)['reexports']):
+                    origin_paths += [target_path] + self.origins(target_path, name, visited)
+        return origin_paths
+
+    def imports(self, file_path: str) -> List[str]:
+        """In-repo files directly imported by a file (in import order, without duplicates)"""
+        def resolve_imports():
+            imported_paths = []
+            for module, name in self.scan(file_path)['imports']:
+                if name is None:  # `import a.b`
+                    target_paths = [self.module_index.resolve(module, file_path)]
+                elif name == '*':  # `from a.b import *`
+                    target_paths = [self.module_index.resolve(module, file_path)]
+                else:  # `from a import b`: the module, the submodule `a.b` if any, and where `b` is re-exported from
+                    target_paths = []
+                    for target_path in self.module_index.resolve_import(module, name, file_path):
+                        target_paths += [target_path] + self.origins(target_path, name)
+                for target_path in target_paths:
+                    if (target_path is not None) and (os.path.abspath(target_path) != os.path.abspath(file_path)) and (target_path not in imported_paths):
+                        imported_paths.append(target_path)
+            return imported_paths
+        return parse_cache.memoize(file_path, ('imports', self.graph_id), resolve_imports)
+
+    def closure(self, file_path: str) -> List[str]:
+        """All in-repo files a file depends on, directly or transitively (breadth-first order)"""
+        dependency_paths, visited = [], {file_path}
+        frontier = [file_path]
+        while frontier:
+            next_frontier = []
+            for current_path in frontier:
+                for imported_path in self.imports(current_path):
+                    if imported_path not in visited:
+                        visited.add(imported_path)
+                        dependency_paths.append(imported_path)
+                        next_frontier.append(imported_path)
+            frontier = next_frontier
+        return dependency_paths
+
+
+# One graph per repo and process (shared by the builders and extraction workers)
+import_graphs: Dict[str, ImportGraph] = {}
+
+
+def load_import_graph(repo_dir: str, refresh: bool = False) -> ImportGraph:
+    """Import graph of a repo, built once per process (or re-indexed with `refresh`, e.g. after a fresh clone)"""
+    repo_key = os.path.abspath(repo_dir)
+    if refresh or (repo_key not in import_graphs):
+        import_graphs[repo_key] = ImportGraph(ModuleIndex(repo_dir))
+    return import_graphs[repo_key]
@@ -5,6 +5,7 @@ Filtering methods for dataset construction
 import ast
 from typing import List, Dict
 from syncbench.utilizer.function_filter import FunctionFilter
+from syncbench.utilizer.context_store import context_store
 
 class MethodFilter(FunctionFilter):
     def __init__(self, methods: List[Dict]):
@@ -31,7 +32,7 @@ class MethodFilter(FunctionFilter):
             return False
 
         # Filter out methods that are not part of a class
-        if not self._is_method_in_class(method['context'], method['name']):
+        if not self._is_method_in_class(context_store.resolve(method), method['name']):
             return False
 
         # Additional example filtering logic specific to methods
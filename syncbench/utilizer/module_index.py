@@ -0,0 +1,71 @@
+"""
+Repository module index: dotted module names -> Python file paths
+"""
+
+import os
+from typing import Dict, List
+
+
+class ModuleIndex(object):
+    """
+    One-time index of all Python modules of a repo, for O(1) import resolution
+    - every dotted suffix of a module path is indexed (`src.pkg.mod`, `pkg.mod`, `mod`), which covers
+      src-layouts and tests that import modules relative to a nested root
+    - packages resolve to their `__init__.py`
+    - relative imports (`from .mod import x`, `from .. import x`) resolve against the importing file
+    - when several files share a suffix, the shallowest one wins (packages before plain modules at equal depth)
+    """
+    skipped_dirs = {'.git', '__pycache__', '.tox', '.venv', 'venv', 'node_modules', 'site-packages'}
+
+    def __init__(self, repo_dir: str):
+        self.repo_path = repo_dir  # indexed file paths are joined onto the repo path as given
+        self.repo_dir = os.path.abspath(repo_dir)
+        self.modules: Dict[str, str] = {}  # dotted suffix -> file path
+        self.files: Dict[str, str] = {}  # absolute module path without `.py` (or package dir) -> file path
+        self.build()
+
+    def build(self):
+        ranked_modules = {}
+        for root, dirs, files in os.walk(self.repo_path):
+            dirs[:] = sorted(dir_name for dir_name in dirs if dir_name not in self.skipped_dirs)
+            for file_name in sorted(files):
+                if not file_name.endswith('.py'):
+                    continue
+                file_path = os.path.join(root, file_name)
+                module_path = root if file_name == '__init__.py' else os.path.join(root, file_name[:-3])
+                self.files.setdefault(os.path.abspath(module_path), file_path)
+
+                module_parts = os.path.relpath(module_path, self.repo_path).split(os.sep)
+                if module_parts == ['.']:
+                    continue
+                rank = (len(module_parts), file_name != '__init__.py')
+                for suffix_start in range(len(module_parts)):
+                    dotted_name = '.'.join(module_parts[suffix_start:])
+                    if (dotted_name not in ranked_modules) or (rank < ranked_modules[dotted_name][0]):
+                        ranked_modules[dotted_name] = (rank, file_path)
+        self.modules = {dotted_name: file_path for dotted_name, (_, file_path) in ranked_modules.items()}
+
+    def resolve(self, module: str, from_file: str = None) -> str:
+        """File path of a (possibly relative, e.g. `..pkg.mod`) dotted module name, or None if it is not in the repo"""
+        level = len(module) - len(module.lstrip('.'))
+        module = module[level:]
+        if level == 0:
+            return self.modules.get(module)
+        if from_file is None:
+            return None
+        base_dir = os.path.dirname(os.path.abspath(from_file))
+        for _ in range(level - 1):
+            base_dir = os.path.dirname(base_dir)
+        return self.files.get(os.path.join(base_dir, *module.split('.')) if module else base_dir)
+
+    def resolve_import(self, module: str, name: str, from_file: str = None) -> List[str]:
+        """
+        Files that `from {module} import {name}` depends on
+        - the module itself, plus the submodule `{module}.{name}` if `name` is a module rather than an attribute
+        """
+        resolved_paths = []
+        for dotted_name in [module, f"{module}.{name}" if module.strip('.') else f"{module}{name}"]:
+            resolved_path = self.resolve(dotted_name, from_file)
+            if (resolved_path is not None) and (resolved_path not in resolved_paths):
+                resolved_paths.append(resolved_path)
+        return resolved_paths
@@ -0,0 +1,73 @@
+"""
+Per-run cache of read and parsed repository files
+"""
+
+import os
+import ast
+import threading
+
+
+class ParseCache(object):
+    """
+    Cache of repo files keyed by path and (mtime, size)
+    - text: file content (undecodable bytes dropped, as the extractor always did)
+    - tree: AST with `parent` links on every child node
+    - derived values (extracted function/method records, context code, ...) via `memoize`
+    A file whose mtime or size changed is read and parsed again.
+    """
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.RLock()
+
+    def _get_entry(self, file_path: str) -> dict:
+        stat = os.stat(file_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(file_path)
+            if (entry is None) or (entry['key'] != key):
+                entry = {'key': key, 'text': None, 'tree': None, 'error': None, 'derived': {}}
+                self.entries[file_path] = entry
+            return entry
+
+    def read_text(self, file_path: str) -> str:
+        entry = self._get_entry(file_path)
+        if entry['text'] is None:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    entry['text'] = file.read()
+            except UnicodeDecodeError:  # if is not 'utf-8' encoding
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+                    entry['text'] = file.read().encode('utf-8', errors='ignore').decode('utf-8')
+        return entry['text']
+
+    def get_tree(self, file_path: str) -> ast.AST:
+        """Parsed AST with parent links (raises the cached SyntaxError if the file cannot be parsed)"""
+        entry = self._get_entry(file_path)
+        if (entry['tree'] is None) and (entry['error'] is None):
+            try:
+                tree = ast.parse(self.read_text(file_path), filename=file_path)
+            except (SyntaxError, ValueError) as e:
+                entry['error'] = e if isinstance(e, SyntaxError) else SyntaxError(str(e))
+            else:
+                for node in ast.walk(tree):
+                    for child in ast.iter_child_nodes(node):
+                        child.parent = node
+                entry['tree'] = tree
+        if entry['error'] is not None:
+            raise entry['error']
+        return entry['tree']
+
+    def memoize(self, file_path: str, key, compute):
+        """Compute a value derived from the current version of a file once"""
+        entry = self._get_entry(file_path)
+        if key not in entry['derived']:
+            entry['derived'][key] = compute()
+        return entry['derived'][key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Shared by callee and caller extraction within a construction run
+parse_cache = ParseCache()
@@ -0,0 +1,96 @@
+"""
+Bounded producer/consumer streaming between construction stages
+"""
+
+import os
+import json
+import queue
+import threading
+import multiprocessing
+from typing import Callable, Iterable, Iterator
+
+
+_END = object()
+
+
+def process_pool_context():
+    """
+    Start method for construction process pools
+    - pools may be created while a streaming producer thread holds logger, queue or cache locks:
+      forking a multi-threaded process can deadlock the children, so workers are started from a clean server process
+    """
+    return multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+def stream_in_background(produce: Callable[[], Iterable], max_queued: int = 64, name: str = 'producer') -> Iterator:
+    """
+    Run a producer (e.g. test-object extraction) in a background thread and yield its items as they arrive
+    - the queue is bounded: the producer blocks once `max_queued` items wait for the consumer, so memory stays bounded
+    - an exception raised by the producer is re-raised in the consumer
+    - if the consumer stops early, the producer is stopped at its next item
+    """
+    item_queue = queue.Queue(maxsize=max(1, max_queued))
+    stop_event = threading.Event()
+
+    def put(item) -> bool:
+        while not stop_event.is_set():
+            try:
+                item_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in produce():
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(e if isinstance(e, Exception) else RuntimeError(str(e)))
+
+    producer = threading.Thread(target=run, name=name, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = item_queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        producer.join(timeout=1)
+
+
+class JsonListWriter(object):
+    """
+    Write a JSON list item by item, so that a streamed list is saved without holding it in memory
+    - items go to `{save_path}.part`, which is renamed to `save_path` once the list is complete (`finalize`)
+    - an incomplete list is never saved as `save_path`: `close` without `finalize` discards it
+    - the result is read back with `read_test_data` like any other saved list
+    """
+    def __init__(self, save_path: str):
+        self.save_path = save_path
+        self.part_path = f"{save_path}.part"
+        self.item_count = 0
+        self.file = open(self.part_path, 'w', encoding='utf-8')
+        self.file.write('[')
+
+    def write(self, item):
+        self.file.write((',\n' if self.item_count else '\n') + json.dumps(item, indent=4))
+        self.item_count += 1
+
+    def finalize(self):
+        """Complete the list and save it as `save_path`"""
+        self.file.write('\n]\n')
+        self.file.close()
+        os.replace(self.part_path, self.save_path)
+
+    def close(self):
+        """Discard the list if it was not finalized"""
+        if not self.file.closed:
+            self.file.close()
+            os.remove(self.part_path)
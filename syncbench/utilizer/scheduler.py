@@ -0,0 +1,100 @@
+"""
+Yield-ranked scheduling of dataset construction candidates
+"""
+
+import os
+import heapq
+import math
+import itertools
+from typing import Dict, Iterable, Iterator, List
+
+
+class CandidateScheduler(object):
+    """
+    Best-first order of test items (a unit test file with its candidate functions/methods)
+    - cheap score, no tracing or execution needed:
+      history length of the candidates' files (commit table) + function size - test file size + directory yield
+    - directory yield is the smoothed rate of valid instances per test item seen so far in the test file's
+      directory, so it is re-scored lazily whenever an item reaches the top of the queue
+    - with a `window`, only that many items are buffered (e.g. when test items are streamed from extraction)
+    - inside a test item, candidates are grouped by file with the most-changed files first, so that the gold
+      execution result of a file is still reused by its consecutive candidates
+    """
+    history_weight = 1.0
+    size_weight = 0.5
+    test_size_weight = 0.25
+    yield_weight = 2.0
+
+    def __init__(self, repo_dir: str, file_commit_counts: Dict[str, int] = None, window: int = None):
+        self.repo_dir = repo_dir
+        self.file_commit_counts = file_commit_counts or {}
+        self.window = window
+        self.directory_stats: Dict[str, List[int]] = {}  # test directory -> [valid instances, processed test items]
+        self.sequence = itertools.count()  # ties keep the extraction order
+
+    def file_commits(self, file_path: str) -> int:
+        return self.file_commit_counts.get(os.path.relpath(file_path, self.repo_dir), 0)
+
+    def directory_yield(self, test_file_path: str) -> float:
+        valid_count, processed_count = self.directory_stats.get(os.path.dirname(test_file_path), [0, 0])
+        return (valid_count + 1) / (processed_count + 2)
+
+    def static_score(self, test_item: Dict) -> float:
+        fm_list = test_item['fms']
+        if len(fm_list) == 0:
+            return -math.inf
+        history_length = max(self.file_commits(fm_dict['whole_file_path']) for fm_dict in fm_list)
+        function_size = sum(len(fm_dict['code'].splitlines()) for fm_dict in fm_list) / len(fm_list)
+        try:
+            test_file_size = os.path.getsize(test_item['usage_test_file']) / 1024
+        except OSError:
+            test_file_size = 0
+        return (
+            self.history_weight * math.log1p(history_length)
+            + self.size_weight * math.log1p(function_size)
+            - self.test_size_weight * math.log1p(test_file_size)
+        )
+
+    def score(self, test_item: Dict, static_score: float = None) -> float:
+        static_score = self.static_score(test_item) if static_score is None else static_score
+        return static_score + self.yield_weight * self.directory_yield(test_item['usage_test_file'])
+
+    def order_candidates(self, test_item: Dict) -> Dict:
+        """Test item with its candidates grouped by file, most-changed files first (stable within a file)"""
+        file_order = {}
+        for fm_dict in test_item['fms']:
+            file_order.setdefault(fm_dict['whole_file_path'], len(file_order))
+        ranked_fms = sorted(test_item['fms'], key=lambda fm_dict: (-self.file_commits(fm_dict['whole_file_path']), file_order[fm_dict['whole_file_path']]))
+        return {**test_item, 'fms': ranked_fms}
+
+    def record(self, test_item: Dict, valid_count: int):
+        """Record the number of valid instances a processed test item produced"""
+        stats = self.directory_stats.setdefault(os.path.dirname(test_item['usage_test_file']), [0, 0])
+        stats[0] += valid_count
+        stats[1] += 1
+
+    def schedule(self, test_items: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield test items best-first (among the buffered ones)"""
+        heap = []
+        test_item_iterator = iter(test_items)
+
+        def push(test_item: Dict):
+            static_score = self.static_score(test_item)
+            heapq.heappush(heap, (-self.score(test_item, static_score), next(self.sequence), static_score, test_item))
+
+        def fill():
+            for test_item in test_item_iterator:
+                push(test_item)
+                if (self.window is not None) and (len(heap) >= self.window):
+                    return
+
+        fill()
+        while heap:
+            negative_score, sequence, static_score, test_item = heapq.heappop(heap)
+            current_score = self.score(test_item, static_score)
+            if heap and (-current_score > heap[0][0]) and (-current_score != negative_score):
+                # directory yield changed since the item was queued and it is no longer the best one
+                heapq.heappush(heap, (-current_score, sequence, static_score, test_item))
+                continue
+            yield self.order_candidates(test_item)
+            fill()
@@ -2,54 +2,160 @@
 Trace commits for each function/method
 """
 
+import io
 import git
 import os
-import ast
-import autopep8
 from textwrap import dedent
+from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from syncbench.utilizer.blob_cache import blob_cache, blob_sha
+from syncbench.utilizer.aligner import format_code
+from syncbench.utilizer.fingerprint import code_fingerprint
+from syncbench.utilizer.pipeline import process_pool_context
 from utils.logger import logger
 
 class CodeHistoryTracer:
-    def __init__(self, repo_dir):
+    def __init__(self, repo_dir, trace_method: str = 'blob', history_index=None, commit_table=None):
         self.repo_dir = repo_dir
         self.repo = git.Repo(repo_dir)
+        self.trace_method = trace_method  # blob | checkout
+        self.history_index = history_index  # optional persistent HistoryIndex
+        self.commit_table = commit_table  # optional CommitTable of the repo, used to look up the commits of a file
+        self.file_commits = {}  # (HEAD, file) -> commits found by walking the history, each file is walked once
 
     
     def correct_indentation(self, code: str) -> str:
-        """Python code format correction"""
-        try:
-            corrected_code = autopep8.fix_code(code, options={'indent_size': 4})
-            return corrected_code
-        except Exception as e:
-            logger.warning(f"[Invalid Code Format Correction] An error occurred:\n{e}\nDirectly returning original code...")
-            return code
+        """Python code format correction (memoized by code content)"""
+        return format_code(code)
     
     
-    def get_function_history(self, file_path, function_name):
-        """Trace the history of a specific function/method"""
+    def get_function_history(self, file_path, function_name, body_change_only: bool = False):
+        """
+        Trace the history of a specific function/method
+        - body_change_only: only keep commits that changed the function/method's own source span
+        """
         file_rel_path = os.path.relpath(file_path, self.repo_dir)
-        commits = list(self.repo.iter_commits(paths=file_rel_path))
-        history = []
+        if self.history_index is not None:
+            indexed_history = self.history_index.get_history(file_rel_path, function_name, body_change_only)
+            if indexed_history is not None:
+                return indexed_history
+
+        history, blob_hashes = self.trace_function_history(file_rel_path, function_name, body_change_only)
+        if self.history_index is not None:
+            self.history_index.put_history(file_rel_path, function_name, body_change_only, history, blob_hashes)
+        return history
+
+
+    def get_table_commit_shas(self, file_rel_path) -> List[str]:
+        """Commits that changed a file, newest first, from the commit table (None if there is no table matching the repo HEAD)"""
+        if (self.commit_table is not None) and (self.commit_table.head == self.repo.head.commit.hexsha):
+            return self.commit_table.commits_for_file(file_rel_path)
+        return None
+
+
+    def get_file_commits(self, file_rel_path, commit_shas: List[str] = None) -> List:
+        """
+        Commits that changed a file along the first-parent history, newest first
+        - looked up in the commit table if it matches the repo HEAD, walked otherwise (both give the same commits)
+        - merges count as changes relative to their first parent: side-branch commits are not traced
+        """
+        if commit_shas is None:
+            commit_shas = self.get_table_commit_shas(file_rel_path)
+        if commit_shas is not None:
+            return [self.repo.commit(commit_sha) for commit_sha in commit_shas]
+        file_key = (self.repo.head.commit.hexsha, file_rel_path)
+        if file_key not in self.file_commits:
+            self.file_commits[file_key] = list(self.repo.iter_commits(paths=file_rel_path, first_parent=True))
+        return self.file_commits[file_key]
+
+
+    def trace_function_history(self, file_rel_path, function_name, body_change_only: bool = False, commit_shas: List[str] = None):
+        """Walk the commits of a file and collect the history records and blob SHAs of a function/method"""
+        commits = self.get_file_commits(file_rel_path, commit_shas)
+        versions = []
         for commit in commits:
             self.checkout_commit(commit)
-            code = self.get_function_code_at_commit(file_rel_path, function_name)
-            if code:
-                log_content = self.repo.git.show(commit)
-                history.append({
-                    "log": log_content,
-                    "commit": commit.hexsha,
-                    "message": commit.message,
-                    "author": commit.author.name,
-                    "date": str(commit.committed_datetime),
-                    "code": self.correct_indentation(code)
-                })
-
+            versions.append((commit, *self.get_function_blob_at_commit(file_rel_path, function_name, commit)))
         self.checkout_main_branch()
-        return history
+
+        history, blob_hashes = [], []
+        for commit, file_blob_sha, code in versions:
+            if not code:
+                continue
+            # Compare with the version this commit was based on: its first parent
+            # (the next commit of the walk is not the parent once the history has merges or parallel branches)
+            if body_change_only and (code == self.get_parent_function_code(file_rel_path, function_name, commit)):
+                continue
+            log_content = self.repo.git.show(commit)
+            formatted_code = blob_cache.memoize(file_blob_sha, ('formatted_function', function_name), lambda: self.correct_indentation(code))
+            history.append({
+                "log": log_content,
+                "commit": commit.hexsha,
+                "message": commit.message,
+                "author": commit.author.name,
+                "date": str(commit.committed_datetime),
+                "code": formatted_code,
+                "fingerprint": code_fingerprint(formatted_code)
+            })
+            blob_hashes.append(file_blob_sha)
+        return history, blob_hashes
+
+
+    def get_function_histories(self, fm_list: List[Tuple[str, str]], body_change_only: bool = False, num_workers: int = 1, executor: ProcessPoolExecutor = None) -> Dict:
+        """
+        Trace the histories of many (file_path, function_name) pairs
+        - num_workers > 1: fan the tracing jobs out over a process pool, each worker uses its own checkout-free reader
+          and walks the commits of a file itself when there is no commit table
+        - `executor`: long-lived pool reused across calls (its workers keep their tracers), otherwise a pool is started for this call
+        - results (and history index writes) are collected in this process
+        """
+        histories, pending_jobs = {}, []
+        for file_path, function_name in dict.fromkeys(fm_list):
+            file_rel_path = os.path.relpath(file_path, self.repo_dir)
+            if self.history_index is not None:
+                indexed_history = self.history_index.get_history(file_rel_path, function_name, body_change_only)
+                if indexed_history is not None:
+                    histories[(file_path, function_name)] = indexed_history
+                    continue
+            pending_jobs.append((file_path, function_name, file_rel_path))
+
+        if (num_workers <= 1) or (len(pending_jobs) <= 1):
+            for file_path, function_name, _ in pending_jobs:
+                histories[(file_path, function_name)] = self.get_function_history(file_path, function_name, body_change_only)
+            return histories
+
+        logger.info(f"Tracing {len(pending_jobs)} function/method histories with {min(num_workers, len(pending_jobs))} workers...")
+        owned_executor = None
+        if executor is None:
+            executor = owned_executor = ProcessPoolExecutor(max_workers=min(num_workers, len(pending_jobs)), mp_context=process_pool_context())
+        try:
+            futures = {
+                executor.submit(
+                    trace_function_history_job, self.repo_dir, file_rel_path, function_name, body_change_only, 
+                    self.get_table_commit_shas(file_rel_path)
+                ): (file_path, function_name, file_rel_path)
+                for file_path, function_name, file_rel_path in pending_jobs
+            }
+            for future in as_completed(futures):
+                file_path, function_name, file_rel_path = futures[future]
+                try:
+                    history, blob_hashes = future.result()
+                except Exception as e:
+                    logger.warning(f"Parallel tracing failed for `{function_name}` in `{file_rel_path}`: {e}\nTracing it again in the main process...")
+                    history, blob_hashes = self.trace_function_history(file_rel_path, function_name, body_change_only)
+                if self.history_index is not None:
+                    self.history_index.put_history(file_rel_path, function_name, body_change_only, history, blob_hashes)
+                histories[(file_path, function_name)] = history
+        finally:
+            if owned_executor is not None:
+                owned_executor.shutdown()
+        return histories
     
     
     def checkout_commit(self, commit):
         """Safely checkout to a specific commit"""
+        if self.trace_method == 'blob':  # file contents are read from the object database instead
+            return
         try:
             self.repo.git.reset('--hard')
             self.repo.git.checkout(commit)
@@ -59,6 +165,8 @@ class CodeHistoryTracer:
 
     def checkout_main_branch(self):
         """Return to the main or master branch and apply stashed changes"""
+        if self.trace_method == 'blob':  # working tree was never touched
+            return
         try:
             branch_name = "main" if "main" in self.repo.heads else "master"
             self.repo.git.checkout(branch_name)
@@ -69,52 +177,112 @@ class CodeHistoryTracer:
             logger.warning(f"Error during checkout: {e}\nSkipping current commit checkout...")
     
 
-    def get_function_code_at_commit(self, file_rel_path, function_name):
-        """Get the function/method code from a specific commit"""
-        file_path = os.path.join(self.repo_dir, file_rel_path)
-        if not os.path.exists(file_path):
-            return None
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+    def read_file_at_commit(self, file_rel_path, commit=None, errors: str = 'strict'):
+        """
+        Read a file as it was at a specific commit
+        - blob: read commit tree -> blob from the git object database, without touching the working tree
+        - checkout: read the file from the (already checked out) working tree
+        Returns None if the file does not exist at that commit.
+        """
+        _, file_content = self.read_blob_at_commit(file_rel_path, commit, errors)
+        return file_content
+
+
+    def read_blob_at_commit(self, file_rel_path, commit=None, errors: str = 'strict'):
+        """Read a file at a specific commit, returning (blob SHA, text) or (None, None) if it does not exist"""
+        if (self.trace_method == 'checkout') or (commit is None):
+            file_path = os.path.join(self.repo_dir, file_rel_path)
+            if not os.path.exists(file_path):
+                return None, None
+            with open(file_path, 'r', encoding='utf-8', errors=errors) as file:
                 file_content = file.read()
+            return blob_sha(file_content), file_content
+
+        return self.read_tree_blob(file_rel_path, commit, errors)
+
+
+    def read_tree_blob(self, file_rel_path, commit, errors: str = 'strict'):
+        """Read a file from the tree of a commit in the git object database, returning (blob SHA, text) or (None, None)"""
+        if not isinstance(commit, git.Commit):
+            commit = self.repo.commit(commit)
+        try:
+            blob = commit.tree / file_rel_path.replace(os.sep, '/')
+        except KeyError:
+            return None, None
+        if blob.type != 'blob':
+            return None, None
+        # Each valid UTF-8 blob is read and decoded once per run, other blobs are decoded with `errors` and not cached
+        file_content = blob_cache.get_text(blob.hexsha)
+        if file_content is None:
+            blob_data = blob.data_stream.read()
             try:
-                tree = ast.parse(file_content)
-                return file_content
-            except (SyntaxError, IndentationError) as e:
-                logger.warning(f"Skipping commit due to parsing error: {e}")
+                file_content = blob_cache.put_text(blob.hexsha, self.decode_blob(blob_data, 'strict'))
+            except UnicodeDecodeError:
+                if errors == 'strict':
+                    raise
+                file_content = self.decode_blob(blob_data, errors)
+        return blob.hexsha, file_content
+
+
+    def decode_blob(self, blob_data: bytes, errors: str = 'strict') -> str:
+        """Decode blob bytes like `open(..., 'r')` does, including universal newlines"""
+        with io.TextIOWrapper(io.BytesIO(blob_data), encoding='utf-8', errors=errors) as file:
+            return file.read()
+
+
+    def get_parent_function_code(self, file_rel_path, function_name, commit):
+        """Function/method code at the first parent of a commit, read from the object database (None if absent or unparsable)"""
+        if not commit.parents:
+            return None
+        try:
+            file_blob_sha, file_content = self.read_tree_blob(file_rel_path, commit.parents[0], errors='replace')
+            if file_content is None:
                 return None
-        except Exception as e:
-            logger.warning(f"Error reading file {file_path}: {e}")
+            return blob_cache.get_symbols(file_blob_sha, file_content).get(function_name)
+        except (SyntaxError, IndentationError, ValueError):
             return None
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name == function_name:
-                return dedent(ast.get_source_segment(file_content, node))
-            if isinstance(node, ast.ClassDef):
-                for child in node.body:
-                    if isinstance(child, ast.FunctionDef) and child.name == function_name:
-                        return dedent(ast.get_source_segment(file_content, child))
-        return None
-    
-    
+
+    def get_function_code_at_commit(self, file_rel_path, function_name, commit=None):
+        """Get the function/method code from a specific commit"""
+        _, function_code = self.get_function_blob_at_commit(file_rel_path, function_name, commit)
+        return function_code
+
+
+    def get_function_blob_at_commit(self, file_rel_path, function_name, commit=None):
+        """Get (blob SHA, function/method code) from a specific commit"""
+        try:
+            file_blob_sha, file_content = self.read_blob_at_commit(file_rel_path, commit, errors='replace')
+            if file_content is None:
+                return None, None
+            return file_blob_sha, blob_cache.get_symbols(file_blob_sha, file_content).get(function_name)
+        except (SyntaxError, IndentationError) as e:
+            logger.warning(f"Skipping commit due to parsing error: {e}")
+            return None, None
+        except Exception as e:
+            logger.warning(f"Error reading file {os.path.join(self.repo_dir, file_rel_path)}: {e}")
+            return None, None
+
+
     def restore_function_code(self, file_path, function_name, commit_hash):
         """Restore the function/method code to a specific version"""
         self.checkout_commit(commit_hash)
         file_rel_path = os.path.relpath(file_path, self.repo_dir)
-        restored_code = self.get_function_code_at_commit(file_rel_path, function_name)
+        file_blob_sha, restored_code = self.get_function_blob_at_commit(file_rel_path, function_name, commit_hash)
         self.checkout_main_branch()
-        return self.correct_indentation(restored_code)
+        if restored_code is None:
+            return self.correct_indentation(restored_code)
+        return blob_cache.memoize(file_blob_sha, ('formatted_function', function_name), lambda: self.correct_indentation(restored_code))
     
     
     def get_file_history(self, file_path):
         """Trace the history of a Python file"""
         file_rel_path = os.path.relpath(file_path, self.repo_dir)
-        commits = list(self.repo.iter_commits(paths=file_rel_path))
+        commits = self.get_file_commits(file_rel_path)
         history = []
         for commit in commits:
             self.checkout_commit(commit)
-            code = self.get_file_code_at_commit(file_rel_path)
+            code = self.get_file_code_at_commit(file_rel_path, commit)
             if code:
                 log_content = self.repo.git.show(commit)
                 history.append({
@@ -130,15 +298,12 @@ class CodeHistoryTracer:
         return history
     
     
-    def get_file_code_at_commit(self, file_rel_path):
+    def get_file_code_at_commit(self, file_rel_path, commit=None):
         """Get the entire file code from a specific commit"""
-        file_path = os.path.join(self.repo_dir, file_rel_path)
-        if not os.path.exists(file_path):
+        file_content = self.read_file_at_commit(file_rel_path, commit)
+        if file_content is None:
             return None
 
-        with open(file_path, 'r', encoding='utf-8') as file:
-            file_content = file.read()
-
         try:
             return dedent(file_content)
         except (SyntaxError, IndentationError) as e:
@@ -150,6 +315,19 @@ class CodeHistoryTracer:
         """Restore the entire file code to a specific version at a specific commit"""
         self.checkout_commit(commit_hash)
         file_rel_path = os.path.relpath(file_path, self.repo_dir)
-        restored_code = self.get_file_code_at_commit(file_rel_path)
+        file_blob_sha, _ = self.read_blob_at_commit(file_rel_path, commit_hash)
+        restored_code = self.get_file_code_at_commit(file_rel_path, commit_hash)
         self.checkout_main_branch()
-        return self.correct_indentation(restored_code)
+        if restored_code is None:
+            return self.correct_indentation(restored_code)
+        return blob_cache.memoize(file_blob_sha, 'formatted_file', lambda: self.correct_indentation(restored_code))
+
+
+# Process pool workers keep one checkout-free tracer per repo
+_worker_tracers = {}
+
+def trace_function_history_job(repo_dir, file_rel_path, function_name, body_change_only: bool = False, commit_shas: List[str] = None):
+    """Process pool worker: trace a single function/method history without touching the working tree"""
+    if repo_dir not in _worker_tracers:
+        _worker_tracers[repo_dir] = CodeHistoryTracer(repo_dir, 'blob')
+    return _worker_tracers[repo_dir].trace_function_history(file_rel_path, function_name, body_change_only, commit_shas)
@@ -38,6 +38,7 @@ class DockerManager:
         self.image_workdir = "/workspace"
         self.image_venv_dir = f"{self.image_workdir}/test_venv"
         self.image_venv_bin_dir = f"{self.image_venv_dir}/bin"
+        self.image_install_marker_path = f"{self.image_workdir}/.editable_install.sha256"  # packaging metadata of the editable install snapshot
         self.dockerhub_username = 'xuehang'
         # Docker container
         self.container_name = f"{self.image_name.replace('/', '_')}_container_{str(time.ctime()).replace(':', '_').replace(' ', '_')}"
@@ -111,6 +112,15 @@ class DockerManager:
         package_name = re.split(r'[=<>!]', requirement_line, 1)[0].strip()
         return package_name
         
+    def editable_install_command(self):
+        """Shell command (re)installing the repo in editable mode only if its packaging metadata differs from the image snapshot"""
+        metadata_hash_command = "cat setup.py setup.cfg pyproject.toml 2>/dev/null | sha256sum"
+        return (
+            f"if [ \"$({metadata_hash_command})\" != \"$(cat {self.image_install_marker_path} 2>/dev/null)\" ]; then "
+            f"{self.image_venv_bin_dir}/python -m pip install -e . && {metadata_hash_command} > {self.image_install_marker_path}; "
+            f"fi"
+        )
+        
     def install_dependency_in_image(self):
         """Install dependencies in docker image"""
         logger.info(f"Adding dependencies install commands to Dockerfile for docker image '{self.image_name}'...")
@@ -157,6 +167,9 @@ class DockerManager:
                     install_command = f"RUN {self.image_venv_bin_dir}/{install_command_item}"
                     self.dockerfile_content.append(install_command)
 
+            # Editable install snapshot: test runs skip `pip install -e .` while the packaging metadata is unchanged
+            self.dockerfile_content.append(f"RUN {self.editable_install_command()} || echo 'Editable install failed, it will be retried at test time'")
+
             # Write the Dockerfile
             with open(self.dockerfile_path, 'w') as dockerfile:
                 dockerfile.write("\n".join(self.dockerfile_content))
@@ -373,7 +373,7 @@ class DockerEvaluator(DockerManager):
                 f"{self.image_name}:{self.image_tag}",
                 "/bin/bash", "-c",
                 f"export PYTHONPATH=$PYTHONPATH:{self.container_workdir} && "
-                f"{self.image_venv_bin_dir}/python -m pip install -e . && "
+                f"{self.editable_install_command()} && "
                 f"{self.image_venv_bin_dir}/python -m {self.test_method} -v {test_file_path_in_container} "
                 f"{self.env_additional_unittest_command} "
             ]
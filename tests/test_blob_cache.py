@@ -0,0 +1,81 @@
+"""
+Unit test on the content-addressed blob cache
+"""
+
+import pytest
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.blob_cache import BlobCache, blob_sha
+from syncbench.constructor.instancer import remove_fm_in_context_code
+
+
+SOURCE_CODE = '''
+def add(a, b):
+    return a + b
+
+
+class Calculator:
+    def scale(self, value, factor):
+        return value * factor
+'''
+
+
+def test_blob_sha_matches_git():
+    """Blob SHA equals `git hash-object` of the same content"""
+    assert blob_sha("hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_symbols_include_functions_and_methods():
+    cache = BlobCache()
+    sha = blob_sha(SOURCE_CODE)
+    symbols = cache.get_symbols(sha, SOURCE_CODE)
+    assert symbols['add'].startswith("def add(a, b):")
+    assert symbols['scale'].startswith("def scale(self, value, factor):")
+    assert cache.get_symbols(sha) is symbols
+
+
+def test_symbols_of_invalid_code():
+    cache = BlobCache()
+    with pytest.raises(SyntaxError):
+        cache.get_symbols(blob_sha("def broken(:"), "def broken(:")
+
+
+def test_memoize_computes_once():
+    cache = BlobCache()
+    sha = blob_sha(SOURCE_CODE)
+    calls = []
+    compute = lambda: calls.append(1) or SOURCE_CODE.upper()
+    assert cache.memoize(sha, 'upper', compute, SOURCE_CODE) == SOURCE_CODE.upper()
+    assert cache.memoize(sha, 'upper', compute) == SOURCE_CODE.upper()
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction():
+    """Least recently used blobs are evicted once the size bound is exceeded"""
+    cache = BlobCache(max_bytes=10)
+    cache.put_text("a", "aaaa")
+    cache.put_text("b", "bbbb")
+    cache.get_text("a")
+    cache.put_text("c", "cccc")
+    assert cache.get_text("b") is None
+    assert cache.get_text("a") == "aaaa"
+    assert cache.get_text("c") == "cccc"
+    assert cache.total_bytes == 8
+
+
+def test_remove_fm_in_context_code_is_memoized():
+    first_result = remove_fm_in_context_code("add", SOURCE_CODE)
+    assert "def add" not in first_result
+    assert "def scale" in first_result
+    assert remove_fm_in_context_code("add", SOURCE_CODE) is first_result
+
+
+def test_derived_keys_count_toward_size_bound():
+    cache = BlobCache()
+    sha = blob_sha(SOURCE_CODE)
+    cache.put_text(sha, SOURCE_CODE)
+    cache.memoize(sha, ('fm_removed', 'add'), lambda: "x")
+    assert cache.total_bytes == len(SOURCE_CODE) + len('fm_removed') + len('add') + len("x")
@@ -0,0 +1,67 @@
+"""
+Unit test on the construction checkpoint journal
+"""
+
+import pytest
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.checkpoint import CheckpointJournal
+from syncbench.constructor.callee_builder import CalleeConstructor
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "checkpoint" / "1_repo_callee_journal.jsonl")
+
+
+def test_journal_survives_restart(journal_path):
+    journal = CheckpointJournal(journal_path, resume=False)
+    commit_key = journal.make_key('commit', 'tests/test_calc.py', 'pkg/calc.py', 'add', 'abc123')
+    journal.record(commit_key, 'invalid', 'unchanged code')
+    journal.record(journal.make_key('commit', 'tests/test_calc.py', 'pkg/calc.py', 'add', 'def456'), 'valid', 'fail-to-pass')
+    journal.record(journal.make_key('test', 'tests/test_calc.py'), 'done')
+
+    resumed_journal = CheckpointJournal(journal_path, resume=True)
+    assert resumed_journal.is_done(commit_key)
+    assert resumed_journal.get(commit_key)['reason'] == 'unchanged code'
+    assert not resumed_journal.is_done(resumed_journal.make_key('commit', 'tests/test_calc.py', 'pkg/calc.py', 'add', 'fff000'))
+    assert resumed_journal.summary() == {'invalid': 1, 'valid': 1, 'done': 1}
+
+
+def test_truncated_record_is_ignored(journal_path):
+    journal = CheckpointJournal(journal_path, resume=False)
+    journal.record(journal.make_key('test', 'a'), 'done')
+    with open(journal_path, 'a') as journal_file:
+        journal_file.write('{"key": "partial", "outc')
+    assert CheckpointJournal(journal_path, resume=True).summary() == {'done': 1}
+
+
+def test_start_over_discards_journal(journal_path):
+    CheckpointJournal(journal_path, resume=False).record('key', 'timeout')
+    assert not CheckpointJournal(journal_path, resume=False).is_done('key')
+    assert not os.path.exists(journal_path)
+
+
+def test_every_module_of_a_test_file_is_processed(journal_path):
+    constructor = object.__new__(CalleeConstructor)
+    constructor.checkpoint = CheckpointJournal(journal_path, resume=False)
+    constructor.filtered_fm_dict_list = []
+    constructor.instance_quota = 0
+    processed = []
+
+    def fm_filtering(args, test_item):
+        processed.append(test_item['pyfile_name'])
+        constructor.checkpoint.record(constructor.test_item_key(test_item), 'done')
+        return []
+
+    constructor.fm_filtering = fm_filtering
+    test_items = [
+        {'usage_test_file': "tests/test_calc.py", 'pyfile_name': name, 'pyfile_path': f"pkg/{name}", 'fms': []}
+        for name in ["calc.py", "util.py"]
+    ]
+    constructor.filter_test_items(None, test_items)
+    assert processed == ["calc.py", "util.py"]
+    constructor.filter_test_items(None, test_items)  # resumed run: both modules already journaled
+    assert processed == ["calc.py", "util.py"]
@@ -0,0 +1,65 @@
+"""
+Unit test on the warm container pool of execution tests
+"""
+
+import pytest
+from unittest.mock import patch
+
+import os
+import sys
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.evaluator.container_pool import ContainerPool, container_pools, get_container_pool, close_container_pools
+
+
+@pytest.fixture
+def docker_calls():
+    calls = []
+
+    def run_docker(self, command, timeout=None):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout='', stderr='')
+
+    with patch.object(ContainerPool, 'run_docker', run_docker):
+        yield calls
+
+
+def test_container_started_once_and_reused(docker_calls):
+    container_pool = ContainerPool("xuehang/1_repo:3.9", "/workspace/test_repo", size=1)
+    container_name = container_pool.acquire()
+    assert docker_calls[0][:3] == ["docker", "run", "-d"]
+
+    container_pool.release(container_name)
+    assert docker_calls[-1] == container_pool.exec_command(container_name, "git checkout -- . && git clean -fdq -e '*.egg-info'")
+    assert container_pool.acquire() == container_name
+    assert sum(command[:2] == ["docker", "run"] for command in docker_calls) == 1
+
+
+def test_unhealthy_container_replaced(docker_calls):
+    container_pool = ContainerPool("xuehang/1_repo:3.9", "/workspace/test_repo", size=1)
+    container_name = container_pool.acquire()
+    container_pool.release(container_name, healthy=False)  # e.g. timed out test
+    assert docker_calls[-1] == ["docker", "rm", "-f", container_name]
+    assert container_pool.container_count == 0
+
+    new_container_name = container_pool.acquire()
+    assert new_container_name != container_name
+    assert sum(command[:2] == ["docker", "run"] for command in docker_calls) == 2
+
+
+def test_start_failure_frees_slot(docker_calls):
+    container_pool = ContainerPool("xuehang/1_repo:3.9", "/workspace/test_repo", size=1)
+    with patch.object(ContainerPool, 'run_docker', return_value=subprocess.CompletedProcess([], 1, stdout='', stderr='no such image')):
+        with pytest.raises(RuntimeError, match="no such image"):
+            container_pool.acquire()
+    assert container_pool.container_count == 0
+    assert container_pool.acquire() is not None
+
+
+def test_pools_shared_per_image(docker_calls):
+    container_pool = get_container_pool("xuehang/1_repo:3.9", "/workspace/test_repo", 2)
+    assert get_container_pool("xuehang/1_repo:3.9", "/workspace/test_repo", 2) is container_pool
+    container_names = [container_pool.acquire(), container_pool.acquire()]
+    close_container_pools()
+    assert container_pools == {}
+    assert sorted(command[-1] for command in docker_calls if command[:2] == ["docker", "rm"]) == sorted(container_names)
@@ -0,0 +1,37 @@
+"""
+Unit test on the interned context store
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.context_store import ContextStore
+
+
+CONTEXT_CODE = [{'name': 'calc.py', 'whole_file_path': '/repo/calc.py', 'code': 'def add(a, b):\n    return a + b\n'}]
+
+
+def test_context_is_interned_once():
+    context_store = ContextStore()
+    context_id = context_store.intern(CONTEXT_CODE)
+    assert context_store.intern([dict(item) for item in CONTEXT_CODE]) == context_id
+    assert len(context_store.contexts) == 1
+    assert context_store.resolve({'name': 'add', 'context_id': context_id}) is CONTEXT_CODE
+
+
+def test_inline_context_and_unknown_id():
+    context_store = ContextStore()
+    assert context_store.resolve({'name': 'add', 'context': CONTEXT_CODE}) is CONTEXT_CODE
+    assert context_store.resolve({'name': 'add', 'context_id': 'missing'}) == []
+
+
+def test_save_and_load_referenced_contexts(tmp_path):
+    context_store = ContextStore()
+    context_id = context_store.intern(CONTEXT_CODE)
+    context_store.intern([{'name': 'unused.py', 'whole_file_path': '/repo/unused.py', 'code': ''}])
+    save_path = str(tmp_path / "context_store.json")
+    context_store.save(save_path, {context_id})
+
+    loaded_store = ContextStore()
+    loaded_store.load(save_path)
+    assert loaded_store.contexts == {context_id: CONTEXT_CODE}
@@ -0,0 +1,65 @@
+"""
+Unit test on coverage-guided test -> function/method mapping
+"""
+
+import pytest
+from unittest.mock import patch
+
+import os
+import sys
+import json
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.evaluator.coverage import COVERAGE_RUNNER, CoverageMapper
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    (tmp_path / "calc.py").write_text(
+        "def add(a, b):\n    return a + b\n\n\n"
+        "def unused(a):\n    return a\n\n\n"
+        "class Calculator:\n    def scale(self, value):\n        return add(value, value)\n"
+    )
+    (tmp_path / "test_calc.py").write_text(
+        "from calc import Calculator\n\n\n"
+        "def test_scale():\n    assert Calculator().scale(2) == 4\n"
+    )
+    return str(tmp_path)
+
+
+def test_runner_records_called_functions(repo_dir, tmp_path_factory):
+    runner_dir = tmp_path_factory.mktemp("runner")
+    runner_path = runner_dir / "coverage_runner.py"
+    runner_path.write_text(COVERAGE_RUNNER)
+    output_path = runner_dir / "coverage.json"
+
+    subprocess.run(
+        [sys.executable, str(runner_path), repo_dir, os.path.join(repo_dir, "test_calc.py"), str(output_path), "pytest"],
+        cwd=repo_dir, capture_output=True, text=True, timeout=120
+    )
+    coverage = json.loads(output_path.read_text())
+    assert {'add', 'scale'} <= set(coverage['calc.py'])
+    assert 'unused' not in coverage['calc.py']
+    assert 'test_scale' in coverage['test_calc.py']
+
+
+def test_filter_covered(repo_dir, tmp_path_factory):
+    coverage_mapper = object.__new__(CoverageMapper)
+    coverage_mapper.repo_dir = repo_dir
+    coverage_mapper.coverage_map = {}
+    coverage_mapper.coverage_map_path = str(tmp_path_factory.mktemp("coverage") / "coverage_map.json")
+    fm_list = [
+        {'name': name, 'whole_file_path': os.path.join(repo_dir, 'calc.py')} for name in ['add', 'unused', 'scale']
+    ]
+    test_file_path = os.path.join(repo_dir, "test_calc.py")
+
+    with patch.object(CoverageMapper, 'run_coverage_in_container', return_value={'calc.py': ['add', 'scale']}) as mock_run:
+        assert [fm_dict['name'] for fm_dict in coverage_mapper.filter_covered(test_file_path, fm_list)] == ['add', 'scale']
+        coverage_mapper.filter_covered(test_file_path, fm_list)
+        assert mock_run.call_count == 1  # each test file runs once
+    with open(coverage_mapper.coverage_map_path) as coverage_map_file:
+        assert json.load(coverage_map_file) == {'test_calc.py': {'calc.py': ['add', 'scale']}}
+
+    # unknown coverage (failed run) keeps every function/method
+    coverage_mapper.coverage_map['test_calc.py'] = None
+    assert coverage_mapper.filter_covered(test_file_path, fm_list) == fm_list
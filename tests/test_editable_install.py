@@ -0,0 +1,34 @@
+"""
+Unit test on skipping the editable install while the packaging metadata is unchanged
+"""
+
+import os
+import sys
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.evaluator.builder import SandBoxManager
+
+
+def test_editable_install_only_when_metadata_changes(tmp_path):
+    repo_dir = tmp_path / "test_repo"
+    repo_dir.mkdir()
+    (repo_dir / "pyproject.toml").write_text("[project]\nname = 'calc'\n")
+    venv_bin_dir = tmp_path / "bin"
+    venv_bin_dir.mkdir()
+    install_log = tmp_path / "install.log"
+    fake_python = venv_bin_dir / "python"
+    fake_python.write_text(f"#!/bin/bash\necho \"$@\" >> {install_log}\n")
+    fake_python.chmod(0o755)
+
+    sandbox_manager = object.__new__(SandBoxManager)
+    sandbox_manager.image_venv_bin_dir = str(venv_bin_dir)
+    sandbox_manager.image_install_marker_path = str(tmp_path / ".editable_install.sha256")
+
+    def run_install():
+        subprocess.run(["/bin/bash", "-c", sandbox_manager.editable_install_command()], cwd=repo_dir, check=True)
+        return install_log.read_text().splitlines() if install_log.exists() else []
+
+    assert run_install() == ["-m pip install -e ."]  # no snapshot yet
+    assert run_install() == ["-m pip install -e ."]  # snapshot matches: skipped
+    (repo_dir / "pyproject.toml").write_text("[project]\nname = 'calc'\ndependencies = ['numpy']\n")
+    assert run_install() == ["-m pip install -e .", "-m pip install -e ."]
@@ -0,0 +1,71 @@
+"""
+Unit test on the persistent execution test result cache
+"""
+
+import os
+import sys
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.evaluator.execution_cache import ExecutionCache
+from syncbench.evaluator.tester import SandBoxET
+
+
+def make_test_eval(returncode=0):
+    exe_result = subprocess.CompletedProcess(["docker", "run"], returncode, stdout="1 passed in 0.01s", stderr="")
+    return {'adapt_grade': int(returncode == 0), 'adapt_comment': exe_result.stdout, 'exe_result': exe_result, 'summary': {'total': 1, 'passed': 1}}
+
+
+def test_key_depends_on_injected_content():
+    key = ExecutionCache.make_key("sha256:abc", "tests/test_calc.py", {"calc.py": "def add(a, b):\n    return a + b\n"}, "pytest")
+    assert key == ExecutionCache.make_key("sha256:abc", "tests/test_calc.py", {"calc.py": "def add(a, b):\n    return a + b\n"}, "pytest")
+    assert key != ExecutionCache.make_key("sha256:abc", "tests/test_calc.py", {"calc.py": "def add(a, b):\n    return a - b\n"}, "pytest")
+    assert key != ExecutionCache.make_key("sha256:def", "tests/test_calc.py", {"calc.py": "def add(a, b):\n    return a + b\n"}, "pytest")
+    assert key != ExecutionCache.make_key("sha256:abc", "tests/test_calc.py", {}, "pytest")
+
+
+def test_results_persist_across_runs(tmp_path):
+    cache_path = str(tmp_path / "execution_cache" / "1_calc_execution_cache.db")
+    execution_cache = ExecutionCache(cache_path)
+    assert execution_cache.get("gold") is None
+    execution_cache.put("gold", make_test_eval(), "sha256:abc", "tests/test_calc.py")
+    execution_cache.close()
+
+    execution_cache = ExecutionCache(cache_path)
+    test_eval = execution_cache.get("gold")
+    assert test_eval['adapt_grade'] == 1
+    assert test_eval['summary'] == {'total': 1, 'passed': 1}
+    assert test_eval['exe_result'].stdout == "1 passed in 0.01s"
+    assert test_eval['exe_result'].returncode == 0
+    assert execution_cache.summary() == "1 hits / 1 lookups (100.0% hit rate)"
+
+
+def test_failed_runs_cached_but_not_timeouts_or_docker_errors(tmp_path):
+    execution_cache = ExecutionCache(str(tmp_path / "execution_cache.db"))
+    failed_eval = make_test_eval()
+    failed_eval['exe_result'] = subprocess.CalledProcessError(1, ["docker", "run"], output="1 failed", stderr="AssertionError")
+    execution_cache.put("failed", failed_eval)
+    execution_cache.put("timeout", 'Timeout')
+    execution_cache.put("invalid", 'Invalid Test')
+    docker_error_eval = make_test_eval()
+    docker_error_eval['exe_result'] = subprocess.CalledProcessError(125, ["docker", "run"], output="", stderr="Unable to find image")
+    execution_cache.put("docker_error", docker_error_eval)
+
+    cached_eval = execution_cache.get("failed")
+    assert (cached_eval['exe_result'].returncode, cached_eval['exe_result'].stdout, cached_eval['exe_result'].stderr) == (1, "1 failed", "AssertionError")
+    assert execution_cache.get("timeout") is None
+    assert execution_cache.get("invalid") is None
+    assert execution_cache.get("docker_error") is None
+    assert execution_cache.hit_rate() == 0.25
+
+
+def test_unparsed_runs_not_cached(tmp_path):
+    exe_tester = object.__new__(SandBoxET)
+    exe_tester.if_gold_unit_test = False
+    exe_tester.execution_cache = ExecutionCache(str(tmp_path / "execution_cache.db"))
+    exe_tester.execution_cache_key = lambda: "history"
+    exe_tester.image_id = "sha256:abc"
+    exe_tester.usage_test_file_path = "/root/syncbench_build/code/test_repo/tests/test_calc.py"
+    exe_tester.parsed_test_count = 0  # e.g. the container failed before pytest reported anything
+    exe_tester.run_unittest_for_history_code = lambda: make_test_eval(returncode=1)
+    exe_tester.run_unittest()
+    assert exe_tester.execution_cache.get("history") is None
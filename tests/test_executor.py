@@ -0,0 +1,93 @@
+"""
+Unit test on bounded-concurrency scheduling of execution tests
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.evaluator.executor import ExecutionScheduler
+from syncbench.constructor.callee_builder import CalleeConstructor
+from syncbench.constructor.instancer import InstanceConfig
+
+
+ARGS = argparse.Namespace(unittest_exetest_method=1)
+
+
+def test_single_worker_runs_on_demand():
+    calls = []
+    execution_scheduler = ExecutionScheduler(1)
+    future = execution_scheduler.submit(calls.append, 'gold')
+    cancelled_future = execution_scheduler.submit(calls.append, 'original')
+    assert calls == []  # nothing runs ahead of the decision that needs it
+    future.result()
+    future.result()
+    assert cancelled_future.cancel()
+    assert calls == ['gold']
+
+
+def test_workers_bound_concurrency():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def run_test(index):
+        with lock:
+            running.append(index)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(index)
+        return index
+
+    execution_scheduler = ExecutionScheduler(3)
+    futures = [execution_scheduler.submit(run_test, index) for index in range(9)]
+    assert [future.result() for future in futures] == list(range(9))
+    assert 1 < max(peak) <= 3
+    execution_scheduler.shutdown()
+
+
+def make_constructor(workers, executed):
+    constructor = object.__new__(CalleeConstructor)
+    constructor.execution_scheduler = ExecutionScheduler(workers)
+
+    def filter_via_execution_test(args, new_instance, tested_code, context_code, if_gold_unit_test=False, image_id=None):
+        executed.append('gold' if if_gold_unit_test else tested_code)
+        return tested_code
+
+    constructor.resolve_repo_image = lambda args, instance: executed.append('image') or "sha256:abc"
+
+    constructor.filter_via_execution_test = filter_via_execution_test
+    return constructor
+
+
+def test_candidates_decided_in_history_order():
+    pulled = []
+
+    def candidates():
+        for commit in ['c1', 'c2', 'c3', 'c4']:
+            pulled.append(commit)
+            yield {'entry': {'commit': commit, 'code': f"code_{commit}"}, 'new_context_code': []}
+
+    executed = []
+    constructor = make_constructor(2, executed)
+    scheduled = constructor.schedule_execution_tests(ARGS, InstanceConfig(gold_code="gold_code"), candidates(), True)
+    first = next(scheduled)
+    assert first['entry']['commit'] == 'c1'
+    assert pulled == ['c1', 'c2']  # one candidate ahead with 2 workers
+    assert first['gold_future'].result() == "gold_code"
+    assert [candidate['original_future'].result() for candidate in [first, *scheduled]] == ["code_c1", "code_c2", "code_c3", "code_c4"]
+    assert executed.count('image') == 1
+    constructor.execution_scheduler.shutdown()
+
+
+def test_stopping_cancels_queued_tests():
+    executed = []
+    constructor = make_constructor(1, executed)
+    candidates = ({'entry': {'commit': commit, 'code': f"code_{commit}"}, 'new_context_code': []} for commit in ['c1', 'c2', 'c3'])
+    for candidate in constructor.schedule_execution_tests(ARGS, InstanceConfig(gold_code="gold_code"), candidates, True):
+        assert candidate['gold_future'].result() == "gold_code"
+        break  # e.g. gold test failed: the test file is skipped
+    assert executed == ['image', 'gold']  # image resolved once, before any test is submitted
@@ -0,0 +1,87 @@
+"""
+Unit test on stateless function/method extraction
+"""
+
+import pytest
+from unittest.mock import patch
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.extraction import extract_file_records, extract_repo_records
+from syncbench.utilizer.parse_cache import parse_cache
+from syncbench.utilizer.context_store import context_store
+from syncbench.utilizer.aligner import format_code
+
+
+REPO_INFO = {'repo_id': '1', 'repo_name': 'calc', 'repo_url': 'https://github.com/example/calc'}
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "utils.py").write_text("def double(value):\n    return value * 2\n")
+    (tmp_path / "calc.py").write_text(
+        "from pkg.utils import double\n\n\n"
+        "def add(a, b):\n    return a + b\n\n\n"
+        "class Calculator:\n    def scale(self, value):\n        return double(value)\n"
+    )
+    (tmp_path / "broken.py").write_text("def broken(:\n    pass\n")
+    for index in range(4):
+        (tmp_path / f"mod_{index}.py").write_text(f"def func_{index}():\n    return {index}\n")
+    return str(tmp_path) + '/'
+
+
+def list_files(repo_dir):
+    return sorted(os.path.join(repo_dir, file_name) for file_name in os.listdir(repo_dir) if file_name.endswith('.py'))
+
+
+def test_record_shape(repo_dir):
+    parse_cache.clear()
+    functions, methods = extract_file_records(os.path.join(repo_dir, 'calc.py'), REPO_INFO, repo_dir)
+    assert [fm_dict['name'] for fm_dict in functions] == ['add']
+    assert [fm_dict['name'] for fm_dict in methods] == ['scale']
+
+    method = methods[0]
+    assert method['type'] == 'method'
+    assert method['file_name'] == 'calc.py'
+    assert method['repo_id'] == '1' and method['repo_name'] == 'calc'
+    assert method['code'].startswith('def scale(self, value):')
+    # context: the file itself (imports simplified) plus its in-repo dependency, stored once per file
+    assert 'context' not in method
+    assert functions[0]['context_id'] == method['context_id']
+    context_code = context_store.resolve(method)
+    assert [context['name'] for context in context_code] == ['calc.py', 'utils.py']
+    assert 'from utils import double' in context_code[0]['code']
+
+
+def test_formatting_is_deferred_and_memoized(repo_dir):
+    parse_cache.clear()
+    with patch('syncbench.utilizer.aligner.autopep8.fix_code', side_effect=lambda code, options: code) as mock_fix_code:
+        functions, _ = extract_file_records(os.path.join(repo_dir, 'calc.py'), REPO_INFO, repo_dir)
+        assert mock_fix_code.call_count == 0
+
+        code = functions[0]['code'] + "\n# formatted once\n"
+        assert format_code(code) == code
+        assert format_code(code) == code
+        assert mock_fix_code.call_count == 1
+
+
+def test_syntax_error_yields_no_records(repo_dir):
+    parse_cache.clear()
+    assert extract_file_records(os.path.join(repo_dir, 'broken.py'), REPO_INFO, repo_dir) == ([], [])
+
+
+def test_parallel_matches_serial(repo_dir):
+    file_paths = list_files(repo_dir)
+    parse_cache.clear()
+    serial_records = extract_repo_records(file_paths, REPO_INFO, repo_dir, num_workers=1)
+    parse_cache.clear()
+    parallel_records = extract_repo_records(file_paths, REPO_INFO, repo_dir, num_workers=2)
+
+    assert list(parallel_records) == file_paths
+    assert parallel_records == serial_records
+    # worker results are served from the parent's cache afterwards
+    calc_path = os.path.join(repo_dir, 'calc.py')
+    assert extract_file_records(calc_path, REPO_INFO, repo_dir) is parallel_records[calc_path]
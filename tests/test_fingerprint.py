@@ -0,0 +1,44 @@
+"""
+Unit test on AST fingerprints of function/method code
+"""
+
+import pytest
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.fingerprint import code_fingerprint
+
+
+GOLD_CODE = '''
+def scale(value, factor):
+    """Scale a value
+    by a factor."""
+    return value * factor
+'''
+
+
+@pytest.mark.parametrize("code", [
+    # whitespace and comments
+    "def scale(value,factor):\n    '''Scale a value\n    by a factor.'''\n    # multiply\n    return value*factor  # result\n",
+    # re-wrapped docstring
+    'def scale(value, factor):\n    """Scale a value by a factor."""\n    return value * factor\n',
+    # indented, e.g. a method body taken out of its class
+    '    def scale(value, factor):\n        """Scale a value by a factor."""\n        return (value * factor)\n',
+])
+def test_formatting_only_changes(code):
+    assert code_fingerprint(code) == code_fingerprint(GOLD_CODE)
+
+
+@pytest.mark.parametrize("code", [
+    'def scale(value, factor):\n    """Scale a value by a factor."""\n    return value * factor * 1\n',
+    'def scale(value, factor):\n    """Scale a value by a different factor."""\n    return value * factor\n',
+    'def scale(value, ratio):\n    """Scale a value by a factor."""\n    return value * ratio\n',
+])
+def test_semantic_changes(code):
+    assert code_fingerprint(code) != code_fingerprint(GOLD_CODE)
+
+
+def test_invalid_code():
+    assert code_fingerprint("def scale(:") is None
+    assert code_fingerprint(None) is None
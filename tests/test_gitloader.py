@@ -0,0 +1,150 @@
+"""
+Unit test on git log downloading
+"""
+
+import io
+import pytest
+import tarfile
+import subprocess
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.gitloader import GitDownloader
+
+
+def run_git(repo_dir, *args):
+    subprocess.run(["git", *args], cwd=repo_dir, check=True, capture_output=True)
+
+
+@pytest.fixture
+def source_repos(tmp_path):
+    repo_source_dict_list = []
+    for repo_id, repo_name in [(1, 'alpha'), (2, 'beta'), (3, 'gamma')]:
+        repo_dir = tmp_path / "sources" / repo_name
+        os.makedirs(repo_dir)
+        run_git(repo_dir, "init", "-b", "master")
+        run_git(repo_dir, "config", "user.name", "Tester")
+        run_git(repo_dir, "config", "user.email", "tester@example.com")
+        for commit_idx in range(2):
+            (repo_dir / "module.py").write_text(f"VALUE = {commit_idx}\n")
+            run_git(repo_dir, "add", "-A")
+            run_git(repo_dir, "commit", "-m", f"{repo_name} commit {commit_idx}")
+        repo_source_dict_list.append({'repo_id': repo_id, 'repo_name': repo_name, 'github_link': f"file://{repo_dir}"})
+    return repo_source_dict_list
+
+
+def make_args(tmp_path, repo_source_dict_list, git_resume=0, git_incremental=0):
+    return SimpleNamespace(
+        repo_source_dict_list=repo_source_dict_list, root_path=str(tmp_path), log_path='/logs/', git_log_path='/git_log/', 
+        git_start=0, git_end=len(repo_source_dict_list), git_workers=3, git_resume=git_resume, git_incremental=git_incremental
+    )
+
+
+def test_concurrent_download(tmp_path, source_repos):
+    """All git logs are downloaded without changing the CWD or leaving clones behind"""
+    cwd_before = os.getcwd()
+    args = make_args(tmp_path, source_repos)
+    downloader = GitDownloader(args)
+    assert downloader.git_download(args) == {'downloaded': 3, 'updated': 0, 'skipped': 0, 'failed': 0}
+    assert os.getcwd() == cwd_before
+
+    assert sorted(os.listdir(downloader.git_log_path)) == ['1_alpha_git_log.txt', '2_beta_git_log.txt', '3_gamma_git_log.txt']
+    with open(f"{downloader.git_log_path}2_beta_git_log.txt") as file:
+        git_log = file.read()
+    assert "beta commit 0" in git_log and "beta commit 1" in git_log
+
+
+def test_resume_skips_downloaded_repos(tmp_path, source_repos):
+    args = make_args(tmp_path, source_repos)
+    GitDownloader(args).git_download(args)
+
+    source_repos[1]['github_link'] = "file:///nonexistent/repo"
+    resume_args = make_args(tmp_path, source_repos, git_resume=1)
+    assert GitDownloader(resume_args).git_download(resume_args) == {'downloaded': 0, 'updated': 0, 'skipped': 3, 'failed': 0}
+
+
+def test_failed_repo_does_not_stop_download(tmp_path, source_repos):
+    source_repos[0]['github_link'] = "file:///nonexistent/repo"
+    args = make_args(tmp_path, source_repos)
+    downloader = GitDownloader(args)
+    assert downloader.git_download(args) == {'downloaded': 2, 'updated': 0, 'skipped': 0, 'failed': 1}
+    assert sorted(os.listdir(downloader.git_log_path)) == ['2_beta_git_log.txt', '3_gamma_git_log.txt']
+
+
+def test_incremental_refresh(tmp_path, source_repos):
+    """Incremental runs fetch only new commits and prepend them to the existing git log"""
+    args = make_args(tmp_path, source_repos, git_incremental=1)
+    downloader = GitDownloader(args)
+    downloader.git_download(args)
+    assert downloader.new_commit_counts == {'1_alpha': 2, '2_beta': 2, '3_gamma': 2}
+
+    alpha_dir = tmp_path / "sources" / "alpha"
+    for commit_idx in range(2, 5):
+        (alpha_dir / "module.py").write_text(f"VALUE = {commit_idx}\n")
+        run_git(alpha_dir, "commit", "-am", f"alpha commit {commit_idx}")
+
+    with open(f"{downloader.git_log_path}2_beta_git_log.txt", "a") as file:
+        file.write("kept as is")
+    downloader = GitDownloader(args)
+    assert downloader.git_download(args) == {'downloaded': 0, 'updated': 3, 'skipped': 0, 'failed': 0}
+    assert downloader.new_commit_counts == {'1_alpha': 3, '2_beta': 0, '3_gamma': 0}
+    with open(f"{downloader.git_log_path}2_beta_git_log.txt") as file:
+        assert file.read().endswith("kept as is")
+
+    # The refreshed git log equals a full download of the updated repo
+    full_args = make_args(tmp_path / "full", source_repos[:1])
+    full_downloader = GitDownloader(full_args)
+    full_downloader.git_download(full_args)
+    with open(f"{downloader.git_log_path}1_alpha_git_log.txt") as file, open(f"{full_downloader.git_log_path}1_alpha_git_log.txt") as full_file:
+        assert file.read() == full_file.read()
+
+
+class FakeProcess:
+    """Stands in for `docker cp <container>:<path> -` streaming a tar archive"""
+    def __init__(self, args, archive_bytes):
+        self.args = args
+        self.returncode = 0
+        self.stdout = io.BytesIO(archive_bytes)
+        self.stderr = io.BytesIO()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def test_git_log_from_docker_image(tmp_path, source_repos):
+    """`.git` is streamed out of a created (never started) container and its git log written to file"""
+    from syncbench.utilizer.gitloader import GitLoader
+
+    source_dir = tmp_path / "sources" / "alpha"
+    git_archive = io.BytesIO()
+    with tarfile.open(fileobj=git_archive, mode="w") as archive:
+        archive.add(str(source_dir / ".git"), arcname=".git")
+
+    docker_commands = []
+    original_popen, original_run = subprocess.Popen, subprocess.run
+    def fake_popen(command, **kwargs):
+        if command[0] == "docker":
+            docker_commands.append(command[:2])
+            return FakeProcess(command, git_archive.getvalue())
+        return original_popen(command, **kwargs)
+    def fake_run(command, **kwargs):
+        if command[0] == "docker":
+            docker_commands.append(command[:2])
+            return subprocess.CompletedProcess(command, 0)
+        return original_run(command, **kwargs)
+
+    args = SimpleNamespace(repo_source_dict_list=source_repos, root_path=str(tmp_path), repo_path='/repos/', env_python_version='3.12')
+    os.makedirs(tmp_path / "repos")
+    with patch('syncbench.utilizer.gitloader.subprocess.Popen', side_effect=fake_popen), patch('syncbench.utilizer.gitloader.subprocess.run', side_effect=fake_run):
+        GitLoader(args, 1).get_repo_git_log_from_docker()
+
+    assert docker_commands == [["docker", "create"], ["docker", "cp"], ["docker", "rm"]]
+    with open(tmp_path / "repos" / "1_alpha_git_log.txt") as file:
+        git_log = file.read()
+    assert "alpha commit 0" in git_log and "alpha commit 1" in git_log
@@ -0,0 +1,117 @@
+"""
+Unit test on git log parsing
+"""
+
+import pytest
+import subprocess
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.gitlog_parser import CommitTable, parse_git_log
+from syncbench.utilizer.tracer import CodeHistoryTracer
+
+
+def run_git(repo_dir, *args):
+    subprocess.run(["git", *args], cwd=repo_dir, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    repo_dir = tmp_path / "repo"
+    os.makedirs(repo_dir / "pkg")
+    run_git(repo_dir, "init", "-b", "master")
+    run_git(repo_dir, "config", "user.name", "Tester")
+    run_git(repo_dir, "config", "user.email", "tester@example.com")
+
+    (repo_dir / "pkg" / "calc.py").write_text("def add(a, b):\n    return a + b\n")
+    (repo_dir / "logo.bin").write_bytes(b"\x00\x01\x02")
+    run_git(repo_dir, "add", "-A")
+    run_git(repo_dir, "commit", "-m", "Initial commit\n\nAdd calculator\tand logo")
+
+    (repo_dir / "pkg" / "calc.py").write_text("def add(a, b):\n    total = a + b\n    return total\n")
+    (repo_dir / "README.md").write_text("calc\n")
+    run_git(repo_dir, "add", "-A")
+    run_git(repo_dir, "commit", "-m", "Refactor add")
+    return str(repo_dir)
+
+
+def test_parse_records(repo_dir):
+    table = CommitTable.from_repo(repo_dir)
+    assert len(table) == 2
+    assert table.head == subprocess.run(["git", "-C", repo_dir, "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    assert table.data['author'] == ["Tester", "Tester"]
+    assert table.data['message'][0].strip() == "Refactor add"
+    assert table.data['message'][1].strip() == "Initial commit\n\nAdd calculator\tand logo"
+
+    assert sorted(table.data['files'][0]) == ["README.md", "pkg/calc.py"]
+    assert table.data['lines_added'][0] == 3
+    assert table.data['lines_removed'][0] == 1
+    binary_file_idx = table.data['files'][1].index("logo.bin")
+    assert table.data['file_lines_added'][1][binary_file_idx] == 0
+
+
+def test_commits_for_file(repo_dir):
+    table = CommitTable.from_repo(repo_dir)
+    assert table.commits_for_file("pkg/calc.py") == table.data['sha']
+    assert table.commits_for_file("README.md") == table.data['sha'][:1]
+    assert table.commits_for_file("missing.py") == []
+    assert table.file_commit_counts() == {"pkg/calc.py": 2, "README.md": 1, "logo.bin": 1}
+
+
+def test_parse_is_streaming():
+    """Records are yielded as soon as the next record starts"""
+    def lines():
+        yield "\x1eaaa\x1fTester\x1f2024-01-01T00:00:00+00:00\x1ffirst\n"
+        yield "\x1f\n"
+        yield "\n"
+        yield "1\t0\ta.py\n"
+        yield "\x1ebbb\x1fTester\x1f2024-01-01T00:00:00+00:00\x1fsecond\n"
+        raise AssertionError("parser read past the second record")
+
+    first_record = next(parse_git_log(lines()))
+    assert first_record['sha'] == "aaa"
+    assert first_record['message'] == "first\n"
+    assert first_record['files'] == ["a.py"]
+
+
+def test_parquet_round_trip(repo_dir, tmp_path):
+    pytest.importorskip("pyarrow")
+    table = CommitTable.from_repo(repo_dir)
+    save_path = str(tmp_path / "tables" / "1_repo_commit_table.parquet")
+    table.to_parquet(save_path)
+    assert CommitTable.read_parquet(save_path).data == table.data
+
+
+def test_prepend_new_commits(repo_dir):
+    full_table = CommitTable.from_repo(repo_dir)
+    table = CommitTable.from_repo(repo_dir, "HEAD~1")
+    table.prepend(CommitTable.from_repo(repo_dir, f"{table.head}..HEAD"))
+    assert table.data == full_table.data
+    assert table.commits_for_file("README.md") == full_table.data['sha'][:1]
+
+
+def test_commits_for_file_match_history_walk_with_merges(tmp_path):
+    """Table lookups give the commits the tracer walks without a table, merges included"""
+    repo_dir = tmp_path / "merge_repo"
+    os.makedirs(repo_dir)
+    run_git(repo_dir, "init", "-b", "master")
+    run_git(repo_dir, "config", "user.name", "Tester")
+    run_git(repo_dir, "config", "user.email", "tester@example.com")
+    (repo_dir / "calc.py").write_text("def f():\n    return 1\n")
+    (repo_dir / "util.py").write_text("def g():\n    return 1\n")
+    run_git(repo_dir, "add", "-A")
+    run_git(repo_dir, "commit", "-m", "base")
+    run_git(repo_dir, "checkout", "-b", "feature")
+    (repo_dir / "util.py").write_text("def g():\n    return 2\n")
+    run_git(repo_dir, "commit", "-am", "change g")
+    run_git(repo_dir, "checkout", "master")
+    (repo_dir / "calc.py").write_text("def f():\n    return 2\n")
+    run_git(repo_dir, "commit", "-am", "change f")
+    run_git(repo_dir, "merge", "--no-ff", "-m", "merge feature", "feature")
+
+    table = CommitTable.from_repo(str(repo_dir))
+    tracer = CodeHistoryTracer(str(repo_dir), 'blob')
+    for file_path in ["calc.py", "util.py"]:
+        assert table.commits_for_file(file_path) == [commit.hexsha for commit in tracer.get_file_commits(file_path)]
+    assert len(table.commits_for_file("util.py")) == 2  # the merge brought in the change of `g`
@@ -0,0 +1,59 @@
+"""
+Unit test on the repository import graph
+"""
+
+import pytest
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.import_graph import load_import_graph
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    files = {
+        "src/mylib/__init__.py": "from .core import Engine\nfrom .helpers import *\n",
+        "src/mylib/core.py": "from . import config\n\n\nclass Engine:\n    pass\n",
+        "src/mylib/config.py": "DEBUG = False\n",
+        "src/mylib/helpers.py": "def helper():\n    return 1\n",
+        "src/mylib/io/__init__.py": "",
+        "src/mylib/io/reader.py": "import mylib.core\n\n\ndef read():\n    return mylib.core.Engine()\n",
+        "tests/test_engine.py": "import os\nfrom mylib import Engine, helper\n\n\ndef test_engine():\n    assert Engine()\n",
+        "tests/test_reader.py": "import mylib.io.reader as reader\nfrom numpy import array\n\n\ndef test_read():\n    assert reader.read()\n",
+        "tests/test_broken.py": "def broken(:\n",
+    }
+    for rel_path, code in files.items():
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text(code)
+    return str(tmp_path)
+
+
+def test_direct_imports_follow_reexports(repo_dir):
+    import_graph = load_import_graph(repo_dir, refresh=True)
+    path = lambda rel_path: os.path.join(repo_dir, rel_path)
+
+    assert import_graph.imports(path("tests/test_engine.py")) == [
+        path("src/mylib/__init__.py"), path("src/mylib/core.py"), path("src/mylib/helpers.py")
+    ]
+    # `import a.b` and aliased imports; third-party modules are not nodes
+    assert import_graph.imports(path("tests/test_reader.py")) == [path("src/mylib/io/reader.py")]
+    # relative `from . import module`: the package and the submodule
+    assert import_graph.imports(path("src/mylib/core.py")) == [path("src/mylib/__init__.py"), path("src/mylib/config.py")]
+    assert import_graph.imports(path("tests/test_broken.py")) == []
+
+
+def test_closure(repo_dir):
+    import_graph = load_import_graph(repo_dir, refresh=True)
+    path = lambda rel_path: os.path.join(repo_dir, rel_path)
+
+    assert import_graph.closure(path("tests/test_reader.py")) == [
+        path("src/mylib/io/reader.py"), path("src/mylib/core.py"),
+        path("src/mylib/__init__.py"), path("src/mylib/config.py"), path("src/mylib/helpers.py")
+    ]
+
+
+def test_graph_is_built_once(repo_dir):
+    import_graph = load_import_graph(repo_dir, refresh=True)
+    assert load_import_graph(repo_dir) is import_graph
+    assert load_import_graph(repo_dir, refresh=True) is not import_graph
@@ -0,0 +1,41 @@
+"""
+Unit test on mount injection of the candidate file into the sandbox
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.evaluator.tester import SandBoxET
+
+
+def make_exe_tester(if_gold_unit_test, context_code):
+    exe_tester = object.__new__(SandBoxET)
+    exe_tester.if_gold_unit_test = if_gold_unit_test
+    exe_tester.fm_file_name = "calc.py"
+    exe_tester.agent_code_path = "/root/syncbench_build/code/test_repo/pkg/calc.py"
+    exe_tester.agent_revised_code = "def add(a, b):\n    return a - b\n"
+    exe_tester.context_code = context_code
+    exe_tester.injection_dir = None
+    return exe_tester
+
+
+def test_only_candidate_file_is_written():
+    exe_tester = make_exe_tester(False, [{'name': "calc.py", 'complete_code': "def add(a, b):\n    return a + b\n"}])
+    exe_tester.prepare_injection()
+    try:
+        assert exe_tester.agent_code_path == os.path.join(exe_tester.injection_dir, "test_repo", "pkg", "calc.py")
+        assert exe_tester.agent_code_path.split('test_repo/')[1] == "pkg/calc.py"  # same path in the image
+        with open(exe_tester.agent_code_path) as injected_file:
+            assert "return a - b" in injected_file.read()
+        assert [files for _, _, files in os.walk(exe_tester.injection_dir) if files] == [["calc.py"]]
+    finally:
+        exe_tester.remove_docker_container = lambda: None
+        exe_tester.sandbox_clean_up()
+    assert not os.path.exists(exe_tester.injection_dir)
+
+
+def test_gold_test_injects_nothing():
+    exe_tester = make_exe_tester(True, [{'name': "calc.py", 'complete_code': "def add(a, b):\n    return a + b\n"}])
+    exe_tester.prepare_injection()
+    assert not os.path.exists(exe_tester.agent_code_path)
+    os.rmdir(exe_tester.injection_dir)
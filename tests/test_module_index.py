@@ -0,0 +1,71 @@
+"""
+Unit test on the repository module index
+"""
+
+import pytest
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.module_index import ModuleIndex
+
+
+REPO_FILES = [
+    "setup.py",
+    "src/mylib/__init__.py",
+    "src/mylib/core.py",
+    "src/mylib/utils/__init__.py",
+    "src/mylib/utils/text.py",
+    "tests/test_core.py",
+    "tests/helpers.py",
+    "docs/conf.py",
+    "docs/examples/core.py",
+]
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    for file_path in REPO_FILES:
+        os.makedirs(tmp_path / os.path.dirname(file_path), exist_ok=True)
+        (tmp_path / file_path).write_text("")
+    os.makedirs(tmp_path / ".git" / "hooks")
+    (tmp_path / ".git" / "hooks" / "hook.py").write_text("")
+    return str(tmp_path)
+
+
+def test_absolute_imports(repo_dir):
+    module_index = ModuleIndex(repo_dir)
+    assert module_index.resolve("mylib.core") == os.path.join(repo_dir, "src/mylib/core.py")
+    assert module_index.resolve("src.mylib.core") == os.path.join(repo_dir, "src/mylib/core.py")
+    assert module_index.resolve("mylib") == os.path.join(repo_dir, "src/mylib/__init__.py")
+    assert module_index.resolve("mylib.utils") == os.path.join(repo_dir, "src/mylib/utils/__init__.py")
+    assert module_index.resolve("helpers") == os.path.join(repo_dir, "tests/helpers.py")
+    assert module_index.resolve("numpy") is None
+    assert module_index.resolve("hook") is None
+
+
+def test_shallowest_module_wins(repo_dir):
+    """`core` exists as `src/mylib/core.py` and `docs/examples/core.py`"""
+    module_index = ModuleIndex(repo_dir)
+    assert module_index.resolve("core") == os.path.join(repo_dir, "docs/examples/core.py")
+    assert module_index.resolve("examples.core") == os.path.join(repo_dir, "docs/examples/core.py")
+
+
+def test_relative_imports(repo_dir):
+    module_index = ModuleIndex(repo_dir)
+    text_file = os.path.join(repo_dir, "src/mylib/utils/text.py")
+    assert module_index.resolve(".", text_file) == os.path.join(repo_dir, "src/mylib/utils/__init__.py")
+    assert module_index.resolve("..core", text_file) == os.path.join(repo_dir, "src/mylib/core.py")
+    assert module_index.resolve("..missing", text_file) is None
+    assert module_index.resolve(".text") is None
+
+
+def test_resolve_import_of_submodule(repo_dir):
+    module_index = ModuleIndex(repo_dir)
+    assert module_index.resolve_import("mylib", "core") == [
+        os.path.join(repo_dir, "src/mylib/__init__.py"), os.path.join(repo_dir, "src/mylib/core.py")
+    ]
+    assert module_index.resolve_import("mylib.core", "run") == [os.path.join(repo_dir, "src/mylib/core.py")]
+    assert module_index.resolve_import(".", "text", os.path.join(repo_dir, "src/mylib/utils/__init__.py")) == [
+        os.path.join(repo_dir, "src/mylib/utils/__init__.py"), os.path.join(repo_dir, "src/mylib/utils/text.py")
+    ]
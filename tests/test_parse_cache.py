@@ -0,0 +1,55 @@
+"""
+Unit test on the per-run parse cache
+"""
+
+import pytest
+from unittest.mock import patch
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.parse_cache import ParseCache
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    file_path = tmp_path / "calc.py"
+    file_path.write_text("class Calculator:\n    def scale(self, value):\n        return value * 2\n")
+    return str(file_path)
+
+
+def test_file_is_parsed_once(file_path):
+    parse_cache = ParseCache()
+    with patch('syncbench.utilizer.parse_cache.ast.parse', wraps=__import__('ast').parse) as mock_parse:
+        tree = parse_cache.get_tree(file_path)
+        assert parse_cache.get_tree(file_path) is tree
+        assert mock_parse.call_count == 1
+
+    method_node = tree.body[0].body[0]
+    assert method_node.parent is tree.body[0]
+    assert parse_cache.memoize(file_path, 'names', lambda: ['scale']) == ['scale']
+    assert parse_cache.memoize(file_path, 'names', lambda: []) == ['scale']
+
+
+def test_changed_file_is_parsed_again(file_path):
+    parse_cache = ParseCache()
+    parse_cache.get_tree(file_path)
+    parse_cache.memoize(file_path, 'names', lambda: ['scale'])
+
+    with open(file_path, "a") as file:
+        file.write("\n\ndef add(a, b):\n    return a + b\n")
+    assert parse_cache.get_tree(file_path).body[-1].name == "add"
+    assert parse_cache.memoize(file_path, 'names', lambda: ['scale', 'add']) == ['scale', 'add']
+
+
+def test_invalid_and_non_utf8_files(tmp_path):
+    parse_cache = ParseCache()
+    invalid_file = tmp_path / "invalid.py"
+    invalid_file.write_text("def broken(:\n")
+    for _ in range(2):
+        with pytest.raises(SyntaxError):
+            parse_cache.get_tree(str(invalid_file))
+
+    latin1_file = tmp_path / "latin1.py"
+    latin1_file.write_bytes("NAME = 'caf\xe9'\n".encode('latin-1'))
+    assert parse_cache.read_text(str(latin1_file)) == "NAME = 'caf'\n"
@@ -0,0 +1,88 @@
+"""
+Unit test on bounded producer/consumer streaming
+"""
+
+import pytest
+
+import os
+import sys
+import time
+import argparse
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.pipeline import stream_in_background, JsonListWriter
+from syncbench.constructor.callee_builder import CalleeConstructor
+from utils.json_util import read_test_data
+
+
+def test_items_stream_in_order_with_bounded_queue():
+    produced = []
+
+    def produce():
+        for index in range(20):
+            produced.append(index)
+            yield index
+
+    consumed = []
+    for item in stream_in_background(produce, max_queued=2):
+        if not consumed:
+            time.sleep(0.2)
+            # producer blocks on the full queue until the consumer catches up
+            assert len(produced) <= 2 + 2
+        consumed.append(item)
+    assert consumed == list(range(20))
+
+
+def test_producer_error_reaches_consumer():
+    def produce():
+        yield 1
+        raise ValueError("extraction failed")
+
+    consumed = []
+    with pytest.raises(ValueError, match="extraction failed"):
+        for item in stream_in_background(produce):
+            consumed.append(item)
+    assert consumed == [1]
+
+
+def test_consumer_stop_stops_producer():
+    def produce():
+        index = 0
+        while True:
+            yield index
+            index += 1
+
+    for item in stream_in_background(produce, max_queued=1, name='endless-producer'):
+        if item == 3:
+            break
+    time.sleep(0.3)
+    assert not any(thread.name == 'endless-producer' for thread in threading.enumerate())
+
+
+def test_json_list_writer(tmp_path):
+    save_path = str(tmp_path / "extracted.json")
+    list_writer = JsonListWriter(save_path)
+    assert not os.path.exists(save_path)
+    for index in range(3):
+        list_writer.write({'usage_test_file': f"test_{index}.py", 'fms': []})
+    list_writer.finalize()
+    assert read_test_data(save_path) == [{'usage_test_file': f"test_{index}.py", 'fms': []} for index in range(3)]
+
+    empty_path = str(tmp_path / "empty.json")
+    JsonListWriter(empty_path).finalize()
+    assert read_test_data(empty_path) == []
+
+
+def test_stopped_stream_does_not_save_truncated_list(tmp_path):
+    constructor = object.__new__(CalleeConstructor)
+    constructor.iter_test_objects_from_repo = lambda repo_dir: ({'usage_test_file': f"test_{index}.py", 'fms': []} for index in range(10))
+    save_path = str(tmp_path / "extracted.json")
+    args = argparse.Namespace(stream_queue_size=2)
+    for test_item in constructor.stream_test_objects_from_repo(args, str(tmp_path), save_path, str(tmp_path / "context_store.json")):
+        break  # e.g. instance quota reached
+    assert not os.path.exists(save_path)  # the next run extracts again instead of reusing a truncated list
+    assert not os.path.exists(f"{save_path}.part")
+
+    streamed_items = list(constructor.stream_test_objects_from_repo(args, str(tmp_path), save_path, str(tmp_path / "context_store.json")))
+    assert read_test_data(save_path) == streamed_items
+    assert os.path.exists(tmp_path / "context_store.json")
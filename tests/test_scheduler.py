@@ -0,0 +1,76 @@
+"""
+Unit test on yield-ranked candidate scheduling
+"""
+
+import pytest
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.scheduler import CandidateScheduler
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    for directory in ["tests_a", "tests_b"]:
+        (tmp_path / directory).mkdir()
+    for test_path in ["tests_a/test_1.py", "tests_a/test_2.py", "tests_b/test_3.py"]:
+        (tmp_path / test_path).write_text("def test_x():\n    pass\n")
+    return str(tmp_path)
+
+
+def make_item(repo_dir, test_path, fm_specs):
+    return {
+        'usage_test_file': os.path.join(repo_dir, test_path),
+        'fms': [
+            {'name': name, 'whole_file_path': os.path.join(repo_dir, file_path), 'code': "def f():\n" + "    pass\n" * lines}
+            for file_path, name, lines in fm_specs
+        ]
+    }
+
+
+def test_items_ranked_by_history_length(repo_dir):
+    scheduler = CandidateScheduler(repo_dir, {'stable.py': 1, 'hot.py': 30})
+    items = [
+        make_item(repo_dir, "tests_a/test_1.py", [('stable.py', 'a', 3)]),
+        make_item(repo_dir, "tests_a/test_2.py", [('hot.py', 'b', 3)]),
+        make_item(repo_dir, "tests_b/test_3.py", [])  # nothing to trace: last
+    ]
+    ranked = [item['usage_test_file'] for item in scheduler.schedule(items)]
+    assert ranked == [items[1]['usage_test_file'], items[0]['usage_test_file'], items[2]['usage_test_file']]
+
+
+def test_candidates_grouped_by_file(repo_dir):
+    scheduler = CandidateScheduler(repo_dir, {'hot.py': 10, 'cold.py': 2})
+    item = make_item(repo_dir, "tests_a/test_1.py", [('cold.py', 'a', 1), ('hot.py', 'b', 1), ('cold.py', 'c', 1), ('hot.py', 'd', 1)])
+    assert [fm_dict['name'] for fm_dict in scheduler.order_candidates(item)['fms']] == ['b', 'd', 'a', 'c']
+    assert [fm_dict['name'] for fm_dict in item['fms']] == ['a', 'b', 'c', 'd']  # input left untouched
+
+
+def test_directory_yield_reorders_remaining_items(repo_dir):
+    scheduler = CandidateScheduler(repo_dir)
+    items = [
+        make_item(repo_dir, "tests_a/test_1.py", [('calc.py', 'a', 2)]),
+        make_item(repo_dir, "tests_a/test_2.py", [('calc.py', 'b', 2)]),
+        make_item(repo_dir, "tests_b/test_3.py", [('calc.py', 'c', 2)])
+    ]
+    ranked = []
+    for item in scheduler.schedule(items):
+        ranked.append(os.path.basename(item['usage_test_file']))
+        scheduler.record(item, 0)  # `tests_a` produces nothing: `tests_b` moves ahead of its remaining item
+    assert ranked == ['test_1.py', 'test_3.py', 'test_2.py']
+
+
+def test_window_bounds_lookahead(repo_dir):
+    consumed = []
+
+    def stream():
+        for index, test_path in enumerate(["tests_a/test_1.py", "tests_a/test_2.py", "tests_b/test_3.py"]):
+            consumed.append(index)
+            yield make_item(repo_dir, test_path, [('calc.py', 'f', 1)])
+
+    scheduler = CandidateScheduler(repo_dir, window=2)
+    schedule = scheduler.schedule(stream())
+    next(schedule)
+    assert consumed == [0, 1]
+    assert len(list(schedule)) == 2
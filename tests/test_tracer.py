@@ -0,0 +1,318 @@
+"""
+Unit test on commit history tracing
+"""
+
+import pytest
+import subprocess
+from unittest.mock import patch
+from concurrent.futures import ProcessPoolExecutor
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from syncbench.utilizer.tracer import CodeHistoryTracer, _worker_tracers
+from syncbench.utilizer.pipeline import process_pool_context
+from syncbench.utilizer.history_index import HistoryIndex
+from syncbench.utilizer.gitlog_parser import CommitTable
+
+
+FILE_VERSIONS = [
+    '''
+def add(a, b):
+    """Add two numbers."""
+    return a + b
+''',
+    '''
+def add(a, b):
+    """Add two numbers."""
+    return a + b
+
+
+class Calculator:
+    def scale(self, value, factor):
+        """Scale a value."""
+        return value * factor
+''',
+    '''
+def add(a, b):
+    """Add two numbers."""
+    total = a + b
+    return total
+
+
+class Calculator:
+    def scale(self, value, factor):
+        """Scale a value."""
+        return value * factor
+''',
+]
+
+
+def run_git(repo_dir, *args):
+    subprocess.run(["git", *args], cwd=repo_dir, check=True, capture_output=True)
+
+
+def cached_worker_repos():
+    """Repos the tracing worker process has a tracer for"""
+    return list(_worker_tracers)
+
+
+@pytest.fixture
+def repo_dir(tmp_path):
+    repo_dir = str(tmp_path / "repo")
+    os.makedirs(os.path.join(repo_dir, "pkg"))
+    run_git(repo_dir, "init", "-b", "master")
+    run_git(repo_dir, "config", "user.name", "Tester")
+    run_git(repo_dir, "config", "user.email", "tester@example.com")
+    for version_idx, file_content in enumerate(FILE_VERSIONS):
+        with open(os.path.join(repo_dir, "pkg", "calc.py"), "w") as file:
+            file.write(file_content)
+        with open(os.path.join(repo_dir, "README.md"), "w") as file:
+            file.write(f"version {version_idx}\n")
+        run_git(repo_dir, "add", "-A")
+        run_git(repo_dir, "commit", "-m", f"commit {version_idx}")
+    return repo_dir
+
+
+def test_blob_history_matches_checkout_history(repo_dir):
+    """Checkout-free tracing returns the same history records as checkout tracing"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    blob_history = CodeHistoryTracer(repo_dir, 'blob').get_function_history(file_path, "add")
+    checkout_history = CodeHistoryTracer(repo_dir, 'checkout').get_function_history(file_path, "add")
+
+    assert len(blob_history) == len(FILE_VERSIONS)
+    assert blob_history == checkout_history
+
+
+def test_function_history_contains_function_code(repo_dir):
+    """History records carry the function/method source, not the whole file"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+
+    add_history = tracer.get_function_history(file_path, "add")
+    assert add_history[0]['code'].startswith("def add(a, b):")
+    assert "class Calculator" not in add_history[0]['code']
+
+    scale_history = tracer.get_function_history(file_path, "scale")
+    assert len(scale_history) == 2  # method does not exist in the first commit
+    assert scale_history[0]['code'].startswith("def scale(self, value, factor):")
+
+
+def test_body_change_only_history(repo_dir):
+    """Only commits that changed the function/method's own source span are kept"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+    commit_messages = {commit.hexsha: commit.message.strip() for commit in tracer.repo.iter_commits()}
+
+    add_history = tracer.get_function_history(file_path, "add", body_change_only=True)
+    assert [commit_messages[entry['commit']] for entry in add_history] == ["commit 2", "commit 0"]
+
+    scale_history = tracer.get_function_history(file_path, "scale", body_change_only=True)
+    assert [commit_messages[entry['commit']] for entry in scale_history] == ["commit 1"]
+
+    checkout_history = CodeHistoryTracer(repo_dir, 'checkout').get_function_history(file_path, "add", body_change_only=True)
+    assert add_history == checkout_history
+
+
+def test_blob_file_history_matches_checkout_history(repo_dir):
+    """Checkout-free file history equals checkout file history"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    blob_history = CodeHistoryTracer(repo_dir, 'blob').get_file_history(file_path)
+    checkout_history = CodeHistoryTracer(repo_dir, 'checkout').get_file_history(file_path)
+
+    assert blob_history == checkout_history
+    assert [entry['code'] for entry in blob_history] == FILE_VERSIONS[::-1]
+
+
+def test_blob_restore_does_not_touch_working_tree(repo_dir):
+    """Restoring old code in blob mode leaves HEAD and the working tree unchanged"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+    head_before = tracer.repo.head.commit.hexsha
+    oldest_commit = list(tracer.repo.iter_commits())[-1].hexsha
+
+    restored_file = tracer.restore_file_code(file_path, oldest_commit)
+    checkout_restored_file = CodeHistoryTracer(repo_dir, 'checkout').restore_file_code(file_path, oldest_commit)
+
+    assert restored_file == checkout_restored_file
+    assert "class Calculator" not in restored_file
+    assert tracer.repo.head.commit.hexsha == head_before
+    assert not tracer.repo.is_dirty()
+    with open(file_path, "r") as file:
+        assert file.read() == FILE_VERSIONS[-1]
+
+
+def test_missing_file_at_commit(repo_dir):
+    """Reading a file that did not exist at a commit returns None"""
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+    oldest_commit = list(tracer.repo.iter_commits())[-1]
+    assert tracer.read_file_at_commit("pkg/missing.py", oldest_commit) is None
+    assert tracer.get_file_code_at_commit("pkg/missing.py", oldest_commit) is None
+
+
+@pytest.mark.parametrize("trace_method", ["blob", "checkout"])
+def test_invalid_utf8_follows_errors(repo_dir, trace_method):
+    """Invalid UTF-8 raises in strict mode and is replaced otherwise, for blob and checkout reads alike"""
+    with open(os.path.join(repo_dir, "pkg", "latin.py"), "wb") as file:
+        file.write(b"NAME = 'caf\xe9'\n")
+    run_git(repo_dir, "add", ".")
+    run_git(repo_dir, "commit", "-m", "latin-1 file")
+    tracer = CodeHistoryTracer(repo_dir, trace_method)
+    head = tracer.repo.head.commit
+
+    with pytest.raises(UnicodeDecodeError):
+        tracer.read_file_at_commit("pkg/latin.py", head)
+    assert tracer.read_file_at_commit("pkg/latin.py", head, errors='replace') == "NAME = 'caf\ufffd'\n"
+    with pytest.raises(UnicodeDecodeError):
+        tracer.read_file_at_commit("pkg/latin.py", head)
+
+
+def test_history_index_reuses_traced_history(repo_dir, tmp_path):
+    """Histories are read back from the persistent index instead of being re-traced"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    index_path = str(tmp_path / "history_index" / "1_repo_history_index.db")
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+    head = tracer.repo.head.commit.hexsha
+
+    tracer.history_index = HistoryIndex(index_path, head)
+    traced_history = tracer.get_function_history(file_path, "add", body_change_only=True)
+    tracer.history_index.close()
+
+    reopened_index = HistoryIndex(index_path, head)
+    assert reopened_index.get_history("pkg/calc.py", "add", True) == traced_history
+    assert reopened_index.get_history("pkg/calc.py", "add", False) is None
+    blob_hashes = [row[0] for row in reopened_index.connection.execute("SELECT blob_hash FROM versions ORDER BY position")]
+    assert blob_hashes == [tracer.read_tree_blob("pkg/calc.py", entry['commit'])[0] for entry in traced_history]
+
+    with patch.object(CodeHistoryTracer, 'get_function_code_at_commit') as mock_lookup:
+        indexed_tracer = CodeHistoryTracer(repo_dir, 'blob', reopened_index)
+        assert indexed_tracer.get_function_history(file_path, "add", body_change_only=True) == traced_history
+        mock_lookup.assert_not_called()
+    reopened_index.close()
+
+
+def test_history_index_invalidated_on_head_change(repo_dir, tmp_path):
+    """Indexed histories are dropped once the repo HEAD changes"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    index_path = str(tmp_path / "history_index.db")
+    old_head = CodeHistoryTracer(repo_dir).repo.head.commit.hexsha
+    history_index = HistoryIndex(index_path, old_head)
+    CodeHistoryTracer(repo_dir, 'blob', history_index).get_function_history(file_path, "add")
+    history_index.close()
+
+    with open(file_path, "a") as file:
+        file.write("\n\ndef subtract(a, b):\n    return a - b\n")
+    run_git(repo_dir, "commit", "-am", "commit 3")
+    new_head = CodeHistoryTracer(repo_dir).repo.head.commit.hexsha
+
+    history_index = HistoryIndex(index_path, new_head)
+    assert history_index.get_history("pkg/calc.py", "add", False) is None
+    assert history_index.connection.execute("SELECT COUNT(*) FROM versions").fetchone()[0] == 0
+    history_index.close()
+
+
+def test_parallel_histories_match_serial_histories(repo_dir, tmp_path):
+    """Process-pool tracing returns the same histories as serial tracing"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    fm_list = [(file_path, "add"), (file_path, "scale"), (file_path, "add")]
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+
+    serial_histories = tracer.get_function_histories(fm_list, body_change_only=True, num_workers=1)
+    parallel_histories = tracer.get_function_histories(fm_list, body_change_only=True, num_workers=2)
+    assert parallel_histories == serial_histories
+    assert serial_histories[(file_path, "add")] == tracer.get_function_history(file_path, "add", body_change_only=True)
+
+    tracer.history_index = HistoryIndex(str(tmp_path / "history_index.db"), tracer.repo.head.commit.hexsha)
+    tracer.get_function_histories(fm_list, body_change_only=True, num_workers=2)
+    assert tracer.history_index.get_history("pkg/calc.py", "scale", True) == serial_histories[(file_path, "scale")]
+    tracer.history_index.close()
+
+
+def test_commit_table_lookup_matches_history_walk(repo_dir, tmp_path):
+    """Tracing with commits looked up in the commit table gives the same histories"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    commit_table = CommitTable.from_repo(repo_dir)
+    commit_table.to_parquet(str(tmp_path / "commit_table.parquet"))
+    table_tracer = CodeHistoryTracer(repo_dir, 'blob', commit_table=CommitTable.read_parquet(str(tmp_path / "commit_table.parquet")))
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+
+    with patch.object(table_tracer.repo, 'iter_commits') as mock_iter_commits:
+        assert table_tracer.get_function_history(file_path, "add") == tracer.get_function_history(file_path, "add")
+        assert table_tracer.get_file_history(file_path) == tracer.get_file_history(file_path)
+        mock_iter_commits.assert_not_called()
+
+
+def test_file_history_walked_once(repo_dir):
+    """Without a commit table, the commits of a file are walked once for all of its functions/methods"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+    with patch.object(tracer.repo, 'iter_commits', wraps=tracer.repo.iter_commits) as mock_iter_commits:
+        tracer.get_function_histories([(file_path, "add"), (file_path, "scale")], num_workers=1)
+        assert mock_iter_commits.call_count == 1
+
+
+MERGE_FILE_VERSIONS = {
+    'base': "def f():\n    return 1\n\n\ndef g():\n    return 1\n",
+    'change_f': "def f():\n    return 2\n\n\ndef g():\n    return 1\n",
+    'change_g': "def f():\n    return 1\n\n\ndef g():\n    return 2\n",
+    'merged': "def f():\n    return 2\n\n\ndef g():\n    return 2\n",
+}
+
+
+@pytest.fixture
+def merge_repo_dir(tmp_path):
+    """master changes `f`, a parallel branch changes `g`, then the branch is merged (first-parent history: merge, f, base)"""
+    repo_dir = str(tmp_path / "merge_repo")
+    os.makedirs(repo_dir)
+    file_path = os.path.join(repo_dir, "calc.py")
+
+    def commit(version, message, date):
+        with open(file_path, "w") as file:
+            file.write(MERGE_FILE_VERSIONS[version])
+        run_git(repo_dir, "add", "-A")
+        subprocess.run(["git", "commit", "-m", message], cwd=repo_dir, check=True, capture_output=True, env={**os.environ, 'GIT_AUTHOR_DATE': date, 'GIT_COMMITTER_DATE': date})
+
+    run_git(repo_dir, "init", "-b", "master")
+    run_git(repo_dir, "config", "user.name", "Tester")
+    run_git(repo_dir, "config", "user.email", "tester@example.com")
+    commit('base', "base", "2024-01-01T00:00:00")
+    run_git(repo_dir, "checkout", "-b", "feature")
+    run_git(repo_dir, "checkout", "master")
+    commit('change_f', "change f", "2024-01-02T00:00:00")
+    run_git(repo_dir, "checkout", "feature")
+    commit('change_g', "change g", "2024-01-03T00:00:00")
+    run_git(repo_dir, "checkout", "master")
+    subprocess.run(["git", "merge", "--no-commit", "feature"], cwd=repo_dir, capture_output=True)
+    commit('merged', "merge feature", "2024-01-04T00:00:00")
+    return repo_dir
+
+
+@pytest.mark.parametrize("trace_method", ['blob', 'checkout'])
+def test_body_change_only_compares_with_parent_across_merges(merge_repo_dir, trace_method):
+    """A merge that only brought in changes to `g` is not part of the body-change history of `f`"""
+    tracer = CodeHistoryTracer(merge_repo_dir, trace_method)
+    file_path = os.path.join(merge_repo_dir, "calc.py")
+    assert [entry['message'].strip() for entry in tracer.get_function_history(file_path, "f")] == ["merge feature", "change f", "base"]  # first-parent history
+    assert [entry['message'].strip() for entry in tracer.get_function_history(file_path, "f", body_change_only=True)] == ["change f", "base"]
+
+
+def test_body_change_only_with_side_branch_commits(merge_repo_dir):
+    """Given every commit of the repo (side branch included), versions are still compared with their first parent"""
+    tracer = CodeHistoryTracer(merge_repo_dir, 'blob')
+    all_commits = list(tracer.repo.iter_commits())
+    assert [commit.message.strip() for commit in all_commits] == ["merge feature", "change g", "change f", "base"]
+    history, _ = tracer.trace_function_history("calc.py", "f", True, [commit.hexsha for commit in all_commits])
+    assert [entry['message'].strip() for entry in history] == ["change f", "base"]
+
+
+def test_parallel_tracing_reuses_pool(repo_dir):
+    """A long-lived pool serves several calls, and its workers keep their tracers between them"""
+    file_path = os.path.join(repo_dir, "pkg", "calc.py")
+    tracer = CodeHistoryTracer(repo_dir, 'blob')
+    with ProcessPoolExecutor(max_workers=1, mp_context=process_pool_context()) as executor:
+        first_histories = tracer.get_function_histories([(file_path, "add"), (file_path, "scale")], True, 2, executor)
+        worker_pid = executor.submit(os.getpid).result()
+        second_histories = tracer.get_function_histories([(file_path, "add"), (file_path, "scale")], True, 2, executor)
+        assert executor.submit(os.getpid).result() == worker_pid  # still running after both calls
+        assert executor.submit(cached_worker_repos).result() == [repo_dir]
+    assert first_histories == second_histories == tracer.get_function_histories([(file_path, "add"), (file_path, "scale")], True, 1)
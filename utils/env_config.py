@@ -175,6 +175,8 @@ class EnvConfig:
         self.create_directory(args.root_path, "root path")
         self.create_directory(f"{args.root_path}/{args.code_path.replace('/', '')}", "code path")
         self.create_directory(f"{args.root_path}/{args.dataset_path.replace('/', '')}", "data path")
+        self.create_directory(f"{args.root_path}/{args.history_index_path.replace('/', '')}", "history index path")
+        self.create_directory(f"{args.root_path}/{args.execution_cache_path.replace('/', '')}", "execution cache path")
 
         if args.task == 'downsampling':
             self.create_directory(f"{args.root_path}/{args.filtered_dataset_path.replace('/', '')}", "filtered dataset path")
@@ -188,6 +190,8 @@ class EnvConfig:
         self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}", "log path")
         self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.git_log_path.replace('/', '')}", "git log path")
         self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.dataset_construction_log_path.replace('/', '')}", "dataset construction log path")
+        self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.checkpoint_path.replace('/', '')}", "construction checkpoint path")
+        self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.coverage_path.replace('/', '')}", "test coverage path")
         self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.resync_log_path.replace('/', '')}", "out-of-sync recovery log path")
         self.create_directory(f"{args.root_path}/{args.log_path.replace('/', '')}/{args.eval_log_path.replace('/', '')}", "evaluation log path")
     